@@ -2,6 +2,6 @@
 # ABOUTME: Exposes core components: models, storage, and FastAPI app.
 
 from paternologia.models import Device, Action, PacerButton, Song
-from paternologia.storage import Storage
+from paternologia.storage import Storage, StorageBackend
 
-__all__ = ["Device", "Action", "PacerButton", "Song", "Storage"]
+__all__ = ["Device", "Action", "PacerButton", "Song", "Storage", "StorageBackend"]
@@ -0,0 +1,104 @@
+# ABOUTME: Awaitable facade over a StorageBackend for async route handlers.
+# ABOUTME: Offloads blocking YAML/SQLite I/O to worker threads so the event loop (SSE) stays live.
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from paternologia.models import Device, PacerConfig, Song, SongSummary
+from paternologia.storage import LibrarySnapshot, StorageBackend
+
+
+# Few workers on purpose: YAML parsing is pure-Python CPU work holding the GIL,
+# and every extra runnable thread adds a GIL switch interval of event-loop lag.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="storage")
+
+# song_id → lock held across a song's save and its in-memory updates; weak,
+# so idle songs cost nothing
+_song_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+class AsyncStorage:
+    """Async wrapper: every call runs the backend method in a storage worker thread."""
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    @staticmethod
+    def song_lock(song_id: str) -> asyncio.Lock:
+        """Lock serializing writes of one song with the index/cache updates that follow.
+
+        Without it two saves of the same song could reach the MIDI index or
+        render cache in a different order than their file writes.
+        """
+        lock = _song_locks.get(song_id)
+        if lock is None:
+            lock = _song_locks[song_id] = asyncio.Lock()
+        return lock
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(func, *args))
+
+    async def get_devices(self) -> list[Device]:
+        return await self._run(self.backend.get_devices)
+
+    async def get_device(self, device_id: str) -> Device | None:
+        return await self._run(self.backend.get_device, device_id)
+
+    async def save_devices(self, devices: list[Device]) -> None:
+        await self._run(self.backend.save_devices, devices)
+
+    async def get_songs_order(self) -> list[str]:
+        return await self._run(self.backend.get_songs_order)
+
+    async def save_songs_order(self, order: list[str]) -> None:
+        await self._run(self.backend.save_songs_order, order)
+
+    async def get_songs(self) -> list[Song]:
+        return await self._run(self.backend.get_songs)
+
+    async def get_song_summaries(self) -> list[SongSummary]:
+        return await self._run(self.backend.get_song_summaries)
+
+    async def get_song_summary(self, song_id: str) -> SongSummary | None:
+        return await self._run(self.backend.get_song_summary, song_id)
+
+    async def get_song(self, song_id: str) -> Song | None:
+        return await self._run(self.backend.get_song, song_id)
+
+    async def get_song_with_devices(self, song_id: str) -> tuple[Song | None, list[Device]]:
+        """Load a song and all devices in one thread hop (common page pattern)."""
+        def load() -> tuple[Song | None, list[Device]]:
+            return self.backend.get_song(song_id), self.backend.get_devices()
+
+        return await self._run(load)
+
+    async def get_song_summary_with_devices(
+        self, song_id: str
+    ) -> tuple[SongSummary | None, list[Device]]:
+        """Song summary and all devices in one thread hop (cache validation)."""
+        def load() -> tuple[SongSummary | None, list[Device]]:
+            return self.backend.get_song_summary(song_id), self.backend.get_devices()
+
+        return await self._run(load)
+
+    async def save_song(self, song: Song) -> None:
+        await self._run(self.backend.save_song, song)
+
+    async def delete_song(self, song_id: str) -> bool:
+        return await self._run(self.backend.delete_song, song_id)
+
+    async def song_exists(self, song_id: str) -> bool:
+        return await self._run(self.backend.song_exists, song_id)
+
+    async def get_pacer_config(self) -> PacerConfig | None:
+        return await self._run(self.backend.get_pacer_config)
+
+    async def save_pacer_config(self, config: PacerConfig) -> None:
+        await self._run(self.backend.save_pacer_config, config)
+
+    async def load_snapshot(self) -> LibrarySnapshot:
+        return await self._run(self.backend.load_snapshot)
@@ -1,29 +1,63 @@
 # ABOUTME: Shared dependencies for Paternologia FastAPI application.
-# ABOUTME: Provides storage and templates instances for dependency injection.
+# ABOUTME: Provides storage, SysEx cache and templates instances for dependency injection.
 
+import os
 from pathlib import Path
 
 from fastapi.templating import Jinja2Templates
 
-from paternologia.storage import Storage
+from paternologia.async_storage import AsyncStorage
+from paternologia.pacer.cache import SysExCache
+from paternologia.pacer.shadow import PacerShadow
+from paternologia.storage import Storage, StorageBackend
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 DATA_DIR = BASE_DIR / "data"
+# "yaml" (default, git-friendly files) or "sqlite" (data/paternologia.db)
+STORAGE_BACKEND = os.environ.get("PATERNOLOGIA_STORAGE", "yaml")
 
-_storage: Storage | None = None
+_storage: StorageBackend | None = None
 _templates: Jinja2Templates | None = None
+_sysex_cache: SysExCache | None = None
+_pacer_shadow: PacerShadow | None = None
 
 
-def get_storage() -> Storage:
+def get_storage() -> StorageBackend:
     """Get or create storage instance."""
     global _storage
     if _storage is None:
-        _storage = Storage(data_dir=DATA_DIR)
-        _storage._ensure_dirs()
+        if STORAGE_BACKEND == "sqlite":
+            from paternologia.sqlite_storage import SqliteStorage
+            _storage = SqliteStorage(data_dir=DATA_DIR)
+        else:
+            _storage = Storage(data_dir=DATA_DIR)
     return _storage
 
 
+def get_async_storage() -> AsyncStorage:
+    """Get awaitable facade over the storage instance (for async routes)."""
+    return AsyncStorage(get_storage())
+
+
+def get_sysex_cache() -> SysExCache:
+    """Get the .syx artifact cache living next to the current storage's data."""
+    global _sysex_cache
+    cache_dir = get_storage().data_dir / ".cache" / "syx"
+    if _sysex_cache is None or _sysex_cache.cache_dir != cache_dir:
+        _sysex_cache = SysExCache(cache_dir)
+    return _sysex_cache
+
+
+def get_pacer_shadow() -> PacerShadow:
+    """Get the shadow copy of Pacer presets for the current storage's data."""
+    global _pacer_shadow
+    shadow_file = get_storage().data_dir / ".cache" / "pacer_shadow.json"
+    if _pacer_shadow is None or _pacer_shadow.shadow_file != shadow_file:
+        _pacer_shadow = PacerShadow(shadow_file)
+    return _pacer_shadow
+
+
 def get_templates() -> Jinja2Templates:
     """Get or create templates instance."""
     global _templates
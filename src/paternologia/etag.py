@@ -0,0 +1,47 @@
+# ABOUTME: Strong ETag helpers for conditional GET (If-None-Match → 304).
+# ABOUTME: ETags are derived from content hashes of the underlying songs/devices data.
+
+import hashlib
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Rendered output also depends on templates/code: a new process gets new ETags.
+_BOOT_ID = f"{time.time_ns():x}"
+
+
+def make_etag(*parts: str) -> str:
+    """Build a quoted strong ETag from content hashes and other key parts."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_BOOT_ID.encode("ascii"))
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(part.encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """Headers for cacheable responses: always revalidate, using the ETag."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching ETag."""
+    return Response(status_code=304, headers=cache_headers(etag))
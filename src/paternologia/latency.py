@@ -0,0 +1,121 @@
+# ABOUTME: MIDI-to-screen latency histograms (per pipeline stage) with p50/p95/p99.
+# ABOUTME: Fixed log-scale buckets: recording is O(1), memory is constant.
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+
+# Bucket upper bounds in ms: 0.05 ms … ~80 s, 10% apart
+BUCKETS_MS = [0.05 * 1.1 ** i for i in range(150)]
+
+# Stages in pipeline order (see LatencyStats)
+STAGES = ("bus", "render", "write", "client_render", "ack", "total")
+
+# Song changes remembered until their client acknowledgements arrive
+PENDING_EVENTS = 256
+
+
+class LatencyHistogram:
+    """Counts of samples per bucket; percentiles read back as bucket upper bounds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        ms = max(ms, 0.0)
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float | None:
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                # Overflow bucket reports the largest sample seen
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> dict:
+        def ms(value: float | None) -> float | None:
+            return round(value, 2) if value is not None else None
+
+        return {
+            "count": self.count,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max_ms if self.count else None),
+            "mean_ms": ms(self.total_ms / self.count if self.count else None),
+        }
+
+
+class LatencyStats:
+    """Where the time goes between a Pacer footswitch and the live screen.
+
+    All timestamps are time.time() on the server, except client_render,
+    which the browser measures itself (its clock is not comparable):
+
+    bus            rtmidi callback → MidiEvent published on the loop
+    render         MidiEvent published → LiveSongEvent (HTML) published
+    write          LiveSongEvent published → SSE bytes handed to the server
+    client_render  browser: SSE message received → new song painted
+    ack            SSE write → client acknowledgement received
+    total          rtmidi callback → client acknowledgement received
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._histograms = {stage: LatencyHistogram() for stage in STAGES}
+        # event_id → (rtmidi callback time, first SSE write time)
+        self._pending: OrderedDict[int, tuple[float, float | None]] = OrderedDict()
+
+    def record(self, stage: str, ms: float) -> None:
+        with self._lock:
+            self._histograms[stage].record(ms)
+
+    def song_rendered(self, event_id: int, midi_ts: float, published_at: float, rendered_at: float) -> None:
+        """Renderer published the LiveSongEvent for a MIDI hit."""
+        with self._lock:
+            self._histograms["bus"].record((published_at - midi_ts) * 1000)
+            self._histograms["render"].record((rendered_at - published_at) * 1000)
+            self._pending[event_id] = (midi_ts, None)
+            while len(self._pending) > PENDING_EVENTS:
+                self._pending.popitem(last=False)
+
+    def written(self, event_id: int, published_at: float) -> None:
+        """SSE bytes of a song change were handed to one client connection."""
+        now = self._clock()
+        with self._lock:
+            self._histograms["write"].record((now - published_at) * 1000)
+            pending = self._pending.get(event_id)
+            if pending is not None and pending[1] is None:
+                self._pending[event_id] = (pending[0], now)
+
+    def acked(self, event_id: int, render_ms: float | None) -> bool:
+        """Client painted the song; False if the event is unknown (too old, not from MIDI)."""
+        now = self._clock()
+        with self._lock:
+            pending = self._pending.get(event_id)
+            if pending is None:
+                return False
+            midi_ts, written_at = pending
+            if render_ms is not None:
+                self._histograms["client_render"].record(render_ms)
+            if written_at is not None:
+                self._histograms["ack"].record((now - written_at) * 1000)
+            self._histograms["total"].record((now - midi_ts) * 1000)
+            return True
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in self._histograms.items()}
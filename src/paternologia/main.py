@@ -9,11 +9,17 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
-from paternologia.dependencies import get_storage
+from paternologia.dependencies import get_async_storage, get_storage, get_templates
+from paternologia.latency import LatencyStats
 from paternologia.midi.events import EventBus
 from paternologia.midi.index import SongMidiIndex
 from paternologia.midi.listener import MidiListener
+from paternologia.midi.pool import MidiOutPool
+from paternologia.pacer.prefetch import PresetPrefetcher, assignments_from_summaries
+from paternologia.render_cache import RenderCache
 from paternologia.routers import devices_router, live_router, pacer_router, songs_router
+from paternologia.routers.live import broadcast_live_songs
+from paternologia.routers.pacer import create_pacer_job_queue
 
 # Configure logging to show ERROR and above
 logging.basicConfig(
@@ -28,30 +34,70 @@ STATIC_DIR = BASE_DIR / "static"
 
 
 def _build_midi_index(storage) -> SongMidiIndex:
-    """Build reverse MIDI index from current songs and devices."""
-    songs = storage.get_songs()
-    devices = storage.get_devices()
-    return SongMidiIndex.build(songs, devices)
+    """Build reverse MIDI index (from the compiled snapshot when it is fresh)."""
+    return storage.load_snapshot().midi_index
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown."""
     storage = get_storage()
-    storage._ensure_dirs()
 
     # MIDI subsystem
     event_bus = EventBus()
     event_bus.set_loop(asyncio.get_running_loop())
     app.state.event_bus = event_bus
 
+    # Pre-rendered song pages, warmed in the background below
+    render_cache = RenderCache(get_templates())
+    app.state.render_cache = render_cache
+
+    # MIDI → screen latency per stage (/live/latency)
+    latency = LatencyStats()
+    app.state.latency = latency
+
+    # Song changes rendered once and pushed to all live screens
+    live_bus = EventBus()
+    live_bus.set_loop(asyncio.get_running_loop())
+    app.state.live_bus = live_bus
+
     midi_index = _build_midi_index(storage)
     app.state.midi_index = midi_index
 
-    # Start MIDI listener (graceful degradation if no device)
+    # Shared MIDI output ports (opened lazily on first send)
+    app.state.midi_out_pool = MidiOutPool()
+
+    # Pacer send jobs (one worker per port, progress on their own bus)
+    pacer_jobs = create_pacer_job_queue(app)
+    pacer_jobs.events.set_loop(asyncio.get_running_loop())
+    app.state.pacer_jobs = pacer_jobs
+
+    # Live renderer + one keepalive tick per SSE bus (not a timer in every stream)
+    background = [
+        asyncio.create_task(live_bus.heartbeat()),
+        asyncio.create_task(pacer_jobs.events.heartbeat()),
+        asyncio.create_task(broadcast_live_songs(event_bus, live_bus, render_cache, latency)),
+        asyncio.create_task(render_cache.warm(get_async_storage())),
+    ]
+
     pacer_config = storage.get_pacer_config()
     device_name = pacer_config.device_name if pacer_config else "PACER"
 
+    # Rolling preset prefetch during a show (opt-in via pacer.yaml)
+    app.state.pacer_prefetch = None
+    prefetch_task = None
+    if pacer_config and pacer_config.prefetch_window > 0:
+        summaries = storage.get_song_summaries()
+        prefetcher = PresetPrefetcher(pacer_jobs, device_name, pacer_config.prefetch_window)
+        prefetcher.load(assignments_from_summaries(summaries))
+        app.state.pacer_prefetch = prefetcher
+
+        async def current_setlist() -> list[str]:
+            return [s.id for s in await get_async_storage().get_song_summaries()]
+
+        prefetch_task = asyncio.create_task(prefetcher.follow(event_bus, current_setlist))
+
+    # Start MIDI listener (graceful degradation if no device)
     try:
         listener = MidiListener(song_index=midi_index, event_bus=event_bus)
         if listener.start(device_name):
@@ -67,8 +113,15 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
+    for task in background:
+        task.cancel()
+    if prefetch_task is not None:
+        prefetch_task.cancel()
     if app.state.midi_listener is not None:
         app.state.midi_listener.stop()
+    app.state.pacer_jobs.close()
+    app.state.midi_out_pool.close()
+    storage.flush_summaries()
 
 
 app = FastAPI(
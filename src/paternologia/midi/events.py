@@ -1,64 +1,296 @@
-# ABOUTME: Async event bus for broadcasting MIDI events to SSE subscribers.
-# ABOUTME: Thread-safe publish from rtmidi callback thread to asyncio event loop.
+# ABOUTME: Async event bus for broadcasting MIDI and Pacer job events to SSE subscribers.
+# ABOUTME: Thread-safe publish from rtmidi callback / worker threads to asyncio event loop.
 
 import asyncio
+import json
 import logging
 import time
+from collections import deque
 from dataclasses import dataclass, field
+from functools import cached_property
+
+from paternologia.midi import wire
+from paternologia.midi.ring import MidiRing
 
 logger = logging.getLogger(__name__)
 
+# Events buffered per subscriber before the oldest is dropped
+SUBSCRIBER_BUFFER = 64
+# Recent events kept for clients reconnecting with Last-Event-ID
+REPLAY_BUFFER = 32
+HEARTBEAT_INTERVAL_S = 30.0
+
+
+def sse_frame(event: str, data: str, event_id: int | None = None) -> bytes:
+    """One Server-Sent Events message (with id: when the bus numbered it)."""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {data}\n\n".encode()
+
 
 @dataclass
 class MidiEvent:
-    """A detected MIDI event mapped to a song."""
+    """A detected MIDI event mapped to a song (channel/program -1: chosen in the UI)."""
     song_id: str
     channel: int
     program: int
+    # rtmidi callback time for MIDI hits
+    timestamp: float = field(default_factory=time.time)
+    # Assigned by EventBus on publish
+    event_id: int | None = None
+    published_at: float | None = None
+
+    @cached_property
+    def sse(self) -> bytes:
+        """SSE bytes, encoded once and shared by every subscriber."""
+        return sse_frame("song-change", self.song_id, self.event_id)
+
+    @cached_property
+    def frame(self) -> bytes:
+        """WebSocket frame (midi/wire.py), encoded once like sse."""
+        return wire.midi_activity(self.event_id or 0, self.channel, self.program, self.song_id)
+
+
+@dataclass
+class JobEvent:
+    """Progress/state change of a Pacer send job (snapshot of the job)."""
+    job_id: str
+    state: str
+    data: dict
     timestamp: float = field(default_factory=time.time)
+    event_id: int | None = None
+    published_at: float | None = None
+
+    @cached_property
+    def sse(self) -> bytes:
+        return sse_frame("job", json.dumps(self.data), self.event_id)
+
+    @cached_property
+    def frame(self) -> bytes:
+        return wire.job_progress(self.event_id or 0, self.data)
+
+
+@dataclass
+class LiveSongEvent:
+    """Song change with the live partial already rendered (html None if rendering failed)."""
+    song_id: str
+    html: str | None
+    timestamp: float = field(default_factory=time.time)
+    event_id: int | None = None
+    published_at: float | None = None
+
+    @cached_property
+    def sse(self) -> bytes:
+        data = json.dumps({"song_id": self.song_id, "html": self.html})
+        return sse_frame("song-change", data, self.event_id)
+
+    @cached_property
+    def frame(self) -> bytes:
+        return wire.song_change(self.event_id or 0, self.song_id, self.html)
+
+
+@dataclass
+class Heartbeat:
+    """Keepalive tick, sent by the bus to idle subscribers."""
+    timestamp: float = field(default_factory=time.time)
+
+    sse = b": keepalive\n\n"
+    # WebSocket has its own ping/pong
+    frame = None
+
+
+BusEvent = MidiEvent | JobEvent | LiveSongEvent | Heartbeat
+
+
+class Subscription:
+    """Bounded per-subscriber buffer with drop-oldest overflow.
+
+    maxsize=1 coalesces to the latest event, which is all a live view
+    needs. Heartbeats are only queued when the buffer is empty, so they
+    never push out a real event. Counters feed EventBus.stats().
+    """
+
+    def __init__(self, name: str, maxsize: int = SUBSCRIBER_BUFFER):
+        # (enqueue time, event); deque(maxlen) drops the oldest on append
+        self._items: deque[tuple[float, BusEvent]] = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self.name = name
+        self.maxsize = maxsize
+        self.offered = 0
+        self.dropped = 0
+        self.max_queued = 0
+
+    def offer(self, event: BusEvent) -> None:
+        """Queue event without blocking (event loop only)."""
+        if isinstance(event, Heartbeat) and self._items:
+            return
+        self.offered += 1
+        if len(self._items) == self.maxsize:
+            self.dropped += 1
+        self._items.append((time.monotonic(), event))
+        self.max_queued = max(self.max_queued, len(self._items))
+        self._ready.set()
+
+    async def get(self) -> BusEvent:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()[1]
+
+    def get_nowait(self) -> BusEvent:
+        if not self._items:
+            raise asyncio.QueueEmpty
+        return self._items.popleft()[1]
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def stats(self) -> dict:
+        """Lag of this subscriber: queued events and age of the oldest one."""
+        lag_ms = (time.monotonic() - self._items[0][0]) * 1000 if self._items else 0.0
+        return {
+            "name": self.name,
+            "queued": len(self._items),
+            "max_queued": self.max_queued,
+            "delivered": self.offered - self.dropped - len(self._items),
+            "dropped": self.dropped,
+            "lag_ms": round(lag_ms, 1),
+        }
 
 
 class EventBus:
     """Async broadcast bus for MIDI events.
 
-    Subscribers get an asyncio.Queue. Published events are
-    delivered to all active queues. Thread-safe via
-    loop.call_soon_threadsafe for rtmidi callback thread.
+    Subscribers get a bounded Subscription. Published events are
+    delivered to all active subscriptions without ever blocking the
+    publisher; a slow client loses its oldest events instead of growing
+    memory. Thread-safe via loop.call_soon_threadsafe for rtmidi
+    callback thread. One heartbeat task per bus keeps idle SSE
+    connections open.
+
+    MIDI hits from the rtmidi thread go through a ring buffer instead
+    (publish_midi_threadsafe): the loop is woken once per batch and
+    builds the MidiEvents when it drains.
     """
 
-    def __init__(self):
-        self._subscribers: set[asyncio.Queue] = set()
+    def __init__(self, ring_size: int = 1024, replay_size: int = REPLAY_BUFFER):
+        self._subscribers: set[Subscription] = set()
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._ring = MidiRing(ring_size)
+        self._drain_scheduled = False
+        self.wakeups = 0
+        # Numbered events, newest last; heartbeats are not numbered
+        self._recent: deque[BusEvent] = deque(maxlen=replay_size)
+        self._last_id = 0
+
+    @property
+    def latest(self) -> BusEvent | None:
+        """Most recent event (e.g. the current song on the live bus)."""
+        return self._recent[-1] if self._recent else None
+
+    def since(self, last_id: int) -> list[BusEvent] | None:
+        """Events published after last_id, oldest first.
+
+        None when last_id can't be served from the replay buffer: older
+        than its oldest event, or from before a server restart.
+        """
+        if last_id > self._last_id:
+            return None
+        if self._recent and last_id < self._recent[0].event_id - 1:
+            return None
+        return [event for event in self._recent if event.event_id > last_id]
+
+    @property
+    def midi_dropped(self) -> int:
+        """MIDI hits lost because the ring was full."""
+        return self._ring.dropped
 
     def set_loop(self, loop: asyncio.AbstractEventLoop) -> None:
         """Set the asyncio event loop for thread-safe publishing."""
         self._loop = loop
 
-    def subscribe(self) -> asyncio.Queue:
-        """Create and return a new subscriber queue."""
-        queue: asyncio.Queue = asyncio.Queue()
+    def subscribe(self, name: str = "subscriber", maxsize: int = SUBSCRIBER_BUFFER) -> Subscription:
+        """Create and return a new subscription."""
+        queue = Subscription(name, maxsize)
         self._subscribers.add(queue)
-        logger.debug("New SSE subscriber (total: %d)", len(self._subscribers))
+        logger.debug("New SSE subscriber '%s' (total: %d)", name, len(self._subscribers))
         return queue
 
-    def unsubscribe(self, queue: asyncio.Queue) -> None:
-        """Remove a subscriber queue."""
+    def unsubscribe(self, queue: Subscription) -> None:
+        """Remove a subscription."""
         self._subscribers.discard(queue)
         logger.debug("SSE unsubscribe (total: %d)", len(self._subscribers))
 
-    async def publish(self, event: MidiEvent) -> None:
+    def stats(self) -> list[dict]:
+        """Per-subscriber lag, worst first."""
+        return sorted(
+            (queue.stats() for queue in self._subscribers),
+            key=lambda s: (s["lag_ms"], s["queued"]),
+            reverse=True,
+        )
+
+    async def heartbeat(self, interval_s: float = HEARTBEAT_INTERVAL_S) -> None:
+        """Shared keepalive tick for all subscribers (run as one task per bus)."""
+        try:
+            while True:
+                await asyncio.sleep(interval_s)
+                self._publish_sync(Heartbeat())
+        except asyncio.CancelledError:
+            pass
+
+    async def publish(self, event: BusEvent) -> None:
         """Publish event to all subscribers (async context)."""
-        for queue in self._subscribers:
-            await queue.put(event)
+        self._publish_sync(event)
 
-    def publish_threadsafe(self, event: MidiEvent) -> None:
-        """Publish event from a non-asyncio thread (rtmidi callback)."""
+    def publish_threadsafe(self, event: MidiEvent | JobEvent) -> None:
+        """Publish event from a non-asyncio thread (rtmidi callback, send worker)."""
         if self._loop is None:
             logger.warning("EventBus: no event loop set, dropping event")
             return
         self._loop.call_soon_threadsafe(self._publish_sync, event)
 
-    def _publish_sync(self, event: MidiEvent) -> None:
+    def _publish_sync(self, event: BusEvent) -> None:
         """Synchronous publish called via call_soon_threadsafe."""
+        if not isinstance(event, Heartbeat):
+            self._last_id += 1
+            event.event_id = self._last_id
+            event.published_at = time.time()
+            self._recent.append(event)
         for queue in self._subscribers:
-            queue.put_nowait(event)
+            queue.offer(event)
+
+    def publish_midi_threadsafe(
+        self, song_id: str, channel: int, program: int, timestamp: float | None = None
+    ) -> None:
+        """Publish a matched Program Change from the rtmidi callback thread.
+
+        Pushes into the ring and wakes the loop only if no drain is
+        pending yet, so a burst of messages costs one wakeup. timestamp
+        is when the message arrived (default: now).
+        """
+        if self._loop is None:
+            logger.warning("EventBus: no event loop set, dropping event")
+            return
+        if not self._ring.push(song_id, channel, program, timestamp):
+            logger.warning("EventBus: MIDI ring full, dropping '%s'", song_id)
+        if self._drain_scheduled:
+            return
+        self._drain_scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._drain_midi)
+        except RuntimeError:
+            # Loop closed during shutdown
+            self._drain_scheduled = False
+
+    def _drain_midi(self) -> None:
+        """Event loop side: turn every buffered hit into a MidiEvent, in order."""
+        # Clear before draining: a push racing with the drain either lands
+        # in this batch or schedules the next one
+        self._drain_scheduled = False
+        self.wakeups += 1
+        for song_id, channel, program, timestamp in self._ring.drain():
+            self._publish_sync(MidiEvent(
+                song_id=song_id, channel=channel, program=program, timestamp=timestamp,
+            ))
@@ -1,66 +1,250 @@
-# ABOUTME: Reverse mapping from MIDI (channel, program) to song_id.
-# ABOUTME: Built from songs and devices data for live song detection.
+# ABOUTME: Reverse mapping from MIDI (channel, bank, program) to song_id.
+# ABOUTME: Array-backed lookup table for live song detection; supports per-song deltas.
 
 import logging
+import threading
+from array import array
 
-from paternologia.models import ActionType, Device, Song
+from paternologia.models import ActionType, Device, Song, split_preset_number
 
 logger = logging.getLogger(__name__)
 
+# (channel 0-15, bank 0-16383, program 0-127)
+MidiKey = tuple[int, int, int]
+
+CHANNELS = 16
+PROGRAMS = 128
+
+
+def bank_number(msb: int, lsb: int) -> int:
+    """14-bit bank from Bank Select MSB (CC0) and LSB (CC32)."""
+    return (msb << 7) | lsb
+
+
+def song_rank(order: dict[str, int], song_id: str) -> tuple[int, str]:
+    """Conflict sort key: ordered songs by position, then the rest alphabetically."""
+    position = order.get(song_id)
+    if position is not None:
+        return (position, "")
+    return (len(order), song_id)
+
 
 class SongMidiIndex:
-    """Maps (midi_channel, program_number) → song_id for live detection."""
+    """Maps (midi_channel, bank, program_number) → song_id for live detection.
+
+    Lookups read a flat array of song slots: bank 0 of all 16 channels is
+    preallocated (16 × 128), other (channel, bank) pairs get a 128-entry
+    page on first use. lookup() is one page offset + one array read, no
+    key tuples are built in the rtmidi callback.
 
-    def __init__(self, mapping: dict[tuple[int, int], str]):
+    update_song()/remove_song() change the index in place, with work
+    proportional to the song's actions. Writers hold a lock; the rtmidi
+    callback reads without one: every table change is a single slot store,
+    and a new page is appended to the table before it is registered.
+
+    Conflicts are resolved by song rank, the same order storage lists
+    songs in: songs_order.yaml position first, the rest alphabetically by
+    ID. The lowest rank wins, so a delta-updated index equals a full
+    rebuild, also for songs added after build().
+    """
+
+    def __init__(
+        self,
+        mapping: dict[MidiKey, str],
+        claims: dict[MidiKey, tuple[str, ...]] | None = None,
+        song_keys: dict[str, tuple[MidiKey, ...]] | None = None,
+        order: dict[str, int] | None = None,
+    ):
         self._mapping = mapping
+        self._claims = claims if claims is not None else {k: (v,) for k, v in mapping.items()}
+        self._song_keys = song_keys if song_keys is not None else {}
+        # song_id → position in songs_order (shared, never mutated)
+        self._order = order if order is not None else {}
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def __getstate__(self) -> dict:
+        # Pickled into the library snapshot; locks are not picklable
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _init_table(self) -> None:
+        """Fill the lookup table from mapping."""
+        # slot 0 = empty; song slots are append-only
+        self._names: list[str | None] = [None]
+        self._slots: dict[str, int] = {}
+        # (channel << 14 | bank) → offset of its 128-entry page, bank 0 preallocated
+        self._pages: dict[int, int] = {}
+        self._table = array("I", bytes(4 * CHANNELS * PROGRAMS))
+        for key, song_id in self._mapping.items():
+            self._store(key, song_id)
+
+    def _store(self, key: MidiKey, song_id: str | None) -> None:
+        channel, bank, program = key
+        if bank == 0:
+            offset = channel * PROGRAMS
+        else:
+            page = (channel << 14) | bank
+            offset = self._pages.get(page)
+            if offset is None:
+                if song_id is None:
+                    return
+                offset = len(self._table)
+                self._table.frombytes(bytes(4 * PROGRAMS))
+                self._pages[page] = offset
+
+        slot = 0
+        if song_id is not None:
+            slot = self._slots.get(song_id, 0)
+            if not slot:
+                slot = len(self._names)
+                self._names.append(song_id)
+                self._slots[song_id] = slot
+        self._table[offset + program] = slot
+
+    def _rank(self, song_id: str) -> tuple[int, str]:
+        return song_rank(self._order, song_id)
+
+    @staticmethod
+    def _song_keys_for(song: Song, device_map: dict[str, Device]) -> tuple[MidiKey, ...]:
+        """Unique (channel, bank, program) keys of the song's preset actions, in order."""
+        keys: dict[MidiKey, None] = {}
+        for button in song.pacer:
+            for action in button.actions:
+                if action.type != ActionType.PRESET:
+                    continue
+                if action.value is None:
+                    continue
+
+                device = device_map.get(action.device)
+                if device is None:
+                    logger.warning(
+                        "Song '%s': unknown device '%s', skipping",
+                        song.song.id, action.device,
+                    )
+                    continue
+
+                # Same bank/program split as the Pacer export sends
+                msb, lsb, program = split_preset_number(
+                    int(action.value), action.bank_msb, action.bank_lsb
+                )
+                # devices.yaml uses 1-16 (musician convention),
+                # rtmidi uses 0-15 (MIDI protocol)
+                channel = device.midi_channel - 1
+                if not 0 <= channel < CHANNELS:
+                    logger.warning(
+                        "Song '%s': device '%s' has no MIDI channel (%d), skipping",
+                        song.song.id, device.id, device.midi_channel,
+                    )
+                    continue
+                keys[(channel, bank_number(msb, lsb), program)] = None
+        return tuple(keys)
 
     @classmethod
-    def build(cls, songs: list[Song], devices: list[Device]) -> "SongMidiIndex":
+    def build(
+        cls, songs: list[Song], devices: list[Device], order: list[str] | None = None
+    ) -> "SongMidiIndex":
         """Build index from songs and devices.
 
         Scans all songs for preset actions and maps
-        (device.midi_channel, action.value % 128) → song.song.id.
-        First match wins on conflicts.
+        (device.midi_channel, bank, program) → song.song.id, where values
+        above 127 select a bank like the Pacer does. On conflicts the song
+        ranked first wins: by position in order (songs_order.yaml), then
+        alphabetically. Without order the songs list itself is the order.
         """
+        if order is None:
+            order = [song.song.id for song in songs]
+        positions: dict[str, int] = {}
+        for song_id in order:
+            positions.setdefault(song_id, len(positions))
         device_map = {d.id: d for d in devices}
-        mapping: dict[tuple[int, int], str] = {}
-
-        for song in songs:
-            for button in song.pacer:
-                for action in button.actions:
-                    if action.type != ActionType.PRESET:
-                        continue
-                    if action.value is None:
-                        continue
-
-                    device = device_map.get(action.device)
-                    if device is None:
-                        logger.warning(
-                            "Song '%s': unknown device '%s', skipping",
-                            song.song.id, action.device,
-                        )
-                        continue
-
-                    program = int(action.value) % 128
-                    # devices.yaml uses 1-16 (musician convention),
-                    # rtmidi uses 0-15 (MIDI protocol)
-                    channel = device.midi_channel - 1
-                    key = (channel, program)
-
-                    if key in mapping:
-                        logger.warning(
-                            "MIDI conflict: (ch=%d, prog=%d) already mapped to '%s', "
-                            "ignoring '%s'",
-                            channel, program,
-                            mapping[key], song.song.id,
-                        )
-                        continue
-
-                    mapping[key] = song.song.id
+        mapping: dict[MidiKey, str] = {}
+        claims: dict[MidiKey, tuple[str, ...]] = {}
+        song_keys: dict[str, tuple[MidiKey, ...]] = {}
+
+        for song in sorted(songs, key=lambda song: song_rank(positions, song.song.id)):
+            song_id = song.song.id
+            keys = cls._song_keys_for(song, device_map)
+            song_keys[song_id] = keys
+
+            for key in keys:
+                if key in mapping:
+                    logger.warning(
+                        "MIDI conflict: (ch=%d, bank=%d, prog=%d) already mapped to '%s', "
+                        "ignoring '%s'",
+                        key[0], key[1], key[2],
+                        mapping[key], song_id,
+                    )
+                    claims[key] += (song_id,)
+                    continue
+
+                mapping[key] = song_id
+                claims[key] = (song_id,)
 
         logger.info("Built MIDI index with %d entries", len(mapping))
-        return cls(mapping)
+        return cls(mapping, claims, song_keys, positions)
+
+    def update_song(self, song: Song, devices: list[Device]) -> None:
+        """Add or replace this song's entries in place."""
+        device_map = {d.id: d for d in devices}
+        new_keys = self._song_keys_for(song, device_map)
+        with self._lock:
+            self._replace_song(song.song.id, new_keys)
+
+    def remove_song(self, song_id: str) -> None:
+        """Remove this song in place; its keys fall to the next claimant."""
+        with self._lock:
+            if song_id not in self._song_keys:
+                return
+            self._replace_song(song_id, ())
+            del self._song_keys[song_id]
+
+    def _replace_song(self, song_id: str, new_keys: tuple[MidiKey, ...]) -> None:
+        """Swap one song's keys, re-resolving only the touched keys. Caller holds _lock."""
+        old_keys = self._song_keys.get(song_id, ())
+        mapping = self._mapping
+        claims = self._claims
+        self._song_keys[song_id] = new_keys
+
+        new_key_set = set(new_keys)
+        for key in old_keys:
+            if key in new_key_set:
+                continue
+            remaining = tuple(s for s in claims.get(key, ()) if s != song_id)
+            if remaining:
+                claims[key] = remaining
+                mapping[key] = remaining[0]
+            else:
+                claims.pop(key, None)
+                mapping.pop(key, None)
+
+        for key in new_keys:
+            current = tuple(s for s in claims.get(key, ()) if s != song_id)
+            updated = tuple(sorted(current + (song_id,), key=self._rank))
+            claims[key] = updated
+            if len(updated) > 1:
+                logger.warning(
+                    "MIDI conflict: (ch=%d, bank=%d, prog=%d) claimed by %s, '%s' wins",
+                    key[0], key[1], key[2], list(updated), updated[0],
+                )
+            mapping[key] = updated[0]
+
+        for key in new_key_set.union(old_keys):
+            self._store(key, mapping.get(key))
 
-    def lookup(self, channel: int, program: int) -> str | None:
-        """Look up song_id by MIDI channel and program number."""
-        return self._mapping.get((channel, program))
+    def lookup(self, channel: int, program: int, bank: int = 0) -> str | None:
+        """Look up song_id by MIDI channel, program number and 14-bit bank (see bank_number)."""
+        if not 0 <= channel < CHANNELS:
+            return None
+        if bank:
+            offset = self._pages.get((channel << 14) | bank)
+            if offset is None:
+                return None
+        else:
+            offset = channel * PROGRAMS
+        return self._names[self._table[offset + program]]
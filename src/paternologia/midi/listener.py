@@ -2,15 +2,19 @@
 # ABOUTME: Listens for Program Change messages and publishes events via EventBus.
 
 import logging
+import time
 
 import rtmidi
 
-from paternologia.midi.events import EventBus, MidiEvent
+from paternologia.midi.events import EventBus
 from paternologia.midi.index import SongMidiIndex
 from paternologia.midi.ports import find_rtmidi_port
 
 logger = logging.getLogger(__name__)
 
+# Longer gaps between messages re-anchor arrival times to the wall clock
+ARRIVAL_CHAIN_MAX_S = 1.0
+
 
 class MidiListener:
     """Listens for MIDI Program Change and publishes matching song events."""
@@ -19,6 +23,11 @@ class MidiListener:
         self._index = song_index
         self._bus = event_bus
         self._midi_in: rtmidi.MidiIn | None = None
+        # Last Bank Select (CC0 MSB / CC32 LSB) per channel, applied to Program Change
+        self._bank_msb = bytearray(16)
+        self._bank_lsb = bytearray(16)
+        # Estimated arrival time of the previous message (see _arrival)
+        self._last_arrival = 0.0
 
     @property
     def song_index(self) -> SongMidiIndex:
@@ -65,28 +74,52 @@ class MidiListener:
             self._midi_in = None
             logger.info("MIDI listener stopped")
 
+    def _arrival(self, deltatime: float) -> float:
+        """When the message reached the port, from rtmidi's delta time.
+
+        rtmidi only gives the time since the previous message, so chain it
+        from the previous arrival; re-anchor to the wall clock after a gap
+        (or if the chain would run ahead of it), keeping drift bounded.
+        """
+        now = time.time()
+        arrival = self._last_arrival + deltatime
+        if deltatime > ARRIVAL_CHAIN_MAX_S or arrival > now:
+            arrival = now
+        self._last_arrival = arrival
+        return arrival
+
     def _callback(self, event, data=None) -> None:
         """rtmidi callback - called from a separate thread."""
-        message, _deltatime = event
+        message, deltatime = event
+        arrival = self._arrival(deltatime)
         if len(message) < 2:
             return
 
         status = message[0]
+        kind = status & 0xF0
+        channel = status & 0x0F
+
+        # Bank Select: 0xBn 0x00 msb / 0xBn 0x20 lsb
+        if kind == 0xB0 and len(message) >= 3:
+            if message[1] == 0:
+                self._bank_msb[channel] = message[2]
+            elif message[1] == 32:
+                self._bank_lsb[channel] = message[2]
+            return
+
         # Program Change: 0xCn where n is channel (0-15)
-        if (status & 0xF0) != 0xC0:
+        if kind != 0xC0:
             return
 
-        channel = status & 0x0F
         program = message[1]
+        bank = (self._bank_msb[channel] << 7) | self._bank_lsb[channel]
 
-        logger.debug("Program Change: ch=%d prog=%d", channel, program)
+        logger.debug("Program Change: ch=%d bank=%d prog=%d", channel, bank, program)
 
-        song_id = self._index.lookup(channel, program)
+        song_id = self._index.lookup(channel, program, bank)
         if song_id is None:
-            logger.debug("No song mapped to ch=%d prog=%d", channel, program)
+            logger.debug("No song mapped to ch=%d bank=%d prog=%d", channel, bank, program)
             return
 
-        logger.info("MIDI → song '%s' (ch=%d, prog=%d)", song_id, channel, program)
-        self._bus.publish_threadsafe(MidiEvent(
-            song_id=song_id, channel=channel, program=program,
-        ))
+        logger.info("MIDI → song '%s' (ch=%d, bank=%d, prog=%d)", song_id, channel, bank, program)
+        self._bus.publish_midi_threadsafe(song_id, channel, program, arrival)
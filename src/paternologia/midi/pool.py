@@ -0,0 +1,129 @@
+# ABOUTME: Pool of long-lived rtmidi output connections keyed by device name.
+# ABOUTME: Lazy (re)connect, health check on lease, one sender per port at a time.
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from paternologia.midi.transport import RtMidiTransport, TransportError, open_midi_out
+
+logger = logging.getLogger(__name__)
+
+Opener = Callable[[str], "tuple[object, int] | None"]
+
+
+@dataclass
+class _Connection:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    midi_out: object | None = None
+    port_idx: int = -1
+    port_name: str = ""
+
+
+class MidiOutPool:
+    """Keeps MidiOut ports open between sends.
+
+    lease() hands out an RtMidiTransport on the pooled port; only one lease
+    per device at a time (SysEx frames from two senders must not interleave).
+    Before each lease the port is checked (still open, same port name at the
+    same index) and reopened if the device was unplugged or renumbered.
+    """
+
+    def __init__(self, opener: Opener = open_midi_out):
+        self._opener = opener
+        self._connections: dict[str, _Connection] = {}
+        self._lock = threading.Lock()
+        self.opens = 0
+        self.reuses = 0
+
+    def _connection(self, device_name: str) -> _Connection:
+        with self._lock:
+            return self._connections.setdefault(device_name.upper(), _Connection())
+
+    @staticmethod
+    def _healthy(conn: _Connection) -> bool:
+        if conn.midi_out is None:
+            return False
+        try:
+            if not conn.midi_out.is_port_open():
+                return False
+            ports = conn.midi_out.get_ports()
+        except Exception:
+            return False
+        return conn.port_idx < len(ports) and ports[conn.port_idx] == conn.port_name
+
+    @staticmethod
+    def _close(conn: _Connection) -> None:
+        if conn.midi_out is not None:
+            try:
+                conn.midi_out.close_port()
+            except Exception as e:
+                logger.debug("Closing MIDI output failed: %s", e)
+        conn.midi_out = None
+
+    def _ensure_open(self, device_name: str, conn: _Connection) -> bool:
+        """Reuse the open port if healthy, otherwise (re)open it. Caller holds conn.lock."""
+        if self._healthy(conn):
+            self.reuses += 1
+            return True
+
+        self._close(conn)
+        opened = self._opener(device_name)
+        if opened is None:
+            return False
+        conn.midi_out, conn.port_idx = opened
+        try:
+            conn.port_name = conn.midi_out.get_ports()[conn.port_idx]
+        except Exception:
+            conn.port_name = ""
+        self.opens += 1
+        logger.info("MIDI output for '%s' opened on port %d", device_name, conn.port_idx)
+        return True
+
+    @contextmanager
+    def lease(self, device_name: str, timeout_s: float = 5.0) -> Iterator[RtMidiTransport | None]:
+        """Exclusive use of the device's output port; yields None if it is unavailable.
+
+        A failed send (or an exception escaping the block) drops the
+        connection so the next lease reconnects.
+        """
+        conn = self._connection(device_name)
+        if not conn.lock.acquire(timeout=timeout_s):
+            raise TransportError(f"Port '{device_name}' zajęty przez inną wysyłkę")
+        try:
+            if not self._ensure_open(device_name, conn):
+                yield None
+                return
+            transport = RtMidiTransport(
+                conn.midi_out, port=f"rtmidi:{conn.port_idx}", owned=False
+            )
+            try:
+                yield transport
+            except Exception:
+                transport.failed = True
+                raise
+            finally:
+                if transport.failed:
+                    self._close(conn)
+        finally:
+            conn.lock.release()
+
+    def send_messages(self, device_name: str, messages: list[list[int] | bytes]) -> bool:
+        """Send short messages (PC/CC) under one lease on the pooled port; False if unavailable."""
+        with self.lease(device_name) as transport:
+            if transport is None:
+                return False
+            for message in messages:
+                transport.send_message(message)
+            return True
+
+    def close(self) -> None:
+        """Close all ports (app shutdown)."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            with conn.lock:
+                self._close(conn)
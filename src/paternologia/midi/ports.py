@@ -1,21 +1,28 @@
-# ABOUTME: MIDI port detection utilities for amidi (SysEx) and rtmidi (live input).
-# ABOUTME: Shared by pacer router (amidi) and MIDI listener (rtmidi).
+# ABOUTME: MIDI port detection for amidi (SysEx) and rtmidi (live input/output) with a cached registry.
+# ABOUTME: Port lists are enumerated once and refreshed only when ALSA reports a card/client change.
 
 import logging
 import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
+ASOUND_DIR = Path("/proc/asound")
 
-def find_amidi_port(device_name: str) -> str | None:
-    """Find amidi port by device name (parses `amidi -l` output).
+# Without /proc/asound (not Linux, container) ports are re-enumerated at most this often
+FALLBACK_TTL_S = 2.0
 
-    Args:
-        device_name: Fragment of device name to search for (e.g. "PACER")
+AMIDI = "amidi"
+RTMIDI_IN = "rtmidi_in"
+RTMIDI_OUT = "rtmidi_out"
 
-    Returns:
-        Port string like "hw:4,0,0" or None if not found.
-    """
+
+def scan_amidi_ports() -> list[tuple[str, str]]:
+    """Enumerate `amidi -l` → [(port, line)], e.g. ("hw:4,0,0", "IO  hw:4,0,0  PACER MIDI1")."""
     try:
         result = subprocess.run(
             ["amidi", "-l"],
@@ -24,17 +31,154 @@ def find_amidi_port(device_name: str) -> str | None:
             timeout=5,
             check=False,
         )
-        if result.returncode != 0:
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return []
+    if result.returncode != 0:
+        return []
+
+    ports = []
+    for line in result.stdout.strip().split("\n"):
+        parts = line.split()
+        if len(parts) >= 2 and parts[1].startswith("hw:"):
+            ports.append((parts[1], line))
+    return ports
+
+
+def scan_rtmidi_ports(output: bool = False) -> list[str]:
+    """Enumerate rtmidi input (or output) port names; index = port number."""
+    try:
+        import rtmidi
+
+        midi = rtmidi.MidiOut() if output else rtmidi.MidiIn()
+        ports = midi.get_ports()
+        del midi
+    except Exception as e:
+        logger.warning("Cannot enumerate rtmidi %s ports: %s", "output" if output else "input", e)
+        return []
+    return list(ports)
+
+
+def _match(names: list[str], device_name: str) -> int | None:
+    for i, name in enumerate(names):
+        if device_name.upper() in name.upper():
+            return i
+    return None
+
+
+@dataclass(frozen=True)
+class DevicePorts:
+    """Where one device is reachable right now (None = not present)."""
+
+    amidi: str | None
+    rtmidi_in: int | None
+    rtmidi_out: int | None
+
+
+class PortRegistry:
+    """Cached MIDI port lists shared by the listener and the senders.
+
+    Enumerating spawns `amidi -l` or creates an rtmidi client, so each list
+    is kept until the ALSA change signal moves: the contents of
+    /proc/asound/cards (USB plug/unplug, hw:X renumbering) and the client
+    and port lines of /proc/asound/seq/clients (sequencer ports). Reading
+    those files costs microseconds. Without /proc/asound lists expire after
+    ttl_s instead.
+    """
+
+    def __init__(
+        self,
+        asound_dir: Path = ASOUND_DIR,
+        ttl_s: float = FALLBACK_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._asound_dir = Path(asound_dir)
+        self._ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple[object, list]] = {}
+        self.scans = 0
+
+    def _read_signal(self, name: str) -> bytes | None:
+        try:
+            data = (self._asound_dir / name).read_bytes()
+        except OSError:
             return None
+        if name == "seq/clients":
+            # Pool statistics change with traffic; only clients and ports matter
+            data = b"\n".join(
+                line for line in data.splitlines()
+                if line.lstrip().startswith((b"Client", b"Port"))
+            )
+        return data
 
-        for line in result.stdout.strip().split("\n"):
-            if device_name.upper() in line.upper():
-                parts = line.split()
-                if len(parts) >= 2 and parts[1].startswith("hw:"):
-                    return parts[1]
-        return None
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return None
+    def signature(self) -> object:
+        """Cheap token that changes whenever the set of MIDI ports may have changed."""
+        cards = self._read_signal("cards")
+        clients = self._read_signal("seq/clients")
+        if cards is None and clients is None:
+            return ("ttl", int(self._clock() // self._ttl_s))
+        return (cards, clients)
+
+    def _ports(self, kind: str) -> list:
+        signature = self.signature()
+        with self._lock:
+            cached = self._cache.get(kind)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+        if kind == AMIDI:
+            ports = scan_amidi_ports()
+        else:
+            ports = scan_rtmidi_ports(output=kind == RTMIDI_OUT)
+
+        with self._lock:
+            self._cache[kind] = (signature, ports)
+            self.scans += 1
+        logger.debug("Enumerated %s ports: %s", kind, ports)
+        return ports
+
+    def amidi_port(self, device_name: str) -> str | None:
+        ports = self._ports(AMIDI)
+        idx = _match([line for _, line in ports], device_name)
+        return ports[idx][0] if idx is not None else None
+
+    def rtmidi_input(self, device_name: str) -> int | None:
+        return _match(self._ports(RTMIDI_IN), device_name)
+
+    def rtmidi_output(self, device_name: str) -> int | None:
+        return _match(self._ports(RTMIDI_OUT), device_name)
+
+    def lookup(self, device_name: str) -> DevicePorts:
+        """All ports of device_name (enumerates every backend on a cache miss)."""
+        return DevicePorts(
+            amidi=self.amidi_port(device_name),
+            rtmidi_in=self.rtmidi_input(device_name),
+            rtmidi_out=self.rtmidi_output(device_name),
+        )
+
+    def invalidate(self) -> None:
+        """Drop cached lists (next lookup re-enumerates)."""
+        with self._lock:
+            self._cache.clear()
+
+
+_registry = PortRegistry()
+
+
+def get_port_registry() -> PortRegistry:
+    return _registry
+
+
+def find_amidi_port(device_name: str) -> str | None:
+    """Find amidi port by device name (parses `amidi -l` output).
+
+    Args:
+        device_name: Fragment of device name to search for (e.g. "PACER")
+
+    Returns:
+        Port string like "hw:4,0,0" or None if not found.
+    """
+    return _registry.amidi_port(device_name)
 
 
 def find_rtmidi_port(device_name: str) -> int | None:
@@ -46,20 +190,26 @@ def find_rtmidi_port(device_name: str) -> int | None:
     Returns:
         Port index for rtmidi.MidiIn.open_port() or None if not found.
     """
-    try:
-        import rtmidi
+    port_idx = _registry.rtmidi_input(device_name)
+    if port_idx is None:
+        logger.warning("No rtmidi port matching '%s'", device_name)
+    else:
+        logger.info("Found rtmidi port %d for '%s'", port_idx, device_name)
+    return port_idx
 
-        midi_in = rtmidi.MidiIn()
-        ports = midi_in.get_ports()
-        del midi_in
-    except Exception as e:
-        logger.warning("Cannot enumerate rtmidi ports: %s", e)
-        return None
 
-    for i, port_name in enumerate(ports):
-        if device_name.upper() in port_name.upper():
-            logger.info("Found rtmidi port %d: %s", i, port_name)
-            return i
+def find_rtmidi_output_port(device_name: str) -> int | None:
+    """Find rtmidi output port index by device name.
 
-    logger.warning("No rtmidi port matching '%s' in: %s", device_name, ports)
-    return None
+    Args:
+        device_name: Fragment of device name to search for (e.g. "PACER")
+
+    Returns:
+        Port index for rtmidi.MidiOut.open_port() or None if not found.
+    """
+    port_idx = _registry.rtmidi_output(device_name)
+    if port_idx is None:
+        logger.warning("No rtmidi output port matching '%s'", device_name)
+    else:
+        logger.info("Found rtmidi output port %d for '%s'", port_idx, device_name)
+    return port_idx
@@ -0,0 +1,60 @@
+# ABOUTME: Single-producer/single-consumer ring buffer for MIDI hits from the rtmidi thread.
+# ABOUTME: Preallocated slots, no locks; the consumer drains everything in one batch.
+
+import time
+from array import array
+
+
+class MidiRing:
+    """Fixed-size SPSC ring of (song_id, channel, program, timestamp).
+
+    The producer (rtmidi callback thread) only writes `_tail`, the consumer
+    (event loop) only writes `_head`. Slots are preallocated arrays, so a
+    push stores into existing storage instead of building an event object.
+    Relies on the GIL making single int/reference stores atomic.
+
+    When full, new items are dropped and counted - the producer must never
+    block or touch `_head`.
+    """
+
+    def __init__(self, size: int = 1024):
+        if size < 2 or size & (size - 1):
+            raise ValueError("Ring size must be a power of two")
+        self._mask = size - 1
+        self._songs: list[str | None] = [None] * size
+        self._channels = bytearray(size)
+        self._programs = bytearray(size)
+        self._times = array("d", bytes(8 * size))
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def push(self, song_id: str, channel: int, program: int, timestamp: float | None = None) -> bool:
+        """Producer side. Returns False (and counts a drop) when the ring is full."""
+        tail = self._tail
+        if tail - self._head > self._mask:
+            self.dropped += 1
+            return False
+        slot = tail & self._mask
+        self._songs[slot] = song_id
+        self._channels[slot] = channel
+        self._programs[slot] = program
+        self._times[slot] = time.time() if timestamp is None else timestamp
+        # Publish the slot only after it is fully written
+        self._tail = tail + 1
+        return True
+
+    def drain(self) -> list[tuple[str, int, int, float]]:
+        """Consumer side: take every item pushed so far, oldest first."""
+        head, tail = self._head, self._tail
+        items = []
+        while head != tail:
+            slot = head & self._mask
+            items.append((self._songs[slot], self._channels[slot], self._programs[slot], self._times[slot]))
+            self._songs[slot] = None
+            head += 1
+        self._head = head
+        return items
@@ -0,0 +1,287 @@
+# ABOUTME: SysEx transports for sending Pacer frames: native rtmidi (paced thread) and amidi.
+# ABOUTME: rtmidi sends frames directly from memory; amidi subprocess remains as a fallback.
+
+import logging
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Callable, Protocol
+
+from paternologia.midi.ports import find_rtmidi_output_port
+
+logger = logging.getLogger(__name__)
+
+# MIDI DIN: 31250 bit/s, 10 bits per byte. Mirrors amidi, which drains
+# each message before sleeping --sysex-interval.
+MIDI_MS_PER_BYTE = 0.32
+
+# Final stretch before a deadline is spun instead of slept (sleep overshoots).
+SPIN_S = 0.0015
+
+# How often a running send checks for cancellation.
+CANCEL_POLL_S = 0.05
+
+
+class TransportError(Exception):
+    """Sending SysEx failed; the message is shown to the user."""
+
+
+class TransportCancelled(TransportError):
+    """Send was cancelled before all frames went out."""
+
+
+@dataclass
+class FrameTiming:
+    """When one frame went out, relative to the first frame."""
+
+    index: int
+    size: int
+    offset_ms: float
+    late_ms: float
+
+
+@dataclass
+class SendReport:
+    """Result of a successful send."""
+
+    transport: str
+    port: str
+    frames: int
+    elapsed_ms: float
+    timings: list[FrameTiming] = field(default_factory=list)
+
+    @property
+    def max_late_ms(self) -> float:
+        return max((t.late_ms for t in self.timings), default=0.0)
+
+
+FrameCallback = Callable[[FrameTiming], None]
+
+
+class SysExTransport(Protocol):
+    name: str
+    port: str
+
+    def send(
+        self,
+        frames: list[bytes],
+        interval_ms: int,
+        timeout_s: float,
+        on_frame: FrameCallback | None = None,
+        syx_file: Path | None = None,
+        cancel: threading.Event | None = None,
+    ) -> SendReport: ...
+
+    def close(self) -> None: ...
+
+
+def _sleep_until(deadline: float) -> None:
+    remaining = deadline - time.perf_counter()
+    if remaining > SPIN_S:
+        time.sleep(remaining - SPIN_S)
+    while time.perf_counter() < deadline:
+        time.sleep(0)
+
+
+def pace_frames(
+    midi_out,
+    frames: list[bytes],
+    interval_ms: int,
+    on_frame: FrameCallback | None = None,
+    cancel: threading.Event | None = None,
+) -> list[FrameTiming]:
+    """Send frames through midi_out.send_message() with deadline-based pacing.
+
+    Each frame is scheduled interval_ms after the previous one has left the
+    wire (estimated from its size), like amidi --sysex-interval.
+    The gap counts from when a frame was actually sent: a late frame pushes
+    back the rest instead of being followed by a catch-up burst.
+    """
+    timings = []
+    start = time.perf_counter()
+    deadline = start
+    for index, frame in enumerate(frames):
+        if cancel is not None and cancel.is_set():
+            break
+        _sleep_until(deadline)
+        sent_at = time.perf_counter()
+        midi_out.send_message(frame)
+
+        timing = FrameTiming(
+            index=index,
+            size=len(frame),
+            offset_ms=(sent_at - start) * 1000,
+            late_ms=max(0.0, (sent_at - deadline) * 1000),
+        )
+        timings.append(timing)
+        if on_frame is not None:
+            on_frame(timing)
+        deadline = max(deadline, sent_at) + (len(frame) * MIDI_MS_PER_BYTE + interval_ms) / 1000
+    return timings
+
+
+def open_midi_out(device_name: str) -> tuple[object, int] | None:
+    """Open the rtmidi output port matching device_name → (MidiOut, port index).
+
+    None if rtmidi or the port is unavailable.
+    """
+    port_idx = find_rtmidi_output_port(device_name)
+    if port_idx is None:
+        return None
+    try:
+        import rtmidi
+
+        midi_out = rtmidi.MidiOut()
+        midi_out.open_port(port_idx)
+    except Exception as e:
+        logger.warning("Failed to open MIDI output port %d: %s", port_idx, e)
+        return None
+    return midi_out, port_idx
+
+
+class RtMidiTransport:
+    """Sends SysEx through an open rtmidi.MidiOut, paced on a dedicated thread.
+
+    With owned=False the port belongs to a MidiOutPool and close() keeps it open.
+    """
+
+    name = "rtmidi"
+
+    def __init__(self, midi_out, port: str, owned: bool = True):
+        self._midi_out = midi_out
+        self.port = port
+        self._owned = owned
+        self.failed = False
+
+    @classmethod
+    def open(cls, device_name: str) -> "RtMidiTransport | None":
+        """Open a dedicated output port for device_name (see MidiOutPool for shared ones)."""
+        opened = open_midi_out(device_name)
+        if opened is None:
+            return None
+        midi_out, port_idx = opened
+        return cls(midi_out, port=f"rtmidi:{port_idx}")
+
+    def send(
+        self,
+        frames: list[bytes],
+        interval_ms: int,
+        timeout_s: float,
+        on_frame: FrameCallback | None = None,
+        syx_file: Path | None = None,
+        cancel: threading.Event | None = None,
+    ) -> SendReport:
+        result: dict = {}
+        stop = threading.Event()
+
+        def run() -> None:
+            try:
+                result["timings"] = pace_frames(
+                    self._midi_out, frames, interval_ms, on_frame, stop
+                )
+            except Exception as e:
+                result["error"] = e
+
+        start = time.perf_counter()
+        deadline = start + timeout_s
+        thread = threading.Thread(target=run, name="sysex-pacer", daemon=True)
+        thread.start()
+        while thread.is_alive() and time.perf_counter() < deadline:
+            thread.join(min(CANCEL_POLL_S, max(0.0, deadline - time.perf_counter())))
+            if cancel is not None and cancel.is_set():
+                stop.set()
+        if thread.is_alive():
+            stop.set()
+            thread.join()
+            self.failed = True
+            raise TransportError(f"Timeout wysyłania po {timeout_s} s")
+        if "error" in result:
+            self.failed = True
+            raise TransportError(f"rtmidi: {result['error']}")
+
+        timings = result["timings"]
+        if len(timings) < len(frames):
+            raise TransportCancelled(f"Anulowano po {len(timings)}/{len(frames)} ramkach")
+        report = SendReport(
+            transport=self.name,
+            port=self.port,
+            frames=len(timings),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            timings=timings,
+        )
+        logger.info(
+            "Sent %d SysEx frames via %s in %.0f ms (max late %.1f ms)",
+            report.frames, self.port, report.elapsed_ms, report.max_late_ms,
+        )
+        return report
+
+    def send_message(self, message: list[int] | bytes) -> None:
+        """Send one message immediately (no pacing), e.g. Program Change or CC."""
+        self._midi_out.send_message(message)
+
+    def close(self) -> None:
+        if self._owned:
+            self._midi_out.close_port()
+
+
+class AmidiTransport:
+    """Fallback: `amidi -s` subprocess on a .syx file (temporary unless given)."""
+
+    name = "amidi"
+
+    def __init__(self, port: str):
+        self.port = port
+
+    def send(
+        self,
+        frames: list[bytes],
+        interval_ms: int,
+        timeout_s: float,
+        on_frame: FrameCallback | None = None,
+        syx_file: Path | None = None,
+        cancel: threading.Event | None = None,
+    ) -> SendReport:
+        # amidi sends the whole file in one process: cancel only before it starts
+        if cancel is not None and cancel.is_set():
+            raise TransportCancelled("Anulowano przed wysyłką")
+        start = time.perf_counter()
+        try:
+            if syx_file is not None:
+                run = self._run(str(syx_file), interval_ms, timeout_s)
+            else:
+                with NamedTemporaryFile(suffix=".syx", delete=True) as tmp:
+                    tmp.write(b"".join(frames))
+                    tmp.flush()
+                    run = self._run(tmp.name, interval_ms, timeout_s)
+        except FileNotFoundError:
+            raise TransportError("amidi not found - install alsa-utils package")
+        except subprocess.TimeoutExpired:
+            raise TransportError(f"Timeout amidi po {timeout_s} s")
+
+        if run.returncode != 0:
+            raise TransportError(f"amidi failed: {run.stderr.strip()}")
+
+        if on_frame is not None:
+            on_frame(FrameTiming(index=len(frames) - 1, size=0, offset_ms=0.0, late_ms=0.0))
+        return SendReport(
+            transport=self.name,
+            port=self.port,
+            frames=len(frames),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    def _run(self, syx_file: str, interval_ms: int, timeout_s: float):
+        # CRITICAL: --sysex-interval is required for reliable transfer!
+        return subprocess.run(
+            ["amidi", "-p", self.port, f"--sysex-interval={interval_ms}", "-s", syx_file],
+            capture_output=True,
+            text=True,
+            timeout=timeout_s,
+            check=False,
+        )
+
+    def close(self) -> None:
+        pass
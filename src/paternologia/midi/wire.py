@@ -0,0 +1,99 @@
+# ABOUTME: Compact binary frames for the /live/ws WebSocket (struct-packed, big-endian).
+# ABOUTME: Server pushes song changes, MIDI activity and job progress; clients send commands.
+
+import struct
+
+# Server → client
+SONG_CHANGE = 0x01    # u32 event_id, str8 song_id, str32 html (empty = fetch /live/song/{id})
+MIDI_ACTIVITY = 0x02  # u32 event_id, u8 channel, u8 program (255/255 = chosen in UI), str8 song_id
+JOB_PROGRESS = 0x03   # u32 event_id, u16 sent, u16 total, str8 job_id, str8 state, str8 song_id
+REPLY = 0x7E          # u8 command, u8 ok, str16 message
+
+# Client → server
+SELECT_SONG = 0x81    # str8 song_id
+FIRE_BUTTON = 0x82    # str8 song_id, u8 button index (0-based)
+
+_HEAD = struct.Struct(">BI")
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+
+class FrameError(ValueError):
+    """Malformed or unknown client frame."""
+
+
+def _str8(value: str) -> bytes:
+    raw = value.encode()[:255]
+    return _U8.pack(len(raw)) + raw
+
+
+def _str16(value: str) -> bytes:
+    raw = value.encode()[:65535]
+    return _U16.pack(len(raw)) + raw
+
+
+def _str32(value: str) -> bytes:
+    raw = value.encode()
+    return _U32.pack(len(raw)) + raw
+
+
+def song_change(event_id: int, song_id: str, html: str | None) -> bytes:
+    return _HEAD.pack(SONG_CHANGE, event_id) + _str8(song_id) + _str32(html or "")
+
+
+def midi_activity(event_id: int, channel: int, program: int, song_id: str) -> bytes:
+    return _HEAD.pack(MIDI_ACTIVITY, event_id) + bytes((channel & 0xFF, program & 0xFF)) + _str8(song_id)
+
+
+def job_progress(event_id: int, data: dict) -> bytes:
+    counts = struct.pack(">HH", min(data.get("sent", 0), 65535), min(data.get("total", 0), 65535))
+    return (
+        _HEAD.pack(JOB_PROGRESS, event_id) + counts
+        + _str8(data["job_id"]) + _str8(data["state"]) + _str8(data.get("song_id") or "")
+    )
+
+
+def reply(command: int, ok: bool, message: str = "") -> bytes:
+    return bytes((REPLY, command, int(ok))) + _str16(message)
+
+
+def select_song(song_id: str) -> bytes:
+    return bytes((SELECT_SONG,)) + _str8(song_id)
+
+
+def fire_button(song_id: str, button: int) -> bytes:
+    return bytes((FIRE_BUTTON,)) + _str8(song_id) + bytes((button,))
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    def take(self, n: int) -> bytes:
+        chunk = self._data[self._pos:self._pos + n]
+        if len(chunk) != n:
+            raise FrameError("Frame too short")
+        self._pos += n
+        return chunk
+
+    def u8(self) -> int:
+        return self.take(1)[0]
+
+    def str8(self) -> str:
+        try:
+            return self.take(self.u8()).decode()
+        except UnicodeDecodeError as e:
+            raise FrameError(f"Invalid UTF-8: {e}") from e
+
+
+def parse_command(data: bytes) -> tuple[int, dict]:
+    """Client frame → (command, arguments). Raises FrameError."""
+    reader = _Reader(data)
+    command = reader.u8()
+    if command == SELECT_SONG:
+        return command, {"song_id": reader.str8()}
+    if command == FIRE_BUTTON:
+        return command, {"song_id": reader.str8(), "button": reader.u8()}
+    raise FrameError(f"Unknown command 0x{command:02x}")
@@ -1,6 +1,7 @@
 # ABOUTME: Pydantic models for Paternologia - MIDI device configurations and songs.
 # ABOUTME: Defines Device, Action, PacerButton, DeviceSettings, and Song schemas.
 
+import hashlib
 import re
 from datetime import date
 from enum import Enum
@@ -35,6 +36,14 @@ class Device(BaseModel):
     )
 
 
+def split_preset_number(value: int, bank_msb: int = 0, bank_lsb: int = 0) -> tuple[int, int, int]:
+    """Preset number → (bank MSB, bank LSB, program) as sent on the wire (CC0, CC32, PC).
+
+    Numbers above 127 carry into the bank MSB: 130 → (1, 0, 2).
+    """
+    return min(bank_msb + value // 128, 127), bank_lsb, value % 128
+
+
 class DevicesConfig(BaseModel):
     """Configuration file structure for devices.yaml."""
 
@@ -97,6 +106,9 @@ class PacerButton(BaseModel):
 
 VALID_PRESETS = {f"{row}{col}" for row in "ABCD" for col in range(1, 7)}
 
+# Song ID = nazwa pliku w songs/ (kebab-case, bez ścieżek)
+SONG_ID_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
 
 class PacerExportSettings(BaseModel):
     """Ustawienia eksportu/transferu do Pacera."""
@@ -116,6 +128,14 @@ class PacerExportSettings(BaseModel):
         return v
 
 
+class PacerTransport(str, Enum):
+    """How SysEx is sent to the Pacer."""
+
+    AUTO = "auto"      # rtmidi, fallback to amidi
+    RTMIDI = "rtmidi"
+    AMIDI = "amidi"
+
+
 class PacerConfig(BaseModel):
     """Globalna konfiguracja portu amidi."""
 
@@ -135,6 +155,20 @@ class PacerConfig(BaseModel):
         le=100,
         description="Interwał między wiadomościami SysEx w ms (CRITICAL: 20 wymagane!)",
     )
+    coalesce_frames: bool = Field(
+        default=False,
+        description="Pakuj mode/steps/LED jednej kontrolki w mniej ramek SysEx (szybsza wysyłka)",
+    )
+    transport: PacerTransport = Field(
+        default=PacerTransport.AUTO,
+        description="Transport SysEx: rtmidi (bez procesów i plików), amidi lub auto",
+    )
+    prefetch_window: int = Field(
+        default=0,
+        ge=0,
+        le=23,
+        description="Tryb koncertowy: wgrywaj w tle N kolejnych utworów setlisty (0 = wyłączone)",
+    )
 
 
 class SongMetadata(BaseModel):
@@ -155,7 +189,7 @@ class SongMetadata(BaseModel):
     def validate_id(cls, v: str) -> str:
         """Wymusza kebab-case i bezpieczne ID dla plików."""
         v = v.strip()
-        if not re.fullmatch(r"[a-z0-9]+(?:-[a-z0-9]+)*", v):
+        if not SONG_ID_PATTERN.fullmatch(v):
             raise ValueError("Song ID musi być kebab-case: małe litery, cyfry, myślniki.")
         return v
 
@@ -167,3 +201,44 @@ class Song(BaseModel):
     pacer: Annotated[list[PacerButton], Field(max_length=6)] = Field(
         default_factory=list, description="PACER button configurations (max 6)"
     )
+
+
+def content_hash(*models: BaseModel | list[BaseModel]) -> str:
+    """Stable hash of model content (used for caches and ETags)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for model in models:
+        items = model if isinstance(model, list) else [model]
+        for item in items:
+            digest.update(item.model_dump_json().encode("utf-8"))
+            digest.update(b"\x00")
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+class SongSummary(BaseModel):
+    """Lightweight song description for the song list (no actions)."""
+
+    id: str
+    name: str
+    notes: str = ""
+    target_preset: str = "A1"
+    button_count: int = 0
+    devices: list[str] = Field(default_factory=list, description="Device IDs used by actions")
+    content_hash: str = Field(..., description="content_hash() of the full Song")
+
+    @classmethod
+    def from_song(cls, song: Song) -> "SongSummary":
+        """Summarize a fully loaded song."""
+        devices: dict[str, None] = {}
+        for button in song.pacer:
+            for action in button.actions:
+                devices[action.device] = None
+        return cls(
+            id=song.song.id,
+            name=song.song.name,
+            notes=song.song.notes,
+            target_preset=song.song.pacer_export.target_preset,
+            button_count=len(song.pacer),
+            devices=list(devices),
+            content_hash=content_hash(song),
+        )
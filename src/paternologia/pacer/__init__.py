@@ -1,6 +1,7 @@
 # ABOUTME: Pacer module for generating Nektar Pacer SysEx files.
-# ABOUTME: Provides export_song_to_syx() function and SysEx building utilities.
+# ABOUTME: Provides export_song_to_syx() function, SysEx building utilities and the .syx cache.
 
+from .cache import SysExCache
 from .export import export_song_to_syx
 
-__all__ = ["export_song_to_syx"]
+__all__ = ["SysExCache", "export_song_to_syx"]
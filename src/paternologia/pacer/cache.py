@@ -0,0 +1,126 @@
+# ABOUTME: LRU cache of exported .syx artifacts, persisted as files on disk.
+# ABOUTME: Keyed by (song content hash, device channel map hash, target preset, frame layout).
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from ..models import Device, Song, content_hash
+from .export import export_song_frames
+from .mappings import build_device_channel_map
+
+logger = logging.getLogger(__name__)
+
+SysExKey = tuple[str, str, str, str]
+
+DEFAULT_MAX_ENTRIES = 64
+
+
+def channel_map_hash(devices: list[Device]) -> str:
+    """Hash only what the export reads from devices: device_id → MIDI channel."""
+    channel_map = build_device_channel_map(devices)
+    payload = json.dumps(channel_map, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def sysex_key(
+    song_hash: str, devices: list[Device], preset: str, coalesce: bool = False
+) -> SysExKey:
+    """Cache key; changes whenever the song, a device channel or the frame layout changes."""
+    layout = "packed" if coalesce else "std"
+    return (song_hash, channel_map_hash(devices), preset.upper(), layout)
+
+
+class SysExCache:
+    """Bounded LRU of .syx files in cache_dir.
+
+    Entries are never invalidated explicitly: editing a song or devices.yaml
+    changes the key, and stale artifacts age out through LRU eviction.
+    Files survive restarts and are served directly (FileResponse / amidi -s).
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[SysExKey, Path] = OrderedDict()
+        self._lock = threading.Lock()
+        self._adopt_existing()
+
+    def _path_for(self, key: SysExKey) -> Path:
+        return self.cache_dir / f"{'-'.join(key)}.syx"
+
+    def _adopt_existing(self) -> None:
+        """Load artifacts left by a previous run, oldest first."""
+        if not self.cache_dir.exists():
+            return
+        files = sorted(self.cache_dir.glob("*.syx"), key=lambda p: p.stat().st_mtime_ns)
+        for path in files:
+            parts = tuple(path.stem.split("-"))
+            if len(parts) != 4:
+                # Old file name format: can never be hit again
+                path.unlink(missing_ok=True)
+                continue
+            self._entries[parts] = path
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            _, path = self._entries.popitem(last=False)
+            path.unlink(missing_ok=True)
+
+    def get(self, key: SysExKey) -> Path | None:
+        """Path of a cached artifact (marks it most recently used)."""
+        with self._lock:
+            path = self._entries.get(key)
+            if path is not None and path.exists():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return path
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: SysExKey, data: bytes) -> Path:
+        """Store artifact atomically and evict least recently used ones."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path_for(key)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._entries[key] = path
+            self._entries.move_to_end(key)
+            self._evict()
+        return path
+
+    def get_or_build(self, key: SysExKey, build: Callable[[], bytes]) -> Path:
+        """Return cached artifact path, building it on a miss."""
+        path = self.get(key)
+        if path is None:
+            path = self.put(key, build())
+            logger.debug("Cached SysEx %s", path.name)
+        return path
+
+    def export(
+        self, song: Song, devices: list[Device], preset: str, coalesce: bool = False
+    ) -> Path:
+        """Cached equivalent of export_song_to_syx(); returns the .syx file path."""
+        key = sysex_key(content_hash(song), devices, preset, coalesce)
+        return self.get_or_build(
+            key,
+            lambda: b"".join(export_song_frames(song, devices, preset, coalesce=coalesce)),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._entries.values():
+                path.unlink(missing_ok=True)
+            self._entries.clear()
@@ -21,6 +21,11 @@ CONTROL_NAME = 0x01  # Object ID dla nazwy presetu
 # Element IDs
 CONTROL_MODE_ELEMENT = 0x60  # Element dla trybu kontrolki
 
+# Tryb coalesce: max elementów w jednej ramce kontrolki. Firmware przyjmuje
+# wiele elementów w ramce (krok = 6), limit trzyma ramkę < 80 bajtów
+# na wypadek ograniczonego bufora SysEx w Pacerze.
+COALESCE_MAX_ELEMENTS = 16
+
 # Message types (używane w control step data)
 MSG_CTRL_OFF = 0x61       # Kontrolka wyłączona
 MSG_SW_PRG_BANK = 0x45    # Program Change + Bank: data1=program, data2=bank LSB, data3=bank MSB
@@ -1,5 +1,5 @@
 # ABOUTME: Main export function for generating Pacer .syx files from songs.
-# ABOUTME: Concatenates SysEx messages for preset name and control steps.
+# ABOUTME: Builds SysEx messages for preset name and control steps (as frames or one blob).
 
 from ..models import Song, Device
 from .sysex import PacerSysExBuilder
@@ -22,6 +22,34 @@ def export_song_to_syx(
     Returns:
         bytes: Zawartość pliku .syx (konkatenacja wiadomości)
     """
+    return b"".join(export_song_frames(song, devices, target_preset))
+
+
+def split_frames(syx_data: bytes) -> list[bytes]:
+    """Podziel zawartość .syx na pojedyncze ramki F0 ... F7."""
+    frames = []
+    start = 0
+    while start < len(syx_data):
+        end = syx_data.index(c.SYSEX_END, start) + 1
+        frames.append(syx_data[start:end])
+        start = end
+    return frames
+
+
+def export_song_frames(
+    song: Song,
+    devices: list[Device],
+    target_preset: str = "A1",
+    coalesce: bool = False
+) -> list[bytes]:
+    """Eksportuj piosenkę jako listę ramek SysEx (stała kolejność i liczba ramek).
+
+    Kolejność: nazwa presetu, potem dla SW1-SW6: mode, 6 × step, 6 × LED.
+    Pozycja ramki identyfikuje ten sam element presetu między eksportami.
+
+    coalesce=True pakuje elementy jednej kontrolki w mniej ramek
+    (COALESCE_MAX_ELEMENTS na ramkę) - te same elementy, ta sama kolejność.
+    """
     preset_index = c.PRESET_INDICES[target_preset.upper()]
     builder = PacerSysExBuilder(preset_index)
     messages = []
@@ -36,9 +64,10 @@ def export_song_to_syx(
     for btn_idx in range(6):  # Zawsze przetwarzaj wszystkie 6 przycisków
         control_id = c.STOMPSWITCHES[btn_idx]
         button = song.pacer[btn_idx] if btn_idx < len(song.pacer) else None
+        groups = []
 
         # 2a. Control Mode (musi być przed steps!) - mode=0 = "all steps in one shot"
-        messages.append(builder.build_control_mode(control_id, mode=0))
+        groups.append(builder.control_mode_elements(mode=0))
 
         # 2b. Zawsze konfiguruj wszystkie 6 kroków (czyszczenie niewykorzystanych)
         for step_idx in range(1, 7):
@@ -48,8 +77,7 @@ def export_song_to_syx(
                 msg_type, channel, data1, data2, data3 = action_to_midi(
                     action, device_channel_map
                 )
-                messages.append(builder.build_control_step(
-                    control_id=control_id,
+                groups.append(builder.control_step_elements(
                     step_index=step_idx,
                     msg_type=msg_type,
                     channel=channel,
@@ -60,8 +88,7 @@ def export_song_to_syx(
                 ))
             else:
                 # Brak akcji - wyczyść krok (MSG_CTRL_OFF, active=False)
-                messages.append(builder.build_control_step(
-                    control_id=control_id,
+                groups.append(builder.control_step_elements(
                     step_index=step_idx,
                     msg_type=c.MSG_CTRL_OFF,
                     channel=0,
@@ -75,19 +102,27 @@ def export_song_to_syx(
         has_actions = button and len(button.actions) > 0
         for step_idx in range(1, 7):
             if has_actions:
-                messages.append(builder.build_control_led(
-                    control_id=control_id,
+                groups.append(builder.control_led_elements(
                     step_index=step_idx,
                     active_color=c.LED_BLUE,
                     inactive_color=c.LED_AMBER
                 ))
             else:
                 # Przycisk bez akcji - LED wyłączony
-                messages.append(builder.build_control_led(
-                    control_id=control_id,
+                groups.append(builder.control_led_elements(
                     step_index=step_idx,
                     active_color=c.LED_OFF,
                     inactive_color=c.LED_OFF
                 ))
 
-    return b"".join(messages)
+        if coalesce:
+            elements = [element for group in groups for element in group]
+            messages.extend(builder.build_control_elements(control_id, elements))
+        else:
+            # Jedna ramka na grupę (mode / step / LED) - format kompatybilny wstecz
+            for group in groups:
+                messages.extend(
+                    builder.build_control_elements(control_id, group, max_elements=len(group))
+                )
+
+    return messages
@@ -0,0 +1,219 @@
+# ABOUTME: Per-port serialized queue of Pacer send jobs with dedupe, cancel and progress events.
+# ABOUTME: Jobs run on one worker thread per device; state changes are published on an EventBus.
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable
+
+from ..midi.events import EventBus, JobEvent
+from ..midi.transport import TransportCancelled
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status queries
+KEEP_FINISHED = 50
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINAL_STATES = {JobState.DONE, JobState.FAILED, JobState.CANCELLED}
+
+
+@dataclass
+class PacerJob:
+    """One song → preset send, or a whole-setlist deploy (song_id/preset None)."""
+
+    id: str
+    device: str
+    song_id: str | None
+    preset: str | None
+    force_full: bool = False
+    kind: str = "send"
+    state: JobState = JobState.QUEUED
+    sent: int = 0
+    total: int = 0
+    result: dict | None = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def final(self) -> bool:
+        return self.state in FINAL_STATES
+
+    @property
+    def dedupe_key(self) -> tuple:
+        return (self.kind, self.device, self.song_id, self.preset, self.force_full)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "song_id": self.song_id,
+            "preset": self.preset,
+            "state": self.state.value,
+            "sent": self.sent,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+# runner(job, progress(sent, total)) → result dict; raises on failure
+# (an exception's .result, if set, is kept as the job's partial result)
+JobRunner = Callable[[PacerJob, Callable[[int, int], None]], dict]
+
+
+class PacerJobQueue:
+    """Queues send jobs per device and runs them one at a time per device.
+
+    submit() returns immediately; an identical job that is still queued is
+    returned instead of adding a duplicate. cancel() drops a queued job or
+    asks a running one to stop between frames.
+    """
+
+    def __init__(self, runner: JobRunner, events: EventBus | None = None):
+        self._runner = runner
+        self.events = events if events is not None else EventBus()
+        self._lock = threading.Condition()
+        self._queues: dict[str, deque[PacerJob]] = {}
+        self._workers: dict[str, threading.Thread] = {}
+        self._jobs: OrderedDict[str, PacerJob] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    def submit(
+        self,
+        device: str,
+        song_id: str | None,
+        preset: str | None,
+        force_full: bool = False,
+        kind: str = "send",
+    ) -> tuple[PacerJob, bool]:
+        """Queue a job; returns (job, deduped)."""
+        device = device.upper()
+        with self._lock:
+            key = (kind, device, song_id, preset, force_full)
+            for pending in self._queues.get(device, ()):
+                if pending.dedupe_key == key:
+                    return pending, True
+
+            job = PacerJob(
+                id=f"{int(time.time())}-{next(self._ids)}",
+                device=device,
+                song_id=song_id,
+                preset=preset,
+                force_full=force_full,
+                kind=kind,
+            )
+            self._jobs[job.id] = job
+            self._queues.setdefault(device, deque()).append(job)
+            self._ensure_worker(device)
+            self._lock.notify_all()
+        self._publish(job)
+        return job, False
+
+    def get(self, job_id: str) -> PacerJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> PacerJob | None:
+        """Cancel a queued or running job (no-op for finished ones)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.final:
+                return job
+            job.cancel_event.set()
+            queue = self._queues.get(job.device)
+            if job.state == JobState.QUEUED and queue is not None and job in queue:
+                queue.remove(job)
+                job.state = JobState.CANCELLED
+            else:
+                return job  # running: worker reports the outcome
+        self._publish(job)
+        return job
+
+    def close(self) -> None:
+        """Cancel everything and stop workers (app shutdown)."""
+        with self._lock:
+            self._closed = True
+            for queue in self._queues.values():
+                for job in queue:
+                    job.cancel_event.set()
+                    job.state = JobState.CANCELLED
+                queue.clear()
+            for job in self._jobs.values():
+                job.cancel_event.set()
+            workers = list(self._workers.values())
+            self._lock.notify_all()
+        for worker in workers:
+            worker.join(timeout=1.0)
+
+    def _ensure_worker(self, device: str) -> None:
+        """Start the device's worker thread if needed. Caller holds the lock."""
+        worker = self._workers.get(device)
+        if worker is None or not worker.is_alive():
+            worker = threading.Thread(
+                target=self._work, args=(device,), name=f"pacer-jobs-{device}", daemon=True
+            )
+            self._workers[device] = worker
+            worker.start()
+
+    def _work(self, device: str) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues[device]
+                while not queue and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                job = queue.popleft()
+                job.state = JobState.RUNNING
+            self._publish(job)
+            self._run(job)
+            self._publish(job)
+            self._trim()
+
+    def _run(self, job: PacerJob) -> None:
+        def progress(sent: int, total: int) -> None:
+            job.sent, job.total = sent, total
+            self._publish(job)
+
+        try:
+            job.result = self._runner(job, progress)
+            job.state = JobState.DONE
+        except TransportCancelled as e:
+            job.result = getattr(e, "result", None)
+            job.error = str(e)
+            job.state = JobState.CANCELLED
+        except Exception as e:
+            logger.error("Pacer job %s failed: %s", job.id, e)
+            job.result = getattr(e, "result", None)
+            job.error = str(e)
+            job.state = JobState.FAILED
+
+    def _trim(self) -> None:
+        with self._lock:
+            finished = [j.id for j in self._jobs.values() if j.final]
+            for job_id in finished[:-KEEP_FINISHED]:
+                del self._jobs[job_id]
+
+    def _publish(self, job: PacerJob) -> None:
+        try:
+            self.events.publish_threadsafe(
+                JobEvent(job_id=job.id, state=job.state.value, data=job.to_dict())
+            )
+        except RuntimeError:
+            # Event loop already closed (shutdown): nobody is listening
+            pass
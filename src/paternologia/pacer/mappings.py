@@ -3,7 +3,7 @@
 
 import re
 
-from ..models import Action, ActionType, Device
+from ..models import Action, ActionType, Device, split_preset_number
 from . import constants as c
 
 # Mapping note names to semitone offsets (C=0, C#=1, D=2, etc.)
@@ -139,13 +139,12 @@ def action_to_midi(
         # MSG_SW_PRG_BANK wysyła Program Change + Bank Select
         # MSG_SW_PRG_STEP jest do stepowania przez zakresy (nie do pojedynczych PC!)
         # Format: data1=program (0-127), data2=bank LSB, data3=bank MSB
-        bank_msb = program // 128
-        prog = program % 128
+        bank_msb, bank_lsb, prog = split_preset_number(program, action.bank_msb, action.bank_lsb)
         return (
             c.MSG_SW_PRG_BANK,
             channel,
             prog,      # data1 = program (0-127)
-            0,         # data2 = bank LSB
+            bank_lsb,  # data2 = bank LSB
             bank_msb   # data3 = bank MSB
         )
 
@@ -170,3 +169,25 @@ def action_to_midi(
 
     else:
         raise ValueError(f"Nieobsługiwany typ akcji: {action.type}")
+
+
+def action_to_messages(action: Action, device_channel_map: dict[str, int]) -> list[list[int]]:
+    """Short MIDI messages the Pacer sends for an action (press + release).
+
+    Same parameters as action_to_midi(), so firing a button from the app
+    matches pressing it on the Pacer: Bank Select + PC for presets, PC for
+    patterns, CC down/up, Note On/Off.
+    """
+    msg_type, channel, data1, data2, data3 = action_to_midi(action, device_channel_map)
+    # devices.yaml channels are 1-16, status bytes carry 0-15
+    ch = max(channel - 1, 0) & 0x0F
+
+    if msg_type == c.MSG_SW_PRG_BANK:
+        return [[0xB0 | ch, 0, data3], [0xB0 | ch, 32, data2], [0xC0 | ch, data1]]
+    if msg_type == c.MSG_SW_PRG_STEP:
+        return [[0xC0 | ch, data2]]
+    if msg_type == c.MSG_SW_MIDI_CC:
+        return [[0xB0 | ch, data1, data2], [0xB0 | ch, data1, data3]]
+    if msg_type == c.MSG_SW_NOTE:
+        return [[0x90 | ch, data1, data2], [0x80 | ch, data1, 0]]
+    raise ValueError(f"Nieobsługiwany typ akcji: {action.type}")
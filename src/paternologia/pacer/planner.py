@@ -0,0 +1,129 @@
+# ABOUTME: Assigns setlist songs to the 24 Pacer preset slots (A1-D6) for a whole show.
+# ABOUTME: Belady eviction minimizes uploads; slot choice keeps consecutive songs in adjacent slots.
+
+from dataclasses import asdict, dataclass, field
+
+# Slot order on the device: bank A first, six presets per bank
+PRESET_SLOTS = [f"{row}{col}" for row in "ABCD" for col in range(1, 7)]
+
+NEVER = float("inf")
+
+
+@dataclass
+class PlanStep:
+    """One song in the show: where it plays from and whether it must be uploaded first."""
+
+    setlist: int
+    position: int
+    song_id: str
+    preset: str
+    upload: bool
+
+
+@dataclass
+class SlotPlan:
+    """Slot assignment for a show (one or more setlists played in order).
+
+    initial: song → preset to program before the show (what /pacer/deploy sends).
+    steps: every song played, with uploads needed during the show.
+    """
+
+    steps: list[PlanStep] = field(default_factory=list)
+    initial: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def uploads(self) -> int:
+        """Total preset uploads, including the initial deploy."""
+        return sum(step.upload for step in self.steps)
+
+    @property
+    def uploads_during_show(self) -> int:
+        return self.uploads - len(self.initial)
+
+    @property
+    def adjacent_pairs(self) -> int:
+        """Consecutive songs (same setlist) in neighbouring slots of one bank."""
+        pairs = 0
+        for prev, step in zip(self.steps, self.steps[1:]):
+            if prev.setlist != step.setlist:
+                continue
+            same_bank = prev.preset[0] == step.preset[0]
+            if same_bank and int(step.preset[1:]) == int(prev.preset[1:]) + 1:
+                pairs += 1
+        return pairs
+
+    def as_dict(self) -> dict:
+        return {
+            "initial": self.initial,
+            "uploads": self.uploads,
+            "uploads_during_show": self.uploads_during_show,
+            "adjacent_pairs": self.adjacent_pairs,
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+
+def _next_uses(sequence: list[str]) -> list[float]:
+    """For each position, the next position where the same song plays again."""
+    next_use: list[float] = [NEVER] * len(sequence)
+    seen: dict[str, int] = {}
+    for i in range(len(sequence) - 1, -1, -1):
+        next_use[i] = seen.get(sequence[i], NEVER)
+        seen[sequence[i]] = i
+    return next_use
+
+
+def _distance_after(slot: int, anchor: int, n_slots: int) -> int:
+    """How far slot is after anchor, wrapping around (anchor + 1 → 0)."""
+    return (slot - anchor - 1) % n_slots
+
+
+def plan_slots(setlists: list[list[str]], slots: list[str] = PRESET_SLOTS) -> SlotPlan:
+    """Assign songs of the setlists (played in order) to preset slots.
+
+    A song stays in its slot while it is loaded. When a song that is not
+    loaded comes up and no slot is free, the song played again furthest in
+    the future (or never) is evicted - Belady's rule, optimal for the
+    number of uploads. Among free slots, and among equally good victims,
+    the slot right after the previous song's slot wins, so consecutive
+    songs end up next to each other in a bank. With at most 24 distinct
+    songs every song is uploaded exactly once, before the show.
+    """
+    sequence = [(s, p, song_id) for s, setlist in enumerate(setlists) for p, song_id in enumerate(setlist)]
+    next_use = _next_uses([song_id for _, _, song_id in sequence])
+    n_slots = len(slots)
+
+    plan = SlotPlan()
+    occupant: list[str | None] = [None] * n_slots
+    slot_of: dict[str, int] = {}
+    # When each loaded song plays next (position in sequence)
+    upcoming: dict[str, float] = {}
+    prev_slot = -1
+
+    for i, (setlist_idx, position, song_id) in enumerate(sequence):
+        upload = song_id not in slot_of
+        if upload:
+            free = [k for k in range(n_slots) if occupant[k] is None]
+            if free:
+                candidates = free
+            else:
+                furthest = max(upcoming[occupant[k]] for k in range(n_slots))
+                candidates = [k for k in range(n_slots) if upcoming[occupant[k]] == furthest]
+            slot = min(candidates, key=lambda k: _distance_after(k, prev_slot, n_slots))
+
+            evicted = occupant[slot]
+            if evicted is not None:
+                del slot_of[evicted]
+                del upcoming[evicted]
+            else:
+                # Free slots fill up before any eviction: preload them all
+                plan.initial[song_id] = slots[slot]
+            occupant[slot] = song_id
+            slot_of[song_id] = slot
+
+        slot = slot_of[song_id]
+        upcoming[song_id] = next_use[i]
+        plan.steps.append(PlanStep(setlist_idx, position, song_id, slots[slot], upload))
+        prev_slot = slot
+
+    return plan
+
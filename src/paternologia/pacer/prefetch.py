@@ -0,0 +1,153 @@
+# ABOUTME: Rolling-window prefetch: treats the 24 Pacer presets as an LRU cache during a show.
+# ABOUTME: On each live song change queues uploads of the next N setlist songs into free/LRU slots.
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from ..midi.events import EventBus, MidiEvent
+from ..models import SongSummary
+from .jobs import JobState, PacerJob, PacerJobQueue
+from .planner import PRESET_SLOTS
+
+logger = logging.getLogger(__name__)
+
+
+def assignments_from_summaries(summaries: list[SongSummary]) -> dict[str, str]:
+    """song → preset as /pacer/deploy programs them (first song wins a shared preset)."""
+    taken: dict[str, str] = {}
+    for summary in summaries:
+        taken.setdefault(summary.target_preset.upper(), summary.id)
+    return {song_id: preset for preset, song_id in taken.items()}
+
+
+class PresetPrefetcher:
+    """Keeps the next `window` setlist songs on the device ahead of the player.
+
+    Slots are ordered least → most recently used; empty slots come first.
+    The active preset (song being played) and slots holding upcoming songs
+    are never chosen as victims. Uploads go through the send job queue, so
+    the live MIDI input path only publishes the song change and returns.
+    """
+
+    def __init__(
+        self,
+        jobs: PacerJobQueue,
+        device_name: str,
+        window: int,
+        slots: list[str] = PRESET_SLOTS,
+    ):
+        self._jobs = jobs
+        self._device = device_name
+        self.window = window
+        self._lru: OrderedDict[str, str | None] = OrderedDict((slot, None) for slot in slots)
+        # preset → (upload job id, song it replaces)
+        self._pending: dict[str, tuple[str, str | None]] = {}
+        self._lock = threading.Lock()
+        self.active: str | None = None
+
+    def load(self, assignments: dict[str, str]) -> None:
+        """Record what is on the device now (song → preset), e.g. after a deploy."""
+        with self._lock:
+            for song_id, preset in assignments.items():
+                if preset in self._lru:
+                    self._lru[preset] = song_id
+                    self._lru.move_to_end(preset)
+
+    def slot_of(self, song_id: str) -> str | None:
+        for preset, occupant in self._lru.items():
+            if occupant == song_id:
+                return preset
+        return None
+
+    def _reconcile(self) -> None:
+        """Forget slots whose upload failed or was cancelled (content unknown)."""
+        for preset, (job_id, _) in list(self._pending.items()):
+            job = self._jobs.get(job_id)
+            if job is not None and not job.final:
+                continue
+            del self._pending[preset]
+            if job is None or job.state != JobState.DONE:
+                self._lru[preset] = None
+                self._lru.move_to_end(preset, last=False)
+
+    def _keep_evicted(self, song_id: str) -> None:
+        """The player went to a song a pending upload is about to overwrite: cancel it."""
+        for preset, (job_id, previous) in list(self._pending.items()):
+            if previous != song_id:
+                continue
+            job = self._jobs.cancel(job_id)
+            if job is not None and job.state == JobState.CANCELLED:
+                # Never started: the slot still holds the song
+                del self._pending[preset]
+                self._lru[preset] = song_id
+            logger.info("Prefetch into %s cancelled: '%s' is playing", preset, song_id)
+
+    def on_song(self, song_id: str, setlist: list[str]) -> list[PacerJob]:
+        """Song became active: queue uploads for the upcoming window; returns new jobs."""
+        with self._lock:
+            self._reconcile()
+            self._keep_evicted(song_id)
+            self.active = self.slot_of(song_id)
+            if self.active is not None:
+                self._lru.move_to_end(self.active)
+
+            upcoming: list[str] = []
+            if song_id in setlist:
+                start = setlist.index(song_id) + 1
+                upcoming = [s for s in setlist[start:start + self.window] if s != song_id]
+
+            protected = {self.active} | set(self._pending)
+            # Touch loaded upcoming songs, nearest last = most recently used
+            for upcoming_id in reversed(upcoming):
+                preset = self.slot_of(upcoming_id)
+                if preset is not None:
+                    protected.add(preset)
+                    self._lru.move_to_end(preset)
+
+            submitted = []
+            for upcoming_id in upcoming:
+                if self.slot_of(upcoming_id) is not None:
+                    continue
+                victim = next((p for p in self._lru if p not in protected), None)
+                if victim is None:
+                    break
+                job, _ = self._jobs.submit(self._device, upcoming_id, victim)
+                logger.info(
+                    "Prefetch '%s' → %s (evicts %s)", upcoming_id, victim, self._lru[victim]
+                )
+                self._pending[victim] = (job.id, self._lru[victim])
+                self._lru[victim] = upcoming_id
+                self._lru.move_to_end(victim)
+                protected.add(victim)
+                submitted.append(job)
+            return submitted
+
+    def snapshot(self) -> dict:
+        """Slots in LRU order (least recently used first), active preset, pending uploads."""
+        with self._lock:
+            return {
+                "window": self.window,
+                "active": self.active,
+                "slots": dict(self._lru),
+                "pending": {preset: job_id for preset, (job_id, _) in self._pending.items()},
+            }
+
+    async def follow(self, bus: EventBus, get_setlist: Callable[[], Awaitable[list[str]]]) -> None:
+        """Run on the event loop: react to live song changes published by the MIDI listener."""
+        queue = bus.subscribe()
+        try:
+            while True:
+                event = await queue.get()
+                if not isinstance(event, MidiEvent):
+                    continue
+                try:
+                    self.on_song(event.song_id, await get_setlist())
+                except Exception as e:
+                    logger.warning("Prefetch after '%s' failed: %s", event.song_id, e)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            bus.unsubscribe(queue)
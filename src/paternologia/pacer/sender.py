@@ -0,0 +1,283 @@
+# ABOUTME: Sends SysEx to the Pacer: export, shadow diff, transport, shadow update.
+# ABOUTME: One song (send_song) or the whole setlist in one stream (deploy_setlist).
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator
+
+from ..midi.pool import MidiOutPool
+from ..midi.ports import find_amidi_port
+from ..midi.transport import (
+    AmidiTransport,
+    RtMidiTransport,
+    SysExTransport,
+    TransportCancelled,
+    TransportError,
+)
+from ..models import Device, PacerConfig, PacerTransport, Song
+from .cache import SysExCache
+from .export import split_frames
+from .shadow import PacerShadow
+from .sysex import estimate_transfer_ms
+
+logger = logging.getLogger(__name__)
+
+# progress(sent, total)
+ProgressCallback = Callable[[int, int], None]
+
+
+class SendError(Exception):
+    """Send could not start or failed; the message is shown to the user."""
+
+
+@dataclass
+class SendResult:
+    preset: str
+    port: str
+    transport: str
+    frames_sent: int
+    frames_total: int
+    ms_saved: int
+    elapsed_ms: int
+
+    def as_dict(self) -> dict:
+        return {"status": "ok", **asdict(self)}
+
+
+@dataclass
+class DeploySong:
+    """Outcome for one setlist entry.
+
+    status: sent | unchanged | conflict (preset taken by an earlier song)
+    | missing (not in library) | failed | cancelled.
+    """
+
+    song_id: str
+    preset: str
+    status: str
+    frames_sent: int = 0
+    frames_total: int = 0
+    detail: str = ""
+
+
+@dataclass
+class DeployResult:
+    port: str
+    transport: str
+    frames_sent: int
+    frames_total: int
+    ms_saved: int
+    elapsed_ms: int
+    songs: list[DeploySong] = field(default_factory=list)
+    status: str = "ok"
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@contextmanager
+def sysex_transport(
+    pacer_config: PacerConfig, pool: MidiOutPool | None
+) -> Iterator[SysExTransport]:
+    """rtmidi output port if available (unless amidi forced), else amidi port.
+
+    The rtmidi port is leased from the app's MidiOutPool (kept open between
+    sends); without a pool a dedicated port is opened and closed.
+    Raises SendError if no port is found.
+    """
+    device_name = pacer_config.device_name
+    if pacer_config.transport != PacerTransport.AMIDI:
+        if pool is not None:
+            with pool.lease(device_name, timeout_s=pacer_config.amidi_timeout_seconds) as transport:
+                if transport is not None:
+                    yield transport
+                    return
+        else:
+            transport = RtMidiTransport.open(device_name)
+            if transport is not None:
+                try:
+                    yield transport
+                finally:
+                    transport.close()
+                return
+
+    port = None
+    if pacer_config.transport != PacerTransport.RTMIDI:
+        port = find_amidi_port(device_name)
+    if not port:
+        hint = "amidi -l" if pacer_config.transport == PacerTransport.AMIDI else "amidi -l / aconnect -l"
+        raise SendError(
+            f"Nie znaleziono urządzenia '{device_name}'. "
+            f"Sprawdź połączenie i uruchom '{hint}'."
+        )
+    yield AmidiTransport(port)
+
+
+def send_song(
+    song: Song,
+    devices: list[Device],
+    target: str,
+    pacer_config: PacerConfig,
+    transport: SysExTransport,
+    sysex_cache: SysExCache,
+    shadow: PacerShadow,
+    force_full: bool = False,
+    progress: ProgressCallback | None = None,
+    cancel: threading.Event | None = None,
+) -> SendResult:
+    """Send the frames of song → target that differ from the shadow (all with force_full).
+
+    The shadow is updated on success and forgotten on failure or cancel
+    (the preset's state on the device is then unknown).
+    """
+    sysex_interval = pacer_config.sysex_interval_ms
+    syx_path = sysex_cache.export(song, devices, target, coalesce=pacer_config.coalesce_frames)
+    frames = split_frames(syx_path.read_bytes())
+    shadow_device = pacer_config.device_name
+
+    if force_full:
+        to_send = frames
+    else:
+        to_send = shadow.diff(shadow_device, target, frames).frames
+    ms_saved = (len(frames) - len(to_send)) * sysex_interval
+
+    result = SendResult(
+        preset=target,
+        port=transport.port,
+        transport=transport.name,
+        frames_sent=len(to_send),
+        frames_total=len(frames),
+        ms_saved=ms_saved,
+        elapsed_ms=0,
+    )
+    if not to_send:
+        if progress is not None:
+            progress(0, 0)
+        return result
+
+    on_frame = None
+    if progress is not None:
+        def on_frame(timing):
+            progress(timing.index + 1, len(to_send))
+
+    try:
+        report = transport.send(
+            to_send,
+            interval_ms=sysex_interval,
+            timeout_s=pacer_config.amidi_timeout_seconds,
+            on_frame=on_frame,
+            # Pełna wysyłka: amidi czyta plik z cache bez kopii tymczasowej
+            syx_file=syx_path if len(to_send) == len(frames) else None,
+            cancel=cancel,
+        )
+    except TransportError:
+        shadow.forget(shadow_device, target)
+        raise
+
+    shadow.update(shadow_device, target, frames)
+    result.elapsed_ms = round(report.elapsed_ms)
+    return result
+
+
+def deploy_setlist(
+    setlist: list[tuple[str, Song | None]],
+    devices: list[Device],
+    pacer_config: PacerConfig,
+    transport: SysExTransport,
+    sysex_cache: SysExCache,
+    shadow: PacerShadow,
+    force_full: bool = False,
+    progress: ProgressCallback | None = None,
+    cancel: threading.Event | None = None,
+) -> DeployResult:
+    """Program every setlist song into its pacer_export.target_preset in one paced stream.
+
+    Frames already on the device (per shadow) are skipped and the rest of
+    all songs go out in a single transport.send(). When two songs target
+    the same preset the first one in the setlist wins. On failure or cancel
+    songs whose frames all went out keep their shadow, the rest are
+    forgotten; the partial result is attached to the exception as .result.
+    """
+    interval = pacer_config.sysex_interval_ms
+    shadow_device = pacer_config.device_name
+    entries: list[DeploySong] = []
+    # (entry, all frames of its preset, end offset of its frames in stream)
+    batches: list[tuple[DeploySong, list[bytes], int]] = []
+    stream: list[bytes] = []
+    owners: dict[str, str] = {}
+
+    for song_id, song in setlist:
+        if song is None:
+            entries.append(DeploySong(song_id, "", "missing"))
+            continue
+        target = song.song.pacer_export.target_preset.upper()
+        entry = DeploySong(song_id, target, "sent")
+        entries.append(entry)
+        if target in owners:
+            entry.status = "conflict"
+            entry.detail = f"Preset {target} zajęty przez '{owners[target]}'"
+            continue
+        owners[target] = song_id
+
+        syx_path = sysex_cache.export(song, devices, target, coalesce=pacer_config.coalesce_frames)
+        frames = split_frames(syx_path.read_bytes())
+        to_send = frames if force_full else shadow.diff(shadow_device, target, frames).frames
+        entry.frames_total = len(frames)
+        entry.frames_sent = len(to_send)
+        if not to_send:
+            entry.status = "unchanged"
+            continue
+        stream.extend(to_send)
+        batches.append((entry, frames, len(stream)))
+
+    frames_total = sum(e.frames_total for e in entries)
+    result = DeployResult(
+        port=transport.port,
+        transport=transport.name,
+        frames_sent=len(stream),
+        frames_total=frames_total,
+        ms_saved=(frames_total - len(stream)) * interval,
+        elapsed_ms=0,
+        songs=entries,
+    )
+    if not stream:
+        if progress is not None:
+            progress(0, 0)
+        return result
+
+    sent = 0
+
+    def on_frame(timing):
+        nonlocal sent
+        sent = timing.index + 1
+        if progress is not None:
+            progress(sent, len(stream))
+
+    # Configured timeout covers one song; the whole stream gets its estimate on top
+    timeout_s = pacer_config.amidi_timeout_seconds + 2 * estimate_transfer_ms(stream, interval) / 1000
+    try:
+        report = transport.send(
+            stream,
+            interval_ms=interval,
+            timeout_s=timeout_s,
+            on_frame=on_frame,
+            cancel=cancel,
+        )
+    except TransportError as e:
+        outcome = "cancelled" if isinstance(e, TransportCancelled) else "failed"
+        for entry, frames, end in batches:
+            if end <= sent:
+                shadow.update(shadow_device, entry.preset, frames)
+            else:
+                shadow.forget(shadow_device, entry.preset)
+                entry.status = outcome
+        result.status = outcome
+        e.result = result.as_dict()
+        raise
+
+    for entry, frames, _ in batches:
+        shadow.update(shadow_device, entry.preset, frames)
+    result.elapsed_ms = round(report.elapsed_ms)
+    return result
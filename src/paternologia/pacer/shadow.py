@@ -0,0 +1,97 @@
+# ABOUTME: Shadow copy of what each Pacer preset currently contains.
+# ABOUTME: Lets /pacer/send transmit only the SysEx frames that differ from the device.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SHADOW_VERSION = 1
+
+
+def frame_digest(frame: bytes) -> str:
+    return hashlib.blake2b(frame, digest_size=8).hexdigest()
+
+
+@dataclass
+class FrameDiff:
+    """Frames to send for one preset and how many were skipped."""
+
+    frames: list[bytes]
+    total: int
+
+    @property
+    def skipped(self) -> int:
+        return self.total - len(self.frames)
+
+
+class PacerShadow:
+    """Per (device, preset) digests of the frames last sent successfully.
+
+    Frames are compared by position (export_song_frames() has a fixed
+    layout). The shadow is only updated after a successful send; edits made
+    on the Pacer itself are not seen, so callers offer a force-full send.
+    """
+
+    def __init__(self, shadow_file: Path):
+        self.shadow_file = Path(shadow_file)
+        self._lock = threading.Lock()
+        self._state: dict[str, dict[str, list[str]]] | None = None
+
+    def _load(self) -> dict[str, dict[str, list[str]]]:
+        if self._state is None:
+            self._state = {}
+            try:
+                raw = json.loads(self.shadow_file.read_text(encoding="utf-8"))
+                if raw.get("version") == SHADOW_VERSION:
+                    self._state = raw["devices"]
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError, AttributeError) as e:
+                logger.warning("Ignoring unreadable Pacer shadow %s: %s", self.shadow_file, e)
+        return self._state
+
+    def _write(self) -> None:
+        self.shadow_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.shadow_file.with_name(f".{self.shadow_file.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"version": SHADOW_VERSION, "devices": self._state}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.shadow_file)
+
+    def diff(self, device: str, preset: str, frames: list[bytes]) -> FrameDiff:
+        """Frames that differ from the shadow (all of them if the preset is unknown)."""
+        with self._lock:
+            known = self._load().get(device, {}).get(preset)
+        if known is None or len(known) != len(frames):
+            return FrameDiff(frames=list(frames), total=len(frames))
+
+        changed = [
+            frame for frame, digest in zip(frames, known)
+            if frame_digest(frame) != digest
+        ]
+        return FrameDiff(frames=changed, total=len(frames))
+
+    def update(self, device: str, preset: str, frames: list[bytes]) -> None:
+        """Record that the preset now holds exactly these frames."""
+        with self._lock:
+            self._load().setdefault(device, {})[preset] = [frame_digest(f) for f in frames]
+            self._write()
+
+    def forget(self, device: str, preset: str | None = None) -> None:
+        """Drop knowledge of one preset (or the whole device), forcing a full send."""
+        with self._lock:
+            presets = self._load().get(device)
+            if presets is None:
+                return
+            if preset is None:
+                del self._state[device]
+            else:
+                presets.pop(preset, None)
+            self._write()
@@ -9,12 +9,115 @@ def checksum(data: bytes) -> int:
     return (128 - (sum(data) % 128)) % 128
 
 
+# Transmisja MIDI DIN: 31250 bit/s, 10 bitów na bajt → 0.32 ms/bajt
+MIDI_MS_PER_BYTE = 0.32
+
+Element = tuple[int, int]  # (element_id, wartość)
+
+
+def encode_elements(elements: list[Element]) -> bytes:
+    """Koduj elementy jako [element, 0x01, wartość, 0x00]; ostatni bez paddingu."""
+    params = []
+    for element_id, value in elements:
+        params.extend([element_id, 0x01, value, 0x00])
+    return bytes(params[:-1])
+
+
+def decode_elements(frame: bytes) -> tuple[int, list[Element]]:
+    """Odwrotność ramki kontrolki: (control_id, [(element, wartość), ...])."""
+    # F0 + manufacturer(3) + device, cmd, target, preset, control
+    body = frame[1 + len(c.MANUFACTURER_ID) + 5:-2] + b"\x00"
+    control_id = frame[1 + len(c.MANUFACTURER_ID) + 4]
+    elements = [(body[i], body[i + 2]) for i in range(0, len(body), 4)]
+    return control_id, elements
+
+
+def estimate_transfer_ms(frames: list[bytes], interval_ms: int) -> float:
+    """Szacowany czas wysyłki (amidi --sysex-interval): bajty na kablu + przerwy."""
+    if not frames:
+        return 0.0
+    wire_ms = sum(len(f) for f in frames) * MIDI_MS_PER_BYTE
+    return wire_ms + (len(frames) - 1) * interval_ms
+
+
 class PacerSysExBuilder:
     """Buduje pojedyncze wiadomości SysEx."""
 
     def __init__(self, preset_index: int):
         self.preset_index = preset_index
 
+    def _build_control_frame(self, control_id: int, params: bytes) -> bytes:
+        """Ramka SysEx dla kontrolki (header bez Element, elementy w danych)."""
+        header = bytes([
+            c.DEVICE_ID,
+            c.CMD_SET,
+            c.TARGET_PRESET,
+            self.preset_index,
+            control_id
+        ])
+        payload = c.MANUFACTURER_ID + header + params
+        cs = checksum(payload)
+        return bytes([c.SYSEX_START]) + payload + bytes([cs, c.SYSEX_END])
+
+    @staticmethod
+    def control_step_elements(
+        step_index: int,
+        msg_type: int,
+        channel: int,
+        data1: int,
+        data2: int = 0,
+        data3: int = 0,
+        active: bool = True
+    ) -> list[Element]:
+        """Elementy kroku: element_id = (step_index-1)*6 + offset."""
+        base = (step_index - 1) * 6
+        return [
+            (base + 1, channel),      # Channel
+            (base + 2, msg_type),     # Message type
+            (base + 3, data1),        # Data 1
+            (base + 4, data2),        # Data 2
+            (base + 5, data3),        # Data 3
+            (base + 6, int(active)),  # Active
+        ]
+
+    @staticmethod
+    def control_mode_elements(mode: int = 0) -> list[Element]:
+        return [(c.CONTROL_MODE_ELEMENT, mode)]
+
+    @staticmethod
+    def control_led_elements(
+        step_index: int,
+        active_color: int = c.LED_AMBER,
+        inactive_color: int = c.LED_OFF,
+        led_midi_ctrl: int = 0,
+        led_num: int = 0
+    ) -> list[Element]:
+        """Elementy LED: step1=0x40-0x43, step2=0x44-0x47, etc."""
+        base = (step_index - 1) * 4 + 0x40
+        return [
+            (base + 0, led_midi_ctrl),
+            (base + 1, active_color),
+            (base + 2, inactive_color),
+            (base + 3, led_num),
+        ]
+
+    def build_control_elements(
+        self,
+        control_id: int,
+        elements: list[Element],
+        max_elements: int = c.COALESCE_MAX_ELEMENTS
+    ) -> list[bytes]:
+        """Spakuj elementy jednej kontrolki w jak najmniej ramek.
+
+        Kolejność elementów jest zachowana (mode musi być przed steps).
+        """
+        return [
+            self._build_control_frame(
+                control_id, encode_elements(elements[i:i + max_elements])
+            )
+            for i in range(0, len(elements), max_elements)
+        ]
+
     def _build_preset_name_frame(self, data: bytes) -> bytes:
         """Ramka SysEx dla preset name (z Element w headerze)."""
         header = bytes([
@@ -53,27 +156,10 @@ class PacerSysExBuilder:
         gdzie element_id = (step_index-1)*6 + offset
         Ostatni parametr (active) NIE ma paddingu 0x00.
         """
-        base = (step_index - 1) * 6
-        params = []
-
-        # Każdy parametr: [element, object_type=0x01, value, padding=0x00]
-        params.extend([base + 1, 0x01, channel, 0x00])      # Channel
-        params.extend([base + 2, 0x01, msg_type, 0x00])     # Message type
-        params.extend([base + 3, 0x01, data1, 0x00])        # Data 1
-        params.extend([base + 4, 0x01, data2, 0x00])        # Data 2
-        params.extend([base + 5, 0x01, data3, 0x00])        # Data 3
-        params.extend([base + 6, 0x01, int(active)])        # Active (bez paddingu)
-
-        header = bytes([
-            c.DEVICE_ID,
-            c.CMD_SET,
-            c.TARGET_PRESET,
-            self.preset_index,
-            control_id
-        ])
-        payload = c.MANUFACTURER_ID + header + bytes(params)
-        cs = checksum(payload)
-        return bytes([c.SYSEX_START]) + payload + bytes([cs, c.SYSEX_END])
+        elements = self.control_step_elements(
+            step_index, msg_type, channel, data1, data2, data3, active
+        )
+        return self._build_control_frame(control_id, encode_elements(elements))
 
     def build_control_mode(
         self,
@@ -86,18 +172,8 @@ class PacerSysExBuilder:
             control_id: ID kontrolki (0x0D-0x12 dla SW1-SW6)
             mode: Tryb (0=all steps in one shot, 1=toggle, etc.)
         """
-        params = [c.CONTROL_MODE_ELEMENT, 0x01, mode]
-
-        header = bytes([
-            c.DEVICE_ID,
-            c.CMD_SET,
-            c.TARGET_PRESET,
-            self.preset_index,
-            control_id
-        ])
-        payload = c.MANUFACTURER_ID + header + bytes(params)
-        cs = checksum(payload)
-        return bytes([c.SYSEX_START]) + payload + bytes([cs, c.SYSEX_END])
+        elements = self.control_mode_elements(mode)
+        return self._build_control_frame(control_id, encode_elements(elements))
 
     def build_control_led(
         self,
@@ -118,22 +194,7 @@ class PacerSysExBuilder:
             led_midi_ctrl: CC do zdalnej kontroli (0=wyłączone)
             led_num: Która LED (0=default, 1=bottom, 2=middle, 3=top)
         """
-        # LED elements: step1=0x40-0x43, step2=0x44-0x47, etc.
-        base = (step_index - 1) * 4 + 0x40
-        params = []
-        # Format: [element, 0x01, value, 0x00] dla każdego oprócz ostatniego
-        params.extend([base + 0, 0x01, led_midi_ctrl, 0x00])
-        params.extend([base + 1, 0x01, active_color, 0x00])
-        params.extend([base + 2, 0x01, inactive_color, 0x00])
-        params.extend([base + 3, 0x01, led_num])  # Ostatni - bez paddingu
-
-        header = bytes([
-            c.DEVICE_ID,
-            c.CMD_SET,
-            c.TARGET_PRESET,
-            self.preset_index,
-            control_id
-        ])
-        payload = c.MANUFACTURER_ID + header + bytes(params)
-        cs = checksum(payload)
-        return bytes([c.SYSEX_START]) + payload + bytes([cs, c.SYSEX_END])
+        elements = self.control_led_elements(
+            step_index, active_color, inactive_color, led_midi_ctrl, led_num
+        )
+        return self._build_control_frame(control_id, encode_elements(elements))
@@ -0,0 +1,117 @@
+# ABOUTME: Pre-rendered song pages (song.html, live partial) kept in memory.
+# ABOUTME: Entries carry the song/devices hashes they were rendered from; warmed at startup.
+
+import asyncio
+import logging
+import threading
+
+from fastapi.templating import Jinja2Templates
+
+from paternologia.async_storage import AsyncStorage
+from paternologia.models import Device, Song, content_hash
+
+logger = logging.getLogger(__name__)
+
+LIVE_SONG = "partials/live_song.html"
+SONG_PAGE = "song.html"
+CACHED_TEMPLATES = (LIVE_SONG, SONG_PAGE)
+
+
+def song_context(song: Song, devices: list[Device]) -> dict:
+    """Template context shared by song.html and the live partial."""
+    return {"song": song, "devices": devices, "devices_map": {d.id: d for d in devices}}
+
+
+class RenderCache:
+    """(template, song_id) → HTML rendered from a given song + devices content.
+
+    Readers use get_valid() with the current song and devices hashes, so
+    edits made outside the app (YAML files, devices.yaml) miss instead of
+    serving stale HTML. refresh()/drop() from the song edit endpoints keep
+    entries warm. Entries are replaced, never accumulated, so the cache
+    holds at most one version per song and template.
+
+    Rendering may run in worker threads; stores go through a lock.
+    """
+
+    def __init__(self, templates: Jinja2Templates):
+        self._templates = templates
+        self._entries: dict[tuple[str, str], tuple[str, str, str]] = {}
+        self._lock = threading.Lock()
+        # Songs dropped while warm() runs (None = not warming)
+        self._dropped: set[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, template: str, song_id: str) -> str | None:
+        entry = self._entries.get((template, song_id))
+        return entry[2] if entry is not None else None
+
+    def get_valid(self, template: str, song_id: str, song_hash: str, devices_hash: str) -> str | None:
+        entry = self._entries.get((template, song_id))
+        if entry is None or entry[0] != song_hash or entry[1] != devices_hash:
+            return None
+        return entry[2]
+
+    def render(
+        self,
+        template: str,
+        song: Song,
+        devices: list[Device],
+        devices_hash: str | None = None,
+        replace: bool = True,
+    ) -> str:
+        """Render one template for the song and store the result.
+
+        replace=False keeps an entry stored meanwhile (it is newer than song)
+        and skips songs dropped during warm().
+        """
+        html = self._templates.get_template(template).render(song_context(song, devices))
+        if devices_hash is None:
+            devices_hash = content_hash(devices)
+        key = (template, song.song.id)
+        with self._lock:
+            if replace or (
+                key not in self._entries
+                and not (self._dropped and song.song.id in self._dropped)
+            ):
+                self._entries[key] = (content_hash(song), devices_hash, html)
+        return html
+
+    def refresh(self, song: Song, devices: list[Device]) -> None:
+        """Re-render every cached template for one song (after create/update)."""
+        devices_hash = content_hash(devices)
+        for template in CACHED_TEMPLATES:
+            self.render(template, song, devices, devices_hash)
+
+    def drop(self, song_id: str) -> None:
+        with self._lock:
+            for template in CACHED_TEMPLATES:
+                self._entries.pop((template, song_id), None)
+            if self._dropped is not None:
+                self._dropped.add(song_id)
+
+    def _warm_song(self, song: Song, devices: list[Device], devices_hash: str) -> None:
+        for template in CACHED_TEMPLATES:
+            self.render(template, song, devices, devices_hash, replace=False)
+
+    async def warm(self, storage: AsyncStorage) -> int:
+        """Render all songs in a worker thread, one song per hop. Returns count.
+
+        Entries stored by edits meanwhile are kept (newer than the loaded
+        songs), and songs dropped meanwhile are not re-added.
+        """
+        with self._lock:
+            self._dropped = set()
+        try:
+            songs = await storage.get_songs()
+            devices = await storage.get_devices()
+            devices_hash = content_hash(devices)
+            for song in songs:
+                await asyncio.to_thread(self._warm_song, song, devices, devices_hash)
+        finally:
+            with self._lock:
+                self._dropped = None
+        logger.info("Render cache warmed (%d songs)", len(songs))
+        return len(songs)
@@ -4,7 +4,9 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 
-from paternologia.dependencies import get_storage, get_templates
+from paternologia.dependencies import get_async_storage, get_templates
+from paternologia.etag import cache_headers, etag_matches, make_etag, not_modified
+from paternologia.models import content_hash
 
 router = APIRouter(tags=["devices"])
 
@@ -12,9 +14,9 @@ router = APIRouter(tags=["devices"])
 @router.get("/devices", response_class=HTMLResponse)
 async def list_devices(request: Request):
     """List all devices (HTML page)."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    devices = storage.get_devices()
+    devices = await storage.get_devices()
 
     return templates.TemplateResponse(
         request=request,
@@ -24,9 +26,15 @@ async def list_devices(request: Request):
 
 
 @router.get("/api/devices", response_class=JSONResponse)
-async def get_devices_json():
+async def get_devices_json(request: Request):
     """Get all devices as JSON (for forms/HTMX)."""
-    storage = get_storage()
-    devices = storage.get_devices()
-
-    return [device.model_dump() for device in devices]
+    storage = get_async_storage()
+    devices = await storage.get_devices()
+
+    etag = make_etag("devices", content_hash(devices))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return JSONResponse(
+        [device.model_dump(mode="json") for device in devices],
+        headers=cache_headers(etag),
+    )
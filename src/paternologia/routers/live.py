@@ -1,24 +1,125 @@
 # ABOUTME: Live view router with SSE for real-time song display via MIDI.
-# ABOUTME: Provides /live page, /live/events SSE stream, and /live/song/{id} partial.
+# ABOUTME: Provides /live page, /live/events SSE stream, /live/ws WebSocket and /live/song/{id} partial.
 
 import asyncio
 import logging
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.requests import HTTPConnection
 
-from paternologia.dependencies import get_storage, get_templates
-from paternologia.midi.events import EventBus
+from paternologia.dependencies import get_async_storage, get_templates
+from paternologia.etag import cache_headers, etag_matches, make_etag, not_modified
+from paternologia.latency import LatencyStats
+from paternologia.midi import wire
+from paternologia.midi.events import (
+    SUBSCRIBER_BUFFER, BusEvent, EventBus, LiveSongEvent, MidiEvent, sse_frame,
+)
+from paternologia.midi.transport import TransportError
+from paternologia.models import SONG_ID_PATTERN, content_hash
+from paternologia.pacer.mappings import action_to_messages, build_device_channel_map
+from paternologia.render_cache import LIVE_SONG, RenderCache, song_context
 
 logger = logging.getLogger(__name__)
 
+CONNECTED = sse_frame("connected", "ok")
+
 router = APIRouter(tags=["live"])
 
 
-def _get_event_bus(request: Request) -> EventBus:
+def _get_event_bus(request: HTTPConnection) -> EventBus:
     return request.app.state.event_bus
 
 
+def _get_live_bus(request: HTTPConnection) -> EventBus:
+    """Bus with pre-rendered song changes; raw MIDI bus when the renderer isn't running."""
+    return getattr(request.app.state, "live_bus", None) or _get_event_bus(request)
+
+
+def _get_latency(request: HTTPConnection) -> LatencyStats | None:
+    return getattr(request.app.state, "latency", None)
+
+
+def _get_render_cache(request: Request) -> RenderCache | None:
+    return getattr(request.app.state, "render_cache", None)
+
+
+async def render_live_song(song_id: str, cache: RenderCache | None = None) -> str | None:
+    """Live partial for a song (None if it doesn't exist).
+
+    Cached HTML is used only if it matches the current song and devices
+    (both stat-cached), so edits outside the app never reach the screens.
+    """
+    storage = get_async_storage()
+    if cache is not None:
+        summary, devices = await storage.get_song_summary_with_devices(song_id)
+        if summary is None:
+            return None
+        devices_hash = content_hash(devices)
+        html = cache.get_valid(LIVE_SONG, song_id, summary.content_hash, devices_hash)
+        if html is not None:
+            return html
+
+    song, devices = await storage.get_song_with_devices(song_id)
+    if song is None:
+        return None
+    if cache is not None:
+        return await asyncio.to_thread(cache.render, LIVE_SONG, song, devices)
+    return get_templates().get_template(LIVE_SONG).render(song_context(song, devices))
+
+
+async def broadcast_live_songs(
+    source: EventBus,
+    target: EventBus,
+    cache: RenderCache | None = None,
+    latency: LatencyStats | None = None,
+) -> None:
+    """Render each song change once and publish the HTML to every live screen.
+
+    Runs as a single task: render cost no longer grows with the number of
+    connected screens, and browsers skip the follow-up fetch.
+    """
+    # Only the latest song matters if changes come faster than renders
+    queue = source.subscribe("live renderer", maxsize=1)
+    try:
+        while True:
+            event = await queue.get()
+            if not isinstance(event, MidiEvent):
+                continue
+            try:
+                html = await render_live_song(event.song_id, cache)
+            except Exception as e:
+                # Screens fall back to fetching /live/song/{id}
+                logger.warning("Live render of '%s' failed: %s", event.song_id, e)
+                html = None
+            live_event = LiveSongEvent(song_id=event.song_id, html=html)
+            await target.publish(live_event)
+            if latency is not None and event.published_at is not None:
+                latency.song_rendered(
+                    live_event.event_id, event.timestamp, event.published_at, live_event.published_at
+                )
+    except asyncio.CancelledError:
+        pass
+    finally:
+        source.unsubscribe(queue)
+
+
+def _catch_up(bus: EventBus, last_event_id: str | None) -> BusEvent | None:
+    """Event that brings a (re)connecting client to the current song, if any.
+
+    A client whose Last-Event-ID is in the replay buffer gets only the
+    newest event it missed (nothing if it is up to date); a new client,
+    or one whose id is too old, gets the latest event.
+    """
+    missed = None
+    if last_event_id is not None and last_event_id.isdigit():
+        missed = bus.since(int(last_event_id))
+    if missed is None:
+        return bus.latest
+    return missed[-1] if missed else None
+
+
 @router.get("/live", response_class=HTMLResponse)
 async def live_page(request: Request):
     """Main live view page with SSE connection."""
@@ -33,20 +134,33 @@ async def live_page(request: Request):
 
 @router.get("/live/events")
 async def live_events(request: Request):
-    """SSE endpoint - streams song-change events to browser."""
-    event_bus = _get_event_bus(request)
+    """SSE endpoint - streams song-change events (with rendered HTML) to browser."""
+    event_bus = _get_live_bus(request)
+
+    client = request.client
+    name = f"live {client.host}:{client.port}" if client else "live"
+    # Sent by EventSource on reconnect: id of the last event the tab saw
+    last_event_id = request.headers.get("last-event-id")
+    latency = _get_latency(request)
 
     async def event_generator():
-        queue = event_bus.subscribe()
+        # Only the current song matters: coalesce to the latest change
+        queue = event_bus.subscribe(name, maxsize=1)
+        # Taken right after subscribing, so nothing falls in between
+        current = _catch_up(event_bus, last_event_id)
+        sent_id = current.event_id if current is not None else 0
         try:
-            yield "event: connected\ndata: ok\n\n"
+            yield CONNECTED
+            if current is not None:
+                yield current.sse
             while True:
-                try:
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"event: song-change\ndata: {event.song_id}\n\n"
-                except asyncio.TimeoutError:
-                    # Send keepalive comment to prevent connection timeout
-                    yield ": keepalive\n\n"
+                # Bytes are encoded once per event (keepalives come from the bus heartbeat)
+                event = await queue.get()
+                if event.event_id is not None and event.event_id <= sent_id:
+                    continue
+                if latency is not None and isinstance(event, LiveSongEvent):
+                    latency.written(event.event_id, event.published_at)
+                yield event.sse
         except asyncio.CancelledError:
             pass
         finally:
@@ -63,21 +177,184 @@ async def live_events(request: Request):
     )
 
 
+async def _select_song(conn: HTTPConnection, song_id: str) -> tuple[bool, str]:
+    """Show a song on all screens as if its Program Change had arrived."""
+    if await get_async_storage().get_song_summary(song_id) is None:
+        return False, "Song not found"
+    # Through the MIDI bus, so the renderer and preset prefetch react as well
+    await _get_event_bus(conn).publish(MidiEvent(song_id=song_id, channel=-1, program=-1))
+    return True, song_id
+
+
+async def _fire_button(conn: HTTPConnection, song_id: str, button: int) -> tuple[bool, str]:
+    """Send a button's actions to the devices, as pressing it on the Pacer would."""
+    storage = get_async_storage()
+    song, devices = await storage.get_song_with_devices(song_id)
+    if song is None:
+        return False, "Song not found"
+    if button >= len(song.pacer):
+        return False, f"Song has no button #{button + 1}"
+    pool = getattr(conn.app.state, "midi_out_pool", None)
+    if pool is None:
+        return False, "MIDI output unavailable"
+
+    channel_map = build_device_channel_map(devices)
+    messages = [
+        message
+        for action in song.pacer[button].actions
+        for message in action_to_messages(action, channel_map)
+    ]
+    config = await storage.get_pacer_config()
+    device_name = config.device_name if config else "PACER"
+
+    try:
+        # One lease for the whole button: a single port health check
+        sent = await asyncio.to_thread(pool.send_messages, device_name, messages)
+    except (TransportError, ValueError) as e:
+        return False, str(e)
+    if not sent:
+        return False, f"MIDI port '{device_name}' not found"
+    return True, f"{len(messages)} messages"
+
+
+async def _run_command(conn: HTTPConnection, data: bytes) -> bytes:
+    """Execute one client frame; returns the REPLY frame."""
+    try:
+        command, args = wire.parse_command(data)
+    except wire.FrameError as e:
+        return wire.reply(data[0] if data else 0, False, str(e))
+    # Storage maps IDs to file paths: only well-formed IDs reach it (no ../devices)
+    if not SONG_ID_PATTERN.fullmatch(args["song_id"]):
+        ok, message = False, "Song not found"
+    elif command == wire.SELECT_SONG:
+        ok, message = await _select_song(conn, args["song_id"])
+    else:
+        ok, message = await _fire_button(conn, args["song_id"], args["button"])
+    return wire.reply(command, ok, message)
+
+
+@router.websocket("/live/ws")
+async def live_ws(websocket: WebSocket):
+    """Binary live channel (frames in midi/wire.py): pushes song changes, MIDI
+    activity and Pacer job progress; accepts select-song / fire-button commands."""
+    await websocket.accept()
+    client = websocket.client
+    name = f"ws {client.host}:{client.port}" if client else "ws"
+
+    live_bus = _get_live_bus(websocket)
+    buses = [(live_bus, 1)]
+    if _get_event_bus(websocket) is not live_bus:
+        buses.append((_get_event_bus(websocket), SUBSCRIBER_BUFFER))
+    jobs = getattr(websocket.app.state, "pacer_jobs", None)
+    if jobs is not None:
+        buses.append((jobs.events, SUBSCRIBER_BUFFER))
+    subscriptions = [(bus, bus.subscribe(name, maxsize)) for bus, maxsize in buses]
+    current = live_bus.latest
+    send_lock = asyncio.Lock()
+
+    async def send(frame: bytes) -> None:
+        async with send_lock:
+            await websocket.send_bytes(frame)
+
+    async def pump(queue) -> None:
+        try:
+            while True:
+                event = await queue.get()
+                # Heartbeats have no frame: WebSocket keeps itself alive with pings
+                if event.frame is not None and event is not current:
+                    await send(event.frame)
+        except (WebSocketDisconnect, RuntimeError):
+            # Client gone; the receive loop below notices and cleans up
+            pass
+
+    pumps = []
+    try:
+        if current is not None and current.frame is not None:
+            await send(current.frame)
+        pumps = [asyncio.create_task(pump(queue)) for _, queue in subscriptions]
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is None:
+                await send(wire.reply(0, False, "Binary frames only"))
+                continue
+            await send(await _run_command(websocket, data))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in pumps:
+            task.cancel()
+        for bus, queue in subscriptions:
+            bus.unsubscribe(queue)
+
+
+class LiveAck(BaseModel):
+    """Sent by live.html once a song change is on screen."""
+
+    event_id: int
+    render_ms: float | None = Field(default=None, ge=0)
+
+
+@router.post("/live/ack", status_code=204)
+async def live_ack(request: Request, ack: LiveAck):
+    """Client acknowledgement closing the MIDI → screen latency measurement."""
+    latency = _get_latency(request)
+    if latency is not None:
+        latency.acked(ack.event_id, ack.render_ms)
+
+
+@router.get("/live/latency")
+async def live_latency(request: Request):
+    """MIDI → screen latency per pipeline stage (p50/p95/p99, ms); see LatencyStats."""
+    latency = _get_latency(request)
+    if latency is None:
+        raise HTTPException(status_code=404, detail="Latency stats unavailable")
+    return latency.summary()
+
+
+@router.get("/live/subscribers")
+async def live_subscribers(request: Request):
+    """Per-subscriber lag of the SSE streams, worst first."""
+    jobs = getattr(request.app.state, "pacer_jobs", None)
+    return {
+        "live": _get_live_bus(request).stats(),
+        "pacer_jobs": jobs.events.stats() if jobs is not None else [],
+    }
+
+
 @router.get("/live/song/{song_id}", response_class=HTMLResponse)
 async def live_song_partial(request: Request, song_id: str):
     """Render song partial for live view (no edit/delete buttons)."""
-    storage = get_storage()
-    templates = get_templates()
-    song = storage.get_song(song_id)
+    storage = get_async_storage()
+    summary = await storage.get_song_summary(song_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Song not found")
 
+    devices = await storage.get_devices()
+    devices_hash = content_hash(devices)
+    etag = make_etag("live_song.html", summary.content_hash, devices_hash)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache = _get_render_cache(request)
+    if cache is not None:
+        html = cache.get_valid(LIVE_SONG, song_id, summary.content_hash, devices_hash)
+        if html is not None:
+            return HTMLResponse(html, headers=cache_headers(etag))
+
+    song = await storage.get_song(song_id)
     if not song:
         raise HTTPException(status_code=404, detail="Song not found")
 
-    devices = storage.get_devices()
-    devices_map = {d.id: d for d in devices}
+    if cache is not None:
+        return HTMLResponse(cache.render(LIVE_SONG, song, devices, devices_hash), headers=cache_headers(etag))
 
+    templates = get_templates()
     return templates.TemplateResponse(
         request=request,
-        name="partials/live_song.html",
-        context={"song": song, "devices": devices, "devices_map": devices_map},
+        name=LIVE_SONG,
+        context=song_context(song, devices),
+        headers=cache_headers(etag),
     )
@@ -1,18 +1,29 @@
 # ABOUTME: FastAPI router for Pacer SysEx export and send endpoints.
-# ABOUTME: Provides GET /pacer/export/{song_id}.syx and POST /pacer/send/{song_id}.
+# ABOUTME: Export .syx, queued song sends and setlist deploys (/pacer/send, /pacer/deploy), job SSE.
 
+import asyncio
+import json
 import logging
-import subprocess
-from tempfile import NamedTemporaryFile
 
 from fastapi import APIRouter, HTTPException, Depends, Request, Form
-from fastapi.responses import Response, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 
-from ..dependencies import get_storage
-from ..midi.ports import find_amidi_port
-from ..models import VALID_PRESETS
-from ..storage import Storage
+from ..dependencies import (
+    get_async_storage,
+    get_pacer_shadow,
+    get_storage,
+    get_sysex_cache,
+    get_templates,
+)
+from ..etag import cache_headers, etag_matches, make_etag, not_modified
+from ..midi.events import Heartbeat, sse_frame
+from ..models import VALID_PRESETS, Song, content_hash
+from ..storage import StorageBackend
+from ..pacer.cache import SysExCache, sysex_key
 from ..pacer.export import export_song_to_syx
+from ..pacer.planner import PRESET_SLOTS, plan_slots
+from ..pacer.jobs import FINAL_STATES, PacerJob, PacerJobQueue
+from ..pacer.sender import SendError, deploy_setlist, send_song, sysex_transport
 from ..pacer import constants as c
 
 logger = logging.getLogger(__name__)
@@ -22,135 +33,326 @@ router = APIRouter(prefix="/pacer", tags=["pacer"])
 
 @router.get("/export/{song_id}.syx")
 def export_syx(
+    request: Request,
     song_id: str,
     preset: str = "A1",
-    storage: Storage = Depends(get_storage)
+    storage: StorageBackend = Depends(get_storage),
+    sysex_cache: SysExCache = Depends(get_sysex_cache),
 ):
     """Eksportuj piosenkę do .syx."""
-    song = storage.get_song(song_id)
-    if not song:
+    summary = storage.get_song_summary(song_id)
+    if not summary:
         raise HTTPException(404, "Song not found")
 
-    # Walidacja preset
-    if preset.upper() not in c.PRESET_INDICES:
+    # Walidacja preset (klucz cache, ETag, eksport i nazwa pliku z tej samej wartości)
+    preset = preset.upper()
+    if preset not in c.PRESET_INDICES:
         raise HTTPException(400, f"Invalid preset: {preset}. Valid: CURRENT, A1-D6.")
 
     # Pobierz devices do mapowania MIDI channels
     devices = storage.get_devices()
 
-    syx_data = export_song_to_syx(song, devices, preset)
+    # ETag przed budowaniem SysEx - 304 bez eksportu
+    etag = make_etag("syx", summary.content_hash, content_hash(devices), preset)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    def build() -> bytes:
+        song = storage.get_song(song_id)
+        if not song:
+            raise HTTPException(404, "Song not found")
+        return export_song_to_syx(song, devices, preset)
+
+    # Plik z cache serwowany bez kopiowania (sendfile)
+    syx_path = sysex_cache.get_or_build(
+        sysex_key(summary.content_hash, devices, preset), build
+    )
 
-    return Response(
-        content=syx_data,
+    return FileResponse(
+        syx_path,
         media_type="application/octet-stream",
         headers={
-            "Content-Disposition": f'attachment; filename="{song_id}_{preset}.syx"'
+            "Content-Disposition": f'attachment; filename="{song_id}_{preset}.syx"',
+            **cache_headers(etag),
         }
     )
 
 
 @router.post("/send/{song_id}")
-def send_to_pacer(
+async def send_to_pacer(
     request: Request,
     song_id: str,
     preset: str | None = Form(None),
-    storage: Storage = Depends(get_storage)
+    force_full: bool = Form(False),
 ):
-    """Wyślij piosenkę do Pacera przez amidi."""
+    """Zleć wysyłkę piosenki do Pacera (kolejka per port, wynik przez SSE).
+
+    Zwraca od razu job_id (202); postęp: GET /pacer/jobs/{id}/events.
+    Domyślnie wysyła tylko ramki różniące się od kopii cienia (shadow)
+    presetu; force_full wysyła wszystkie.
+    """
     is_htmx = request.headers.get("HX-Request") == "true"
+    storage = get_async_storage()
 
-    try:
-        song = storage.get_song(song_id)
-        if not song:
-            error_msg = "Song not found"
-            if is_htmx:
-                return HTMLResponse(
-                    f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
-                )
-            raise HTTPException(404, error_msg)
+    def error(status: int, error_msg: str):
+        if is_htmx:
+            return HTMLResponse(
+                f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
+            )
+        raise HTTPException(status, error_msg)
 
-        target = preset or song.song.pacer_export.target_preset
-        target = target.upper()
+    song = await storage.get_song(song_id)
+    if not song:
+        return error(404, "Song not found")
 
-        if target not in VALID_PRESETS:
-            error_msg = f"Invalid preset: {target}. Valid: A1-D6."
-            if is_htmx:
-                return HTMLResponse(
-                    f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
-                )
-            raise HTTPException(400, error_msg)
+    target = preset or song.song.pacer_export.target_preset
+    target = target.upper()
 
-        pacer_config = storage.get_pacer_config()
-        if not pacer_config:
-            error_msg = "Missing configuration in data/pacer.yaml"
-            if is_htmx:
-                return HTMLResponse(
-                    f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
-                )
-            raise HTTPException(400, error_msg)
-
-        # Auto-detekcja portu po nazwie urządzenia
-        port = find_amidi_port(pacer_config.device_name)
-        if not port:
-            error_msg = (
-                f"Nie znaleziono urządzenia '{pacer_config.device_name}'. "
-                "Sprawdź połączenie i uruchom 'amidi -l'."
-            )
-            if is_htmx:
-                return HTMLResponse(
-                    f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
-                )
-            raise HTTPException(400, error_msg)
+    if target not in VALID_PRESETS:
+        return error(400, f"Invalid preset: {target}. Valid: A1-D6.")
 
-        timeout_seconds = pacer_config.amidi_timeout_seconds
-        sysex_interval = pacer_config.sysex_interval_ms
+    pacer_config = await storage.get_pacer_config()
+    if not pacer_config:
+        return error(400, "Missing configuration in data/pacer.yaml")
 
-        devices = storage.get_devices()
-        syx_data = export_song_to_syx(song, devices, target)
+    jobs = _get_job_queue(request)
+    job, deduped = jobs.submit(pacer_config.device_name, song_id, target, force_full)
 
-        try:
-            with NamedTemporaryFile(suffix=".syx", delete=True) as tmp:
-                tmp.write(syx_data)
-                tmp.flush()
-                # CRITICAL: --sysex-interval is required for reliable transfer!
-                run = subprocess.run(
-                    ["amidi", "-p", port, f"--sysex-interval={sysex_interval}", "-s", tmp.name],
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout_seconds,
-                    check=False,
-                )
-        except FileNotFoundError:
-            error_msg = "amidi not found - install alsa-utils package"
-            if is_htmx:
-                return HTMLResponse(
-                    f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
-                )
-            raise HTTPException(500, error_msg)
-
-        if run.returncode != 0:
-            error_msg = run.stderr.strip()
-            logger.error(f"amidi failed for {song_id} to {target}: {error_msg}")
-            if is_htmx:
-                return HTMLResponse(
-                    f'<span class="text-red-600 font-semibold">❌ Błąd wysyłania: {error_msg}</span>'
-                )
-            raise HTTPException(500, f"amidi failed: {error_msg}")
+    if is_htmx:
+        return get_templates().TemplateResponse(
+            request=request,
+            name="partials/pacer_job.html",
+            context={"job": job.to_dict()},
+        )
+    return JSONResponse({**job.to_dict(), "deduped": deduped}, status_code=202)
+
+
+@router.post("/deploy")
+async def deploy_setlist_to_pacer(request: Request, force_full: bool = Form(False)):
+    """Zleć wgranie całej setlisty (songs_order.yaml) do presetów docelowych.
+
+    Jedno połączenie i jeden strumień ramek dla wszystkich utworów; ramki
+    zgodne z kopią cienia są pomijane. Wynik per utwór w result.songs.
+    """
+    is_htmx = request.headers.get("HX-Request") == "true"
+    storage = get_async_storage()
 
-        # Success
+    def error(status: int, error_msg: str):
         if is_htmx:
             return HTMLResponse(
-                f'<span class="text-green-600">✓ Wysłano do preset {target} na port {port}</span>'
+                f'<span class="text-red-600 font-semibold">❌ {error_msg}</span>'
             )
-        return {"status": "ok", "preset": target, "port": port}
+        raise HTTPException(status, error_msg)
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error in send_to_pacer: {e}", exc_info=True)
-        error_msg = str(e)
-        if is_htmx:
-            return HTMLResponse(
-                f'<span class="text-red-600 font-semibold">❌ Błąd: {error_msg}</span>'
+    if not await storage.get_song_summaries():
+        return error(400, "Setlist is empty")
+
+    pacer_config = await storage.get_pacer_config()
+    if not pacer_config:
+        return error(400, "Missing configuration in data/pacer.yaml")
+
+    jobs = _get_job_queue(request)
+    job, deduped = jobs.submit(
+        pacer_config.device_name, None, None, force_full, kind=DEPLOY_JOB
+    )
+
+    if is_htmx:
+        return get_templates().TemplateResponse(
+            request=request,
+            name="partials/pacer_job.html",
+            context={"job": job.to_dict()},
+        )
+    return JSONResponse({**job.to_dict(), "deduped": deduped}, status_code=202)
+
+
+@router.post("/plan")
+async def plan_preset_slots(request: Request, setlists: list[list[str]] | None = None, apply: bool = False):
+    """Przydział utworów do slotów A1-D6 na cały koncert (minimum wgrań).
+
+    Body: setlisty grane po kolei (lista list ID); domyślnie songs_order.yaml.
+    apply=true zapisuje presety z plan.initial jako pacer_export.target_preset
+    utworów, więc /pacer/deploy i /pacer/send od razu z nich korzystają.
+    Pozostałe utwory celujące w zaplanowany slot dostają po jednym slocie,
+    w który nie celuje nikt inny (odpowiedź: moved). Gdy takich slotów
+    zabraknie, reszta zostaje bez zmian w conflicts, a /pacer/deploy
+    stosuje dla nich zasadę "pierwszy utwór wygrywa".
+    """
+    storage = get_async_storage()
+    summaries = await storage.get_song_summaries()
+    if not setlists:
+        setlists = [[s.id for s in summaries]]
+
+    known = {s.id for s in summaries}
+    missing = sorted({song_id for setlist in setlists for song_id in setlist} - known)
+    if missing:
+        raise HTTPException(400, f"Unknown songs: {', '.join(missing)}")
+
+    plan = plan_slots(setlists)
+    if not apply:
+        return plan.as_dict()
+
+    planned = set(plan.initial.values())
+    others = [s for s in summaries if s.id not in plan.initial]
+    clashing = [s.id for s in others if s.target_preset.upper() in planned]
+    # Wolne = ani w planie, ani już zajęte przez inny utwór spoza planu
+    taken = planned | {s.target_preset.upper() for s in others}
+    free = [slot for slot in PRESET_SLOTS if slot not in taken]
+    moved = dict(zip(clashing, free))
+    conflicts = clashing[len(moved):]
+
+    cache = getattr(request.app.state, "render_cache", None)
+    devices = await storage.get_devices()
+    for song_id, preset in {**plan.initial, **moved}.items():
+        async with storage.song_lock(song_id):
+            song = await storage.get_song(song_id)
+            # Usunięty w międzyczasie
+            if song is None or song.song.pacer_export.target_preset == preset:
+                continue
+            # get_song zwraca współdzielony obiekt z cache - zmieniamy kopię
+            song = song.model_copy(deep=True)
+            song.song.pacer_export.target_preset = preset
+            await storage.save_song(song)
+            if cache is not None:
+                await asyncio.to_thread(cache.refresh, song, devices)
+
+    return {**plan.as_dict(), "moved": moved, "conflicts": conflicts}
+
+
+@router.get("/prefetch")
+async def prefetch_state(request: Request):
+    """Stan trybu koncertowego: sloty (LRU), aktywny preset, wgrania w toku."""
+    prefetcher = getattr(request.app.state, "pacer_prefetch", None)
+    if prefetcher is None:
+        raise HTTPException(404, "Prefetch disabled (prefetch_window: 0 in pacer.yaml)")
+    return prefetcher.snapshot()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str):
+    """Stan zadania wysyłki."""
+    job = _get_job_queue(request).get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(request: Request, job_id: str):
+    """Anuluj zadanie (z kolejki albo w trakcie - między ramkami)."""
+    job = _get_job_queue(request).cancel(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+    """SSE: postęp zadania (event: job, data: JSON) aż do stanu końcowego."""
+    jobs = _get_job_queue(request)
+    if jobs.get(job_id) is None:
+        raise HTTPException(404, "Job not found")
+
+    client = request.client
+    name = f"job {job_id} {client.host}:{client.port}" if client else f"job {job_id}"
+
+    async def event_generator():
+        queue = jobs.events.subscribe(name)
+        try:
+            # Stan bieżący - zadanie mogło się skończyć przed subskrypcją
+            job = jobs.get(job_id)
+            yield _job_sse(job.to_dict())
+            if job.final:
+                return
+            while True:
+                event = await queue.get()
+                if isinstance(event, Heartbeat):
+                    yield event.sse
+                    continue
+                if event.job_id != job_id:
+                    continue
+                yield event.sse
+                if event.state in FINAL_STATE_VALUES:
+                    return
+        except asyncio.CancelledError:
+            pass
+        finally:
+            jobs.events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+FINAL_STATE_VALUES = {state.value for state in FINAL_STATES}
+
+DEPLOY_JOB = "deploy"
+
+
+def _job_sse(data: dict) -> bytes:
+    return sse_frame("job", json.dumps(data))
+
+
+def _get_job_queue(request: Request) -> PacerJobQueue:
+    return request.app.state.pacer_jobs
+
+
+def create_pacer_job_queue(app) -> PacerJobQueue:
+    """Job queue whose worker sends through the app's MidiOutPool (for lifespan)."""
+
+    def run_job(job: PacerJob, progress) -> dict:
+        storage = get_storage()
+        pacer_config = storage.get_pacer_config()
+        if not pacer_config:
+            raise SendError("Missing configuration in data/pacer.yaml")
+        devices = storage.get_devices()
+        pool = getattr(app.state, "midi_out_pool", None)
+
+        if job.kind == DEPLOY_JOB:
+            setlist = _load_setlist(storage)
+            with sysex_transport(pacer_config, pool) as transport:
+                result = deploy_setlist(
+                    setlist,
+                    devices,
+                    pacer_config,
+                    transport,
+                    sysex_cache=get_sysex_cache(),
+                    shadow=get_pacer_shadow(),
+                    force_full=job.force_full,
+                    progress=progress,
+                    cancel=job.cancel_event,
+                )
+            return result.as_dict()
+
+        song = storage.get_song(job.song_id)
+        if not song:
+            raise SendError("Song not found")
+        with sysex_transport(pacer_config, pool) as transport:
+            result = send_song(
+                song,
+                devices,
+                job.preset,
+                pacer_config,
+                transport,
+                sysex_cache=get_sysex_cache(),
+                shadow=get_pacer_shadow(),
+                force_full=job.force_full,
+                progress=progress,
+                cancel=job.cancel_event,
             )
-        raise HTTPException(500, f"Internal error: {error_msg}")
+        return result.as_dict()
+
+    return PacerJobQueue(runner=run_job)
+
+
+def _load_setlist(storage: StorageBackend) -> list[tuple[str, Song | None]]:
+    """Songs in songs_order.yaml order (None if missing); all songs without an order."""
+    order = storage.get_songs_order()
+    if not order:
+        return [(song.song.id, song) for song in storage.get_songs()]
+    return [(song_id, storage.get_song(song_id)) for song_id in order]
@@ -1,21 +1,28 @@
 # ABOUTME: Songs API router for Paternologia.
 # ABOUTME: Provides CRUD endpoints for song configurations with HTMX support.
 
+import asyncio
+import json
 import logging
 from datetime import date
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from pydantic import ValidationError
 
-from paternologia.dependencies import get_storage, get_templates
+from paternologia.async_storage import AsyncStorage
+from paternologia.dependencies import get_async_storage, get_templates
+from paternologia.etag import cache_headers, etag_matches, make_etag, not_modified
+from paternologia.render_cache import SONG_PAGE, RenderCache, song_context
 from paternologia.models import (
     Action,
     ActionType,
+    Device,
     PacerButton,
     PacerExportSettings,
     Song,
     SongMetadata,
+    content_hash,
 )
 
 logger = logging.getLogger(__name__)
@@ -23,43 +30,93 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["songs"])
 
 
-def _rebuild_midi_index(request: Request) -> None:
-    """Rebuild MIDI index after song changes (if MIDI subsystem is active)."""
-    midi_index = getattr(request.app.state, "midi_index", None)
+def _publish_midi_index(request: Request, new_index) -> None:
+    """Swap a new MIDI index into app state and the running listener."""
+    request.app.state.midi_index = new_index
     listener = getattr(request.app.state, "midi_listener", None)
-    if midi_index is None:
+    if listener is not None:
+        listener.song_index = new_index
+
+
+async def _rebuild_midi_index(request: Request, storage: AsyncStorage) -> None:
+    """Rebuild MIDI index from scratch (song order changes conflict resolution)."""
+    if getattr(request.app.state, "midi_index", None) is None:
         return
 
     from paternologia.midi.index import SongMidiIndex
-    storage = get_storage()
-    new_index = SongMidiIndex.build(storage.get_songs(), storage.get_devices())
-    request.app.state.midi_index = new_index
-    if listener is not None:
-        listener.song_index = new_index
+    songs = await storage.get_songs()
+    devices = await storage.get_devices()
+    order = await storage.get_songs_order()
+    _publish_midi_index(request, SongMidiIndex.build(songs, devices, order))
     logger.info("MIDI index rebuilt")
 
 
+def _update_midi_index(
+    request: Request,
+    song_id: str,
+    song: Song | None,
+    devices: list[Device],
+) -> None:
+    """Apply a single-song delta to the MIDI index in place (song=None means deleted).
+
+    Callers hold AsyncStorage.song_lock(song_id) from the save on, so deltas
+    land in the same order as the file writes.
+    """
+    midi_index = getattr(request.app.state, "midi_index", None)
+    if midi_index is None:
+        return
+
+    if song is None:
+        midi_index.remove_song(song_id)
+    else:
+        midi_index.update_song(song, devices)
+    logger.info("MIDI index updated for '%s'", song_id)
+
+
+def _get_render_cache(request: Request) -> RenderCache | None:
+    return getattr(request.app.state, "render_cache", None)
+
+
+async def _update_render_cache(
+    request: Request,
+    song_id: str,
+    song: Song | None,
+    devices: list[Device],
+) -> None:
+    """Re-render cached pages of one song (song=None means deleted).
+
+    Rendering runs in a worker thread, off the event loop.
+    """
+    cache = _get_render_cache(request)
+    if cache is None:
+        return
+
+    if song is None:
+        cache.drop(song_id)
+    else:
+        await asyncio.to_thread(cache.refresh, song, devices)
+
+
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Main page - list all songs."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    songs = storage.get_songs()
-    devices = storage.get_devices()
+    songs = await storage.get_song_summaries()
 
     return templates.TemplateResponse(
         request=request,
         name="index.html",
-        context={"songs": songs, "devices": devices},
+        context={"songs": songs},
     )
 
 
 @router.get("/songs/new", response_class=HTMLResponse)
 async def new_song(request: Request):
     """Form for creating a new song."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    devices = storage.get_devices()
+    devices = await storage.get_devices()
 
     return templates.TemplateResponse(
         request=request,
@@ -71,35 +128,49 @@ async def new_song(request: Request):
 @router.get("/songs/{song_id}", response_class=HTMLResponse)
 async def view_song(request: Request, song_id: str):
     """View a song's PACER configuration."""
-    storage = get_storage()
-    templates = get_templates()
-    song = storage.get_song(song_id)
+    storage = get_async_storage()
+    summary = await storage.get_song_summary(song_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Song not found")
+
+    devices = await storage.get_devices()
+    devices_hash = content_hash(devices)
+    etag = make_etag("song.html", summary.content_hash, devices_hash)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
+    cache = _get_render_cache(request)
+    if cache is not None:
+        html = cache.get_valid(SONG_PAGE, song_id, summary.content_hash, devices_hash)
+        if html is not None:
+            return HTMLResponse(html, headers=cache_headers(etag))
+
+    song = await storage.get_song(song_id)
     if not song:
         raise HTTPException(status_code=404, detail="Song not found")
 
-    devices = storage.get_devices()
-    devices_map = {d.id: d for d in devices}
+    if cache is not None:
+        return HTMLResponse(cache.render(SONG_PAGE, song, devices, devices_hash), headers=cache_headers(etag))
 
+    templates = get_templates()
     return templates.TemplateResponse(
         request=request,
-        name="song.html",
-        context={"song": song, "devices": devices, "devices_map": devices_map},
+        name=SONG_PAGE,
+        context=song_context(song, devices),
+        headers=cache_headers(etag),
     )
 
 
 @router.get("/songs/{song_id}/edit", response_class=HTMLResponse)
 async def edit_song(request: Request, song_id: str):
     """Form for editing a song."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    song = storage.get_song(song_id)
+    song, devices = await storage.get_song_with_devices(song_id)
 
     if not song:
         raise HTTPException(status_code=404, detail="Song not found")
 
-    devices = storage.get_devices()
-
     return templates.TemplateResponse(
         request=request,
         name="song_edit.html",
@@ -110,7 +181,7 @@ async def edit_song(request: Request, song_id: str):
 @router.post("/songs", response_class=HTMLResponse)
 async def create_song(request: Request):
     """Create a new song from form data."""
-    storage = get_storage()
+    storage = get_async_storage()
     form_data = await request.form()
 
     song_id = form_data.get("song_id", "").strip()
@@ -121,15 +192,18 @@ async def create_song(request: Request):
     if not song_id or not song_name:
         raise HTTPException(status_code=400, detail="ID and name are required")
 
-    if storage.song_exists(song_id):
-        raise HTTPException(status_code=400, detail="Song with this ID already exists")
+    async with storage.song_lock(song_id):
+        if await storage.song_exists(song_id):
+            raise HTTPException(status_code=400, detail="Song with this ID already exists")
 
-    try:
-        song = _build_song_from_form(form_data, song_id, song_name, song_author, song_notes, storage)
-    except ValidationError as exc:
-        raise HTTPException(status_code=400, detail=_format_validation_error(exc))
-    storage.save_song(song)
-    _rebuild_midi_index(request)
+        devices = await storage.get_devices()
+        try:
+            song = _build_song_from_form(form_data, song_id, song_name, song_author, song_notes, devices)
+        except ValidationError as exc:
+            raise HTTPException(status_code=400, detail=_format_validation_error(exc))
+        await storage.save_song(song)
+        _update_midi_index(request, song_id, song, devices)
+        await _update_render_cache(request, song_id, song, devices)
 
     return RedirectResponse(url=f"/songs/{song_id}", status_code=303)
 
@@ -137,9 +211,9 @@ async def create_song(request: Request):
 @router.put("/songs/{song_id}", response_class=HTMLResponse)
 async def update_song(request: Request, song_id: str):
     """Update an existing song from form data."""
-    storage = get_storage()
+    storage = get_async_storage()
 
-    if not storage.song_exists(song_id):
+    if not await storage.song_exists(song_id):
         raise HTTPException(status_code=404, detail="Song not found")
 
     form_data = await request.form()
@@ -150,12 +224,15 @@ async def update_song(request: Request, song_id: str):
     if not song_name:
         raise HTTPException(status_code=400, detail="Name is required")
 
+    devices = await storage.get_devices()
     try:
-        song = _build_song_from_form(form_data, song_id, song_name, song_author, song_notes, storage)
+        song = _build_song_from_form(form_data, song_id, song_name, song_author, song_notes, devices)
     except ValidationError as exc:
         raise HTTPException(status_code=400, detail=_format_validation_error(exc))
-    storage.save_song(song)
-    _rebuild_midi_index(request)
+    async with storage.song_lock(song_id):
+        await storage.save_song(song)
+        _update_midi_index(request, song_id, song, devices)
+        await _update_render_cache(request, song_id, song, devices)
 
     return RedirectResponse(url=f"/songs/{song_id}", status_code=303)
 
@@ -169,27 +246,35 @@ async def update_song_post(request: Request, song_id: str):
 @router.delete("/songs/{song_id}")
 async def delete_song(request: Request, song_id: str):
     """Delete a song."""
-    storage = get_storage()
+    storage = get_async_storage()
 
-    if not storage.delete_song(song_id):
-        raise HTTPException(status_code=404, detail="Song not found")
+    async with storage.song_lock(song_id):
+        if not await storage.delete_song(song_id):
+            raise HTTPException(status_code=404, detail="Song not found")
 
-    _rebuild_midi_index(request)
+        _update_midi_index(request, song_id, None, [])
+        await _update_render_cache(request, song_id, None, [])
     return RedirectResponse(url="/", status_code=303)
 
 
 @router.get("/api/songs/order")
-async def get_songs_order():
+async def get_songs_order(request: Request):
     """Get current songs order."""
-    storage = get_storage()
-    return storage.get_songs_order()
+    storage = get_async_storage()
+    order = await storage.get_songs_order()
+
+    etag = make_etag("songs_order", json.dumps(order))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return JSONResponse(order, headers=cache_headers(etag))
 
 
 @router.put("/api/songs/order")
-async def update_songs_order(order: list[str]):
+async def update_songs_order(request: Request, order: list[str]):
     """Update songs order for drag & drop reordering."""
-    storage = get_storage()
-    storage.save_songs_order(order)
+    storage = get_async_storage()
+    await storage.save_songs_order(order)
+    await _rebuild_midi_index(request, storage)
     return {"status": "ok"}
 
 
@@ -199,10 +284,9 @@ def _build_song_from_form(
     song_name: str,
     song_author: str,
     song_notes: str,
-    storage,
+    devices: list[Device],
 ) -> Song:
     """Build a Song model from form data."""
-    devices = storage.get_devices()
     device_ids = [d.id for d in devices]
 
     target_preset = form_data.get("pacer_export_target_preset", "A1").strip()
@@ -287,9 +371,9 @@ def _format_validation_error(exc: ValidationError) -> str:
 @router.get("/partials/action-row", response_class=HTMLResponse)
 async def get_action_row(request: Request, button_idx: int, action_idx: int):
     """Return a new action row partial for HTMX."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    devices = storage.get_devices()
+    devices = await storage.get_devices()
 
     return templates.TemplateResponse(
         request=request,
@@ -306,9 +390,9 @@ async def get_action_row(request: Request, button_idx: int, action_idx: int):
 @router.get("/partials/pacer-button", response_class=HTMLResponse)
 async def get_pacer_button(request: Request, button_idx: int):
     """Return a new PACER button partial for HTMX."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    devices = storage.get_devices()
+    devices = await storage.get_devices()
 
     return templates.TemplateResponse(
         request=request,
@@ -327,9 +411,9 @@ async def get_action_types(
     request: Request, device_id: str, button_idx: int, action_idx: int
 ):
     """Return action type options for selected device (HTMX cascade)."""
-    storage = get_storage()
+    storage = get_async_storage()
     templates = get_templates()
-    devices = storage.get_devices()
+    devices = await storage.get_devices()
 
     device = next((d for d in devices if d.id == device_id), None)
     action_types = device.action_types if device else []
@@ -0,0 +1,442 @@
+# ABOUTME: SQLite storage backend for Paternologia (alternative to YAML files).
+# ABOUTME: Normalized songs/buttons/actions tables in WAL mode, plus YAML import/export CLI.
+
+import argparse
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from paternologia.midi.index import SongMidiIndex
+from paternologia.models import Device, PacerConfig, Song, SongSummary
+from paternologia.storage import LibrarySnapshot, Storage, copy_library
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    action_types TEXT NOT NULL DEFAULT '[]',
+    midi_channel INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS songs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    author TEXT NOT NULL DEFAULT '',
+    created TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    target_preset TEXT NOT NULL DEFAULT 'A1',
+    -- denormalized for the song list (SongSummary)
+    button_count INTEGER NOT NULL DEFAULT 0,
+    devices TEXT NOT NULL DEFAULT '[]',
+    content_hash TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS buttons (
+    song_id TEXT NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (song_id, idx)
+) WITHOUT ROWID;
+
+-- value/note have no declared type so SQLite keeps int vs str as given
+CREATE TABLE IF NOT EXISTS actions (
+    song_id TEXT NOT NULL,
+    button_idx INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    device TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value,
+    cc INTEGER,
+    label TEXT,
+    bank_lsb INTEGER NOT NULL DEFAULT 0,
+    bank_msb INTEGER NOT NULL DEFAULT 0,
+    note,
+    velocity INTEGER,
+    PRIMARY KEY (song_id, button_idx, idx),
+    FOREIGN KEY (song_id, button_idx) REFERENCES buttons(song_id, idx) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS songs_order (
+    position INTEGER PRIMARY KEY,
+    song_id TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_actions_device ON actions(device);
+CREATE INDEX IF NOT EXISTS idx_actions_type ON actions(type);
+CREATE INDEX IF NOT EXISTS idx_songs_target_preset ON songs(target_preset);
+CREATE INDEX IF NOT EXISTS idx_songs_order_song ON songs_order(song_id);
+"""
+
+# Columns added after the first schema version: name -> definition
+SONG_MIGRATIONS = {
+    "button_count": "INTEGER NOT NULL DEFAULT 0",
+    "devices": "TEXT NOT NULL DEFAULT '[]'",
+    "content_hash": "TEXT NOT NULL DEFAULT ''",
+}
+
+SONG_COLUMNS = "s.id, s.name, s.author, s.created, s.notes, s.target_preset"
+SUMMARY_COLUMNS = (
+    "s.id, s.name, s.notes, s.target_preset, s.button_count, s.devices, s.content_hash"
+)
+ACTION_COLUMNS = (
+    "song_id, button_idx, device, type, value, cc, label, bank_lsb, bank_msb, note, velocity"
+)
+
+
+class SqliteStorage:
+    """SQLite storage for devices and songs (same interface as Storage).
+
+    One connection shared between threads, serialized by a lock; WAL mode
+    keeps readers in other processes (backups, sqlite3 CLI) unblocked.
+    """
+
+    def __init__(self, data_dir: Path | str = "data", db_file: Path | str | None = None):
+        self.data_dir = Path(data_dir)
+        self.db_file = Path(db_file) if db_file else self.data_dir / "paternologia.db"
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
+        self._ensure_dirs()
+
+    def _ensure_dirs(self) -> None:
+        """Ensure data directory and database schema exist."""
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and apply the schema."""
+        with self._lock:
+            if self._conn is None:
+                self.data_dir.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA foreign_keys=ON")
+                conn.executescript(SCHEMA)
+                self._conn = conn
+                self._migrate(conn)
+            return self._conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Add columns missing in databases created by older versions."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(songs)")}
+        missing = {name: ddl for name, ddl in SONG_MIGRATIONS.items() if name not in columns}
+        if not missing:
+            return
+
+        with conn:
+            for name, ddl in missing.items():
+                conn.execute(f"ALTER TABLE songs ADD COLUMN {name} {ddl}")
+        for song in self.get_songs():
+            self.save_song(song)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # Devices
+
+    def get_devices(self) -> list[Device]:
+        """Load all devices in their saved order."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, name, description, action_types, midi_channel "
+                "FROM devices ORDER BY position"
+            ).fetchall()
+        return [self._row_to_device(row) for row in rows]
+
+    def get_device(self, device_id: str) -> Device | None:
+        """Get a single device by ID."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, name, description, action_types, midi_channel "
+                "FROM devices WHERE id = ?",
+                (device_id,),
+            ).fetchone()
+        return self._row_to_device(row) if row else None
+
+    def save_devices(self, devices: list[Device]) -> None:
+        """Replace all devices."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM devices")
+                conn.executemany(
+                    "INSERT INTO devices (id, position, name, description, action_types, midi_channel) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            d.id, pos, d.name, d.description,
+                            json.dumps([t.value for t in d.action_types]), d.midi_channel,
+                        )
+                        for pos, d in enumerate(devices)
+                    ],
+                )
+
+    @staticmethod
+    def _row_to_device(row: sqlite3.Row) -> Device:
+        return Device.model_validate({
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "action_types": json.loads(row["action_types"]),
+            "midi_channel": row["midi_channel"],
+        })
+
+    # Songs order
+
+    def get_songs_order(self) -> list[str]:
+        """Load song IDs order."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT song_id FROM songs_order ORDER BY position"
+            ).fetchall()
+        return [row["song_id"] for row in rows]
+
+    def save_songs_order(self, order: list[str]) -> None:
+        """Replace song IDs order."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM songs_order")
+                conn.executemany(
+                    "INSERT INTO songs_order (position, song_id) VALUES (?, ?)",
+                    list(enumerate(order)),
+                )
+
+    # Songs
+
+    def get_songs(self) -> list[Song]:
+        """Load all songs: ordered ones first, the rest alphabetically by ID."""
+        with self._lock:
+            conn = self._connect()
+            song_rows = conn.execute(
+                f"SELECT {SONG_COLUMNS} FROM songs s "
+                "LEFT JOIN (SELECT song_id, MIN(position) AS position FROM songs_order "
+                "GROUP BY song_id) o ON o.song_id = s.id "
+                "ORDER BY o.position IS NULL, o.position, s.id"
+            ).fetchall()
+            button_rows = conn.execute(
+                "SELECT song_id, idx, name FROM buttons ORDER BY song_id, idx"
+            ).fetchall()
+            action_rows = conn.execute(
+                f"SELECT {ACTION_COLUMNS} FROM actions ORDER BY song_id, button_idx, idx"
+            ).fetchall()
+        return self._assemble_songs(song_rows, button_rows, action_rows)
+
+    def get_song_summaries(self) -> list[SongSummary]:
+        """List song summaries from the songs table only (no buttons/actions)."""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM songs s "
+                "LEFT JOIN (SELECT song_id, MIN(position) AS position FROM songs_order "
+                "GROUP BY song_id) o ON o.song_id = s.id "
+                "ORDER BY o.position IS NULL, o.position, s.id"
+            ).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+
+    def get_song_summary(self, song_id: str) -> SongSummary | None:
+        """Summary of one song (primary-key lookup)."""
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM songs s WHERE s.id = ?", (song_id,)
+            ).fetchone()
+        return self._row_to_summary(row) if row else None
+
+    def flush_summaries(self) -> None:
+        """Summaries are columns of the songs table; nothing to flush."""
+
+    @staticmethod
+    def _row_to_summary(row: sqlite3.Row) -> SongSummary:
+        return SongSummary(
+            id=row["id"],
+            name=row["name"],
+            notes=row["notes"],
+            target_preset=row["target_preset"],
+            button_count=row["button_count"],
+            devices=json.loads(row["devices"]),
+            content_hash=row["content_hash"],
+        )
+
+    def get_song(self, song_id: str) -> Song | None:
+        """Load a single song by ID (primary-key lookups only)."""
+        with self._lock:
+            conn = self._connect()
+            song_rows = conn.execute(
+                f"SELECT {SONG_COLUMNS} FROM songs s WHERE s.id = ?", (song_id,)
+            ).fetchall()
+            if not song_rows:
+                return None
+            button_rows = conn.execute(
+                "SELECT song_id, idx, name FROM buttons WHERE song_id = ? ORDER BY idx",
+                (song_id,),
+            ).fetchall()
+            action_rows = conn.execute(
+                f"SELECT {ACTION_COLUMNS} FROM actions WHERE song_id = ? "
+                "ORDER BY button_idx, idx",
+                (song_id,),
+            ).fetchall()
+        return self._assemble_songs(song_rows, button_rows, action_rows)[0]
+
+    @staticmethod
+    def _assemble_songs(song_rows, button_rows, action_rows) -> list[Song]:
+        """Build Song models from row sets sorted by (song_id, button_idx, idx)."""
+        actions: dict[tuple[str, int], list[dict]] = {}
+        for row in action_rows:
+            action = {
+                "device": row["device"],
+                "type": row["type"],
+                "value": row["value"],
+                "cc": row["cc"],
+                "label": row["label"],
+                "bank_lsb": row["bank_lsb"],
+                "bank_msb": row["bank_msb"],
+                "note": row["note"],
+                "velocity": row["velocity"],
+            }
+            actions.setdefault((row["song_id"], row["button_idx"]), []).append(action)
+
+        buttons: dict[str, list[dict]] = {}
+        for row in button_rows:
+            buttons.setdefault(row["song_id"], []).append({
+                "name": row["name"],
+                "actions": actions.get((row["song_id"], row["idx"]), []),
+            })
+
+        return [
+            Song.model_validate({
+                "song": {
+                    "id": row["id"],
+                    "name": row["name"],
+                    "author": row["author"],
+                    "created": row["created"],
+                    "notes": row["notes"],
+                    "pacer_export": {"target_preset": row["target_preset"]},
+                },
+                "pacer": buttons.get(row["id"], []),
+            })
+            for row in song_rows
+        ]
+
+    def save_song(self, song: Song) -> None:
+        """Insert or replace a song with its buttons and actions."""
+        meta = song.song
+        summary = SongSummary.from_song(song)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM songs WHERE id = ?", (meta.id,))
+                conn.execute(
+                    "INSERT INTO songs (id, name, author, created, notes, target_preset, "
+                    "button_count, devices, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        meta.id, meta.name, meta.author, meta.created.isoformat(),
+                        meta.notes, meta.pacer_export.target_preset,
+                        summary.button_count, json.dumps(summary.devices), summary.content_hash,
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO buttons (song_id, idx, name) VALUES (?, ?, ?)",
+                    [(meta.id, idx, button.name) for idx, button in enumerate(song.pacer)],
+                )
+                conn.executemany(
+                    f"INSERT INTO actions (idx, {ACTION_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            idx, meta.id, button_idx, action.device, action.type.value,
+                            action.value, action.cc, action.label, action.bank_lsb,
+                            action.bank_msb, action.note, action.velocity,
+                        )
+                        for button_idx, button in enumerate(song.pacer)
+                        for idx, action in enumerate(button.actions)
+                    ],
+                )
+
+    def delete_song(self, song_id: str) -> bool:
+        """Delete a song. Returns True if deleted, False if not found."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute("DELETE FROM songs WHERE id = ?", (song_id,))
+        return cursor.rowcount > 0
+
+    def song_exists(self, song_id: str) -> bool:
+        """Check if a song with given ID exists."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT 1 FROM songs WHERE id = ?", (song_id,)
+            ).fetchone()
+        return row is not None
+
+    # Pacer config
+
+    def get_pacer_config(self) -> PacerConfig | None:
+        """Load Pacer configuration."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM settings WHERE key = 'pacer'"
+            ).fetchone()
+        if row is None:
+            return None
+        return PacerConfig.model_validate_json(row["value"])
+
+    def save_pacer_config(self, config: PacerConfig) -> None:
+        """Save Pacer configuration."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES ('pacer', ?)",
+                    (config.model_dump_json(),),
+                )
+
+    def load_snapshot(self) -> LibrarySnapshot:
+        """Build the library snapshot straight from the database (no file cache)."""
+        songs = self.get_songs()
+        devices = self.get_devices()
+        order = self.get_songs_order()
+        return LibrarySnapshot(
+            manifest={},
+            songs=songs,
+            devices=devices,
+            order=order,
+            midi_index=SongMidiIndex.build(songs, devices, order),
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI: copy the library between YAML files and the SQLite database."""
+    parser = argparse.ArgumentParser(
+        prog="python -m paternologia.sqlite_storage",
+        description="Import/export Paternologia library between YAML and SQLite.",
+    )
+    parser.add_argument("command", choices=["import-yaml", "export-yaml"])
+    parser.add_argument("--data-dir", default="data", help="YAML data directory")
+    parser.add_argument("--db", default=None, help="SQLite file (default: <data-dir>/paternologia.db)")
+    args = parser.parse_args(argv)
+
+    yaml_storage = Storage(data_dir=args.data_dir)
+    sqlite_storage = SqliteStorage(data_dir=args.data_dir, db_file=args.db)
+    try:
+        if args.command == "import-yaml":
+            count = copy_library(yaml_storage, sqlite_storage)
+        else:
+            count = copy_library(sqlite_storage, yaml_storage)
+    finally:
+        sqlite_storage.close()
+    print(f"{args.command}: {count} songs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,141 @@
 # ABOUTME: YAML-based storage layer for Paternologia devices and songs.
 # ABOUTME: Handles reading/writing device configs and song files from data/ directory.
 
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from typing import Any, Callable, Protocol, TypeVar
 
 import yaml
 
-from paternologia.models import Device, DevicesConfig, PacerConfig, Song, SongMetadata
+from paternologia.midi.index import SongMidiIndex
+from paternologia.models import (
+    Device,
+    DevicesConfig,
+    PacerConfig,
+    Song,
+    SongMetadata,
+    SongSummary,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Bump when LibrarySnapshot (or anything pickled inside it) changes shape.
+# snapshot_key() also folds in a schema fingerprint, so a forgotten bump
+# only costs a rebuild instead of loading objects with missing fields.
+SNAPSHOT_VERSION = 4
+SUMMARIES_VERSION = 1
+
+
+class StorageBackend(Protocol):
+    """Interface shared by storage backends (YAML files, SQLite)."""
+
+    def get_devices(self) -> list[Device]: ...
+
+    def get_device(self, device_id: str) -> Device | None: ...
+
+    def save_devices(self, devices: list[Device]) -> None: ...
+
+    def get_songs_order(self) -> list[str]: ...
+
+    def save_songs_order(self, order: list[str]) -> None: ...
+
+    def get_songs(self) -> list[Song]: ...
+
+    def get_song_summaries(self) -> list[SongSummary]: ...
+
+    def get_song_summary(self, song_id: str) -> SongSummary | None: ...
+
+    def flush_summaries(self) -> None: ...
+
+    def get_song(self, song_id: str) -> Song | None: ...
+
+    def save_song(self, song: Song) -> None: ...
+
+    def delete_song(self, song_id: str) -> bool: ...
+
+    def song_exists(self, song_id: str) -> bool: ...
+
+    def get_pacer_config(self) -> PacerConfig | None: ...
+
+    def save_pacer_config(self, config: PacerConfig) -> None: ...
+
+    def load_snapshot(self) -> "LibrarySnapshot": ...
+
+
+def copy_library(source: StorageBackend, target: StorageBackend) -> int:
+    """Mirror the whole library from source into target backend.
+
+    Songs missing in source are deleted from target. Used for YAML <-> SQLite
+    import/export. Returns the number of copied songs.
+    """
+    target.save_devices(source.get_devices())
+
+    songs = source.get_songs()
+    source_ids = {song.song.id for song in songs}
+    for song in target.get_songs():
+        if song.song.id not in source_ids:
+            target.delete_song(song.song.id)
+    for song in songs:
+        target.save_song(song)
+
+    target.save_songs_order(source.get_songs_order())
+    pacer_config = source.get_pacer_config()
+    if pacer_config is not None:
+        target.save_pacer_config(pacer_config)
+    return len(songs)
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of the parsed-file cache."""
+    hits: int = 0
+    misses: int = 0
+
+
+@dataclass
+class LibrarySnapshot:
+    """Validated library compiled into a single pickle for fast startup.
+
+    manifest maps data-relative paths to (mtime_ns, size) of the source
+    files; the snapshot is valid only while the manifest matches disk.
+    """
+    manifest: dict[str, tuple[int, int]]
+    songs: list[Song]
+    devices: list[Device]
+    order: list[str]
+    midi_index: SongMidiIndex
+    song_files: dict[str, Song | None] = field(default_factory=dict)
+
+
+@functools.cache
+def snapshot_key() -> tuple[int, str]:
+    """(SNAPSHOT_VERSION, fingerprint of every class pickled in LibrarySnapshot)."""
+    layout = {
+        "snapshot": [f.name for f in fields(LibrarySnapshot)],
+        "song": Song.model_json_schema(),
+        "device": Device.model_json_schema(),
+        "midi_index": sorted(vars(SongMidiIndex({}))),
+    }
+    fingerprint = hashlib.sha256(json.dumps(layout, sort_keys=True).encode()).hexdigest()[:16]
+    return SNAPSHOT_VERSION, fingerprint
 
 
 class Storage:
-    """YAML file storage for devices and songs."""
+    """YAML file storage for devices and songs.
+
+    Parsed files are cached in memory keyed by (mtime_ns, size), so
+    repeated reads of unchanged files skip YAML parsing and validation.
+    Returned models are shared between callers - treat them as read-only.
+    """
 
     def __init__(self, data_dir: Path | str = "data"):
         self.data_dir = Path(data_dir)
@@ -17,22 +143,74 @@ class Storage:
         self.songs_dir = self.data_dir / "songs"
         self.pacer_config_file = self.data_dir / "pacer.yaml"
         self.songs_order_file = self.data_dir / "songs_order.yaml"
+        self.snapshot_file = self.data_dir / ".cache" / "library.pickle"
+        self.summaries_file = self.data_dir / ".cache" / "summaries.json"
+        self.cache_stats = CacheStats()
+        self._cache: dict[Path, tuple[tuple[int, int], Any]] = {}
+        self._cache_lock = threading.Lock()
+        # song file name -> ((mtime_ns, size), summary); loaded lazily from summaries_file
+        self._summaries: dict[str, tuple[tuple[int, int], SongSummary | None]] | None = None
+        self._summaries_lock = threading.Lock()
+        self._summaries_dirty = False
+        self._ensure_dirs()
 
     def _ensure_dirs(self) -> None:
         """Ensure data directories exist."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.songs_dir.mkdir(parents=True, exist_ok=True)
 
+    def _read_cached(self, path: Path, parse: Callable[[Any], Any]) -> Any:
+        """Return parse(yaml data) for path, re-reading only if mtime/size changed.
+
+        Returns None when the file does not exist.
+        """
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._invalidate(path)
+            return None
+
+        key = (st.st_mtime_ns, st.st_size)
+        entry = self._cache.get(path)
+        if entry is not None and entry[0] == key:
+            with self._cache_lock:
+                self.cache_stats.hits += 1
+            return entry[1]
+
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+        value = parse(data)
+
+        with self._cache_lock:
+            self.cache_stats.misses += 1
+            self._cache[path] = (key, value)
+        return value
+
+    def _write_yaml(self, path: Path, data: Any) -> None:
+        """Write YAML atomically (temp file + rename) and drop the cache entry.
+
+        Readers in other threads never observe a half-written file.
+        """
+        tmp_file = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        os.replace(tmp_file, path)
+        self._invalidate(path)
+
+    def _invalidate(self, path: Path) -> None:
+        """Drop a cached entry (after write/delete)."""
+        with self._cache_lock:
+            self._cache.pop(path, None)
+
     def get_devices(self) -> list[Device]:
         """Load all devices from devices.yaml."""
-        if not self.devices_file.exists():
+        devices = self._read_cached(
+            self.devices_file,
+            lambda data: DevicesConfig.model_validate(data or {}).devices,
+        )
+        if devices is None:
             return []
-
-        with open(self.devices_file, encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-
-        config = DevicesConfig.model_validate(data)
-        return config.devices
+        return list(devices)
 
     def get_device(self, device_id: str) -> Device | None:
         """Get a single device by ID."""
@@ -48,28 +226,23 @@ class Storage:
         config = DevicesConfig(devices=devices)
         data = config.model_dump(mode="json")
 
-        with open(self.devices_file, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        self._write_yaml(self.devices_file, data)
 
     def get_songs_order(self) -> list[str]:
         """Load song IDs order from songs_order.yaml."""
-        if not self.songs_order_file.exists():
+        order = self._read_cached(
+            self.songs_order_file,
+            lambda data: data if data and isinstance(data, list) else [],
+        )
+        if order is None:
             return []
-
-        with open(self.songs_order_file, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-
-        if not data or not isinstance(data, list):
-            return []
-
-        return data
+        return list(order)
 
     def save_songs_order(self, order: list[str]) -> None:
         """Save song IDs order to songs_order.yaml."""
         self._ensure_dirs()
 
-        with open(self.songs_order_file, "w", encoding="utf-8") as f:
-            yaml.dump(order, f, default_flow_style=False, allow_unicode=True)
+        self._write_yaml(self.songs_order_file, order)
 
     def get_songs(self) -> list[Song]:
         """Load all songs from songs/ directory, respecting order from songs_order.yaml."""
@@ -77,25 +250,158 @@ class Storage:
             return []
 
         songs_by_id: dict[str, Song] = {}
-        for song_file in self.songs_dir.glob("*.yaml"):
+        song_files = set(self.songs_dir.glob("*.yaml"))
+        for song_file in song_files:
             song = self._load_song_file(song_file)
             if song:
                 songs_by_id[song.song.id] = song
+        self._prune_song_cache(song_files)
 
+        return self._apply_order(songs_by_id)
+
+    def _apply_order(self, items_by_id: dict[str, T]) -> list[T]:
+        """Order items by songs_order.yaml; the rest follow alphabetically by ID."""
         order = self.get_songs_order()
-        ordered_songs: list[Song] = []
+        ordered: list[T] = []
         seen_ids: set[str] = set()
 
         for song_id in order:
-            if song_id in songs_by_id:
-                ordered_songs.append(songs_by_id[song_id])
+            if song_id in items_by_id and song_id not in seen_ids:
+                ordered.append(items_by_id[song_id])
                 seen_ids.add(song_id)
 
-        remaining_ids = sorted(set(songs_by_id.keys()) - seen_ids)
+        remaining_ids = sorted(set(items_by_id.keys()) - seen_ids)
         for song_id in remaining_ids:
-            ordered_songs.append(songs_by_id[song_id])
+            ordered.append(items_by_id[song_id])
+
+        return ordered
+
+    def get_song_summaries(self) -> list[SongSummary]:
+        """List songs as summaries, respecting order from songs_order.yaml.
 
-        return ordered_songs
+        Summaries are persisted in .cache/summaries.json and keyed by file
+        (mtime_ns, size); only new or changed song files are fully parsed.
+        """
+        if not self.songs_dir.exists():
+            return []
+
+        with self._summaries_lock:
+            summaries = self._load_summaries()
+            changed = False
+            seen: set[str] = set()
+
+            for song_file in self.songs_dir.glob("*.yaml"):
+                try:
+                    st = song_file.stat()
+                except FileNotFoundError:
+                    continue
+                seen.add(song_file.name)
+                key = (st.st_mtime_ns, st.st_size)
+                entry = summaries.get(song_file.name)
+                if entry is not None and entry[0] == key:
+                    continue
+
+                song = self._load_song_file(song_file)
+                summaries[song_file.name] = (key, SongSummary.from_song(song) if song else None)
+                changed = True
+
+            for name in set(summaries) - seen:
+                del summaries[name]
+                changed = True
+
+            if changed or self._summaries_dirty:
+                self._write_summaries(summaries)
+            by_id = {summary.id: summary for _, summary in summaries.values() if summary}
+
+        return self._apply_order(by_id)
+
+    def get_song_summary(self, song_id: str) -> SongSummary | None:
+        """Summary (incl. content hash) of one song; parses YAML only if the file changed.
+
+        A miss only updates the in-memory index; summaries.json is written on
+        the next get_song_summaries() scan or flush_summaries().
+        """
+        song_file = self.songs_dir / f"{song_id}.yaml"
+        try:
+            st = song_file.stat()
+        except FileNotFoundError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+
+        with self._summaries_lock:
+            entry = self._load_summaries().get(song_file.name)
+            if entry is not None and entry[0] == key:
+                return entry[1]
+
+        song = self._load_song_file(song_file)
+        summary = SongSummary.from_song(song) if song else None
+        with self._summaries_lock:
+            summaries = self._load_summaries()
+            summaries[song_file.name] = (key, summary)
+            self._summaries_dirty = True
+        return summary
+
+    def flush_summaries(self) -> None:
+        """Write summaries.json if single-song lookups left it stale."""
+        with self._summaries_lock:
+            if self._summaries_dirty:
+                self._write_summaries(self._load_summaries())
+
+    def _load_summaries(self) -> dict[str, tuple[tuple[int, int], SongSummary | None]]:
+        """Return the in-memory summary index, reading summaries_file on first use."""
+        if self._summaries is not None:
+            return self._summaries
+
+        self._summaries = {}
+        try:
+            with open(self.summaries_file, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SUMMARIES_VERSION:
+                for name, entry in data["songs"].items():
+                    summary = entry["summary"]
+                    self._summaries[name] = (
+                        tuple(entry["stat"]),
+                        SongSummary.model_validate(summary) if summary else None,
+                    )
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Ignoring unreadable song summaries: %s", e)
+            self._summaries = {}
+        return self._summaries
+
+    def _write_summaries(self, summaries: dict[str, tuple[tuple[int, int], SongSummary | None]]) -> None:
+        """Persist the summary index atomically."""
+        data = {
+            "version": SUMMARIES_VERSION,
+            "songs": {
+                name: {
+                    "stat": list(key),
+                    "summary": summary.model_dump(mode="json") if summary else None,
+                }
+                for name, (key, summary) in summaries.items()
+            },
+        }
+        self.summaries_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.summaries_file.with_name(f".{self.summaries_file.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_file, self.summaries_file)
+            self._summaries_dirty = False
+        except OSError as e:
+            logger.warning("Cannot write song summaries: %s", e)
+
+    def _update_summary(self, song_file: Path, song: Song | None) -> None:
+        """Record the summary of a just-written (or deleted, song=None) file."""
+        with self._summaries_lock:
+            summaries = self._load_summaries()
+            if song is None:
+                summaries.pop(song_file.name, None)
+            else:
+                st = song_file.stat()
+                summaries[song_file.name] = ((st.st_mtime_ns, st.st_size), SongSummary.from_song(song))
+            self._write_summaries(summaries)
 
     def get_song(self, song_id: str) -> Song | None:
         """Load a single song by ID."""
@@ -107,13 +413,20 @@ class Storage:
 
     def _load_song_file(self, song_file: Path) -> Song | None:
         """Load and parse a song YAML file."""
-        with open(song_file, encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-
-        if not data:
-            return None
-
-        return Song.model_validate(data)
+        return self._read_cached(
+            song_file,
+            lambda data: Song.model_validate(data) if data else None,
+        )
+
+    def _prune_song_cache(self, song_files: set[Path]) -> None:
+        """Forget cached songs whose files disappeared from songs/."""
+        with self._cache_lock:
+            stale = [
+                path for path in self._cache
+                if path.parent == self.songs_dir and path not in song_files
+            ]
+            for path in stale:
+                del self._cache[path]
 
     def save_song(self, song: Song) -> None:
         """Save a song to its YAML file."""
@@ -121,8 +434,8 @@ class Storage:
         song_file = self.songs_dir / f"{song.song.id}.yaml"
         data = song.model_dump(mode="json")
 
-        with open(song_file, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        self._write_yaml(song_file, data)
+        self._update_summary(song_file, song)
 
     def delete_song(self, song_id: str) -> bool:
         """Delete a song file. Returns True if deleted, False if not found."""
@@ -131,6 +444,8 @@ class Storage:
             return False
 
         song_file.unlink()
+        self._invalidate(song_file)
+        self._update_summary(song_file, None)
         return True
 
     def song_exists(self, song_id: str) -> bool:
@@ -140,21 +455,107 @@ class Storage:
 
     def get_pacer_config(self) -> PacerConfig | None:
         """Load Pacer configuration from pacer.yaml."""
-        if not self.pacer_config_file.exists():
-            return None
-
-        with open(self.pacer_config_file, encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-
-        if not data:
-            return None
-
-        return PacerConfig.model_validate(data)
+        return self._read_cached(
+            self.pacer_config_file,
+            lambda data: PacerConfig.model_validate(data) if data else None,
+        )
 
     def save_pacer_config(self, config: PacerConfig) -> None:
         """Save Pacer configuration to pacer.yaml."""
         self._ensure_dirs()
         data = config.model_dump(mode="json")
 
-        with open(self.pacer_config_file, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        self._write_yaml(self.pacer_config_file, data)
+
+    def _manifest(self) -> dict[str, tuple[int, int]]:
+        """Stat every library source file (no parsing)."""
+        files = [self.devices_file, self.songs_order_file]
+        if self.songs_dir.exists():
+            files.extend(sorted(self.songs_dir.glob("*.yaml")))
+
+        manifest: dict[str, tuple[int, int]] = {}
+        for path in files:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            manifest[path.relative_to(self.data_dir).as_posix()] = (st.st_mtime_ns, st.st_size)
+        return manifest
+
+    def load_snapshot(self) -> LibrarySnapshot:
+        """Load the compiled library snapshot, rebuilding it if any source file changed.
+
+        When the manifest matches, the whole library comes from one file read
+        and the parsed-file cache is seeded, so later requests hit memory too.
+        """
+        manifest = self._manifest()
+        snapshot = self._read_snapshot()
+        if snapshot is not None and snapshot.manifest == manifest:
+            self._seed_cache(snapshot)
+            logger.info("Loaded library snapshot (%d songs)", len(snapshot.songs))
+            return snapshot
+
+        songs = self.get_songs()
+        devices = self.get_devices()
+        order = self.get_songs_order()
+        song_files: dict[str, Song | None] = {}
+        if self.songs_dir.exists():
+            for path in sorted(self.songs_dir.glob("*.yaml")):
+                song_files[path.relative_to(self.data_dir).as_posix()] = self._load_song_file(path)
+
+        snapshot = LibrarySnapshot(
+            manifest=manifest,
+            songs=songs,
+            devices=devices,
+            order=order,
+            midi_index=SongMidiIndex.build(songs, devices, order),
+            song_files=song_files,
+        )
+        self._write_snapshot(snapshot)
+        logger.info("Rebuilt library snapshot (%d songs)", len(songs))
+        return snapshot
+
+    def _read_snapshot(self) -> LibrarySnapshot | None:
+        """Read snapshot file; None if missing, stale format or unreadable."""
+        try:
+            with open(self.snapshot_file, "rb") as f:
+                # Key first: a stale snapshot is never unpickled
+                if pickle.load(f) != snapshot_key():
+                    return None
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable library snapshot: %s", e)
+            return None
+
+        if not isinstance(snapshot, LibrarySnapshot):
+            return None
+        return snapshot
+
+    def _write_snapshot(self, snapshot: LibrarySnapshot) -> None:
+        """Atomically replace the snapshot file."""
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.snapshot_file.with_suffix(".tmp")
+        try:
+            with open(tmp_file, "wb") as f:
+                pickle.dump(snapshot_key(), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.snapshot_file)
+        except OSError as e:
+            logger.warning("Cannot write library snapshot: %s", e)
+
+    def _seed_cache(self, snapshot: LibrarySnapshot) -> None:
+        """Fill the parsed-file cache from a valid snapshot."""
+        values: dict[Path, Any] = {
+            self.devices_file: snapshot.devices,
+            self.songs_order_file: snapshot.order,
+        }
+        for rel_path, song in snapshot.song_files.items():
+            values[self.data_dir / rel_path] = song
+
+        with self._cache_lock:
+            for path, value in values.items():
+                key = snapshot.manifest.get(path.relative_to(self.data_dir).as_posix())
+                if key is not None:
+                    self._cache[path] = (key, value)
@@ -2,6 +2,7 @@
 # ABOUTME: Tests songs CRUD and devices endpoints using FastAPI TestClient.
 
 import tempfile
+import time
 from pathlib import Path
 
 import pytest
@@ -26,7 +27,6 @@ def temp_data_dir():
 def test_storage(temp_data_dir):
     """Create storage with temporary directory."""
     storage = Storage(data_dir=temp_data_dir)
-    storage._ensure_dirs()
     return storage
 
 
@@ -110,6 +110,18 @@ class TestDevicesEndpoints:
         assert data[0]["id"] == "boss"
         assert data[1]["id"] == "ms"
 
+    def test_devices_json_etag(self, client, sample_devices, test_storage):
+        """Matching If-None-Match returns 304; device changes change the ETag."""
+        etag = client.get("/api/devices").headers["etag"]
+
+        response = client.get("/api/devices", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        test_storage.save_devices(sample_devices[:1])
+        response = client.get("/api/devices", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
 
 class TestSongView:
     """Tests for song view page."""
@@ -133,6 +145,26 @@ class TestSongView:
         assert "Test Song" in response.text
         assert "Test notes" in response.text
 
+    def test_view_song_etag(self, client, sample_devices, test_storage):
+        """Unchanged song returns 304 without rendering; edits invalidate the ETag."""
+        from paternologia.models import Song, SongMetadata
+
+        song = Song(song=SongMetadata(id="test", name="Test Song"))
+        test_storage.save_song(song)
+        etag = client.get("/songs/test").headers["etag"]
+
+        with patch("paternologia.routers.songs.get_templates") as templates:
+            response = client.get("/songs/test", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        templates.assert_not_called()
+
+        song.song.name = "Renamed"
+        test_storage.save_song(song)
+        response = client.get("/songs/test", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert "Renamed" in response.text
+
 
 class TestSongEdit:
     """Tests for song edit page."""
@@ -331,8 +363,25 @@ class TestSongPacerExport:
         assert song.song.pacer_export.target_preset == "A1"
 
 
+def send_and_wait(client, song_id: str, data: dict | None = None) -> dict:
+    """POST /pacer/send and poll the job until it finishes; returns the job."""
+    response = client.post(f"/pacer/send/{song_id}", data=data)
+    assert response.status_code == 202
+    return wait_for_job(client, response.json()["job_id"])
+
+
+def wait_for_job(client, job_id: str) -> dict:
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        job = client.get(f"/pacer/jobs/{job_id}").json()
+        if job["state"] in ("done", "failed", "cancelled"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
 class TestPacerSendEndpoint:
-    """Tests for POST /pacer/send/{song_id} endpoint."""
+    """Tests for POST /pacer/send/{song_id} endpoint (queued send jobs)."""
 
     def test_send_to_pacer_success(self, client, sample_devices, test_storage):
         """Successfully sends .syx to Pacer via amidi."""
@@ -348,12 +397,13 @@ class TestPacerSendEndpoint:
         mock_result.returncode = 0
         mock_result.stderr = ""
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value="hw:8,0,0"):
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
             with patch("subprocess.run", return_value=mock_result) as mock_run:
-                response = client.post("/pacer/send/test")
+                job = send_and_wait(client, "test")
 
-                assert response.status_code == 200
-                data = response.json()
+                assert job["state"] == "done"
+                assert job["sent"] == job["total"]
+                data = job["result"]
                 assert data["status"] == "ok"
                 assert data["preset"] == "A1"
                 assert data["port"] == "hw:8,0,0"
@@ -365,6 +415,57 @@ class TestPacerSendEndpoint:
                 assert "hw:8,0,0" in call_args
                 assert "-s" in call_args
 
+    def test_send_to_pacer_returns_job(self, client, sample_devices, test_storage):
+        """The request returns 202 with a job id right away."""
+        from paternologia.models import Song, SongMetadata
+
+        test_storage.save_song(Song(song=SongMetadata(id="test", name="Test Song")))
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER"))
+
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value=None):
+            response = client.post("/pacer/send/test")
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["job_id"]
+        assert data["song_id"] == "test"
+        assert data["deduped"] is False
+
+    def test_send_to_pacer_htmx_returns_progress_partial(self, client, sample_devices, test_storage):
+        """HTMX request gets a partial that follows the job over SSE."""
+        from paternologia.models import Song, SongMetadata
+
+        test_storage.save_song(Song(song=SongMetadata(id="test", name="Test Song")))
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER"))
+
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value=None):
+            response = client.post("/pacer/send/test", headers={"HX-Request": "true"})
+
+        assert response.status_code == 200
+        assert "/pacer/jobs/" in response.text
+        assert "/events" in response.text
+
+    def test_job_not_found(self, client, sample_devices, test_storage):
+        """Unknown job id returns 404."""
+        assert client.get("/pacer/jobs/nope").status_code == 404
+        assert client.post("/pacer/jobs/nope/cancel").status_code == 404
+        assert client.get("/pacer/jobs/nope/events").status_code == 404
+
+    def test_job_events_stream_final_state(self, client, sample_devices, test_storage):
+        """SSE stream of a finished job sends its final state and ends."""
+        from paternologia.models import Song, SongMetadata
+
+        test_storage.save_song(Song(song=SongMetadata(id="test", name="Test Song")))
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER"))
+
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value=None):
+            job = send_and_wait(client, "test")
+
+        response = client.get(f"/pacer/jobs/{job['job_id']}/events")
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "event: job" in response.text
+        assert '"state": "failed"' in response.text
+
     def test_send_to_pacer_custom_preset(self, client, sample_devices, test_storage):
         """Sends .syx with custom preset override."""
         from paternologia.models import Song, SongMetadata
@@ -379,13 +480,12 @@ class TestPacerSendEndpoint:
         mock_result.returncode = 0
         mock_result.stderr = ""
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value="hw:8,0,0"):
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
             with patch("subprocess.run", return_value=mock_result):
-                response = client.post("/pacer/send/test", data={"preset": "B3"})
+                job = send_and_wait(client, "test", data={"preset": "B3"})
 
-                assert response.status_code == 200
-                data = response.json()
-                assert data["preset"] == "B3"
+                assert job["state"] == "done"
+                assert job["result"]["preset"] == "B3"
 
     def test_send_to_pacer_uses_song_default_preset(self, client, sample_devices, test_storage):
         """Uses song's default preset when not specified in query."""
@@ -407,13 +507,11 @@ class TestPacerSendEndpoint:
         mock_result.returncode = 0
         mock_result.stderr = ""
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value="hw:8,0,0"):
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
             with patch("subprocess.run", return_value=mock_result):
-                response = client.post("/pacer/send/test")
+                job = send_and_wait(client, "test")
 
-                assert response.status_code == 200
-                data = response.json()
-                assert data["preset"] == "C4"
+                assert job["result"]["preset"] == "C4"
 
     def test_send_to_pacer_song_not_found(self, client, sample_devices, test_storage):
         """Returns 404 when song doesn't exist."""
@@ -444,13 +542,12 @@ class TestPacerSendEndpoint:
         config = PacerConfig(device_name="PACER")
         test_storage.save_pacer_config(config)
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value="hw:8,0,0"):
-            response = client.post("/pacer/send/test", data={"preset": "E1"})
-            assert response.status_code == 400
-            assert "Invalid preset" in response.json()["detail"]
+        response = client.post("/pacer/send/test", data={"preset": "E1"})
+        assert response.status_code == 400
+        assert "Invalid preset" in response.json()["detail"]
 
     def test_send_to_pacer_device_not_found(self, client, sample_devices, test_storage):
-        """Returns 400 when device is not connected."""
+        """Job fails when device is not connected."""
         from paternologia.models import Song, SongMetadata
 
         song = Song(song=SongMetadata(id="test", name="Test Song"))
@@ -459,14 +556,14 @@ class TestPacerSendEndpoint:
         config = PacerConfig(device_name="PACER")
         test_storage.save_pacer_config(config)
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value=None):
-            response = client.post("/pacer/send/test")
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value=None):
+            job = send_and_wait(client, "test")
 
-            assert response.status_code == 400
-            assert "Nie znaleziono" in response.json()["detail"]
+            assert job["state"] == "failed"
+            assert "Nie znaleziono" in job["error"]
 
     def test_send_to_pacer_amidi_not_found(self, client, sample_devices, test_storage):
-        """Returns 500 when amidi is not installed."""
+        """Job fails when amidi is not installed."""
         from paternologia.models import Song, SongMetadata
 
         song = Song(song=SongMetadata(id="test", name="Test Song"))
@@ -475,15 +572,15 @@ class TestPacerSendEndpoint:
         config = PacerConfig(device_name="PACER")
         test_storage.save_pacer_config(config)
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value="hw:8,0,0"):
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
             with patch("subprocess.run", side_effect=FileNotFoundError):
-                response = client.post("/pacer/send/test")
+                job = send_and_wait(client, "test")
 
-                assert response.status_code == 500
-                assert "amidi not found" in response.json()["detail"]
+                assert job["state"] == "failed"
+                assert "amidi not found" in job["error"]
 
     def test_send_to_pacer_amidi_failure(self, client, sample_devices, test_storage):
-        """Returns 500 when amidi command fails."""
+        """Job fails when amidi command fails."""
         from paternologia.models import Song, SongMetadata
 
         song = Song(song=SongMetadata(id="test", name="Test Song"))
@@ -496,12 +593,226 @@ class TestPacerSendEndpoint:
         mock_result.returncode = 1
         mock_result.stderr = "Device not found"
 
-        with patch("paternologia.routers.pacer.find_amidi_port", return_value="hw:8,0,0"):
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
             with patch("subprocess.run", return_value=mock_result):
-                response = client.post("/pacer/send/test")
+                job = send_and_wait(client, "test")
+
+                assert job["state"] == "failed"
+                assert "amidi failed" in job["error"]
+
+    def test_send_to_pacer_skips_unchanged_frames(self, client, sample_devices, test_storage):
+        """Second send of an unchanged song transmits nothing; force_full resends all."""
+        from paternologia.models import Song, SongMetadata
+
+        test_storage.save_song(Song(song=SongMetadata(id="test", name="Test Song")))
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER", sysex_interval_ms=20))
+
+        mock_result = MagicMock()
+        mock_result.returncode = 0
+        mock_result.stderr = ""
+
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
+            with patch("subprocess.run", return_value=mock_result) as mock_run:
+                first = send_and_wait(client, "test")["result"]
+                second = send_and_wait(client, "test")["result"]
+                assert mock_run.call_count == 1
+
+                forced = send_and_wait(client, "test", data={"force_full": "true"})["result"]
+                assert mock_run.call_count == 2
+
+        assert first["frames_sent"] == first["frames_total"]
+        assert second["frames_sent"] == 0
+        assert second["ms_saved"] == second["frames_total"] * 20
+        assert forced["frames_sent"] == forced["frames_total"]
+
+    def test_send_failure_forgets_shadow(self, client, sample_devices, test_storage):
+        """After a failed send the next send is full again."""
+        from paternologia.models import Song, SongMetadata
+
+        test_storage.save_song(Song(song=SongMetadata(id="test", name="Test Song")))
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER"))
+
+        ok = MagicMock(returncode=0, stderr="")
+        failed = MagicMock(returncode=1, stderr="device busy")
+
+        with patch("paternologia.pacer.sender.find_amidi_port", return_value="hw:8,0,0"):
+            with patch("subprocess.run", side_effect=[ok, failed, ok]):
+                send_and_wait(client, "test")
+                send_and_wait(client, "test", data={"force_full": "true"})
+                job = send_and_wait(client, "test")
+
+        data = job["result"]
+        assert data["frames_sent"] == data["frames_total"]
+
+    def test_send_to_pacer_via_rtmidi(self, client, sample_devices, test_storage):
+        """With an rtmidi output port available, frames go out without amidi."""
+        from paternologia.midi.pool import MidiOutPool
+        from paternologia.models import Song, SongMetadata
+
+        test_storage.save_song(Song(song=SongMetadata(id="test", name="Test Song")))
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER", sysex_interval_ms=1))
 
-                assert response.status_code == 500
-                assert "amidi failed" in response.json()["detail"]
+        midi_out = MagicMock()
+        midi_out.get_ports.return_value = ["Midi Through", "PACER:PACER MIDI 1 20:0"]
+        midi_out.is_port_open.return_value = True
+        pool = MidiOutPool(opener=lambda name: (midi_out, 1))
+        client.app.state.midi_out_pool = pool
+
+        with patch("subprocess.run") as mock_run:
+            first = send_and_wait(client, "test")["result"]
+            second = send_and_wait(client, "test", data={"force_full": "true"})["result"]
+
+        assert first["transport"] == "rtmidi"
+        assert midi_out.send_message.call_count == first["frames_total"] + second["frames_total"]
+        mock_run.assert_not_called()
+        # Port stays open between sends
+        assert (pool.opens, pool.reuses) == (1, 1)
+        midi_out.close_port.assert_not_called()
+
+
+class TestPacerDeployEndpoint:
+    """Tests for POST /pacer/deploy (whole setlist in one transfer)."""
+
+    def test_deploy_setlist(self, client, sample_devices, test_storage):
+        """All setlist songs go out over one port lease; redeploy sends nothing."""
+        from paternologia.midi.pool import MidiOutPool
+        from paternologia.models import Song, SongMetadata
+
+        for song_id, preset in (("one", "A1"), ("two", "A2"), ("three", "A2")):
+            test_storage.save_song(Song(song=SongMetadata(
+                id=song_id, name=song_id, pacer_export=PacerExportSettings(target_preset=preset),
+            )))
+        test_storage.save_songs_order(["two", "one", "three", "gone"])
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER", sysex_interval_ms=1))
+
+        midi_out = MagicMock()
+        midi_out.get_ports.return_value = ["PACER:PACER MIDI 1 20:0"]
+        midi_out.is_port_open.return_value = True
+        pool = MidiOutPool(opener=lambda name: (midi_out, 0))
+        client.app.state.midi_out_pool = pool
+
+        response = client.post("/pacer/deploy")
+        assert response.status_code == 202
+        assert response.json()["kind"] == "deploy"
+        job = wait_for_job(client, response.json()["job_id"])
+
+        assert job["state"] == "done"
+        result = job["result"]
+        statuses = {s["song_id"]: s["status"] for s in result["songs"]}
+        assert statuses == {"two": "sent", "one": "sent", "three": "conflict", "gone": "missing"}
+        assert midi_out.send_message.call_count == result["frames_sent"]
+
+        again = wait_for_job(client, client.post("/pacer/deploy").json()["job_id"])
+        assert again["result"]["frames_sent"] == 0
+        assert pool.opens == 1
+
+    def test_deploy_empty_library(self, client, sample_devices, test_storage):
+        """Returns 400 when there is nothing to deploy."""
+        test_storage.save_pacer_config(PacerConfig(device_name="PACER"))
+
+        response = client.post("/pacer/deploy")
+        assert response.status_code == 400
+
+
+class TestPacerPlanEndpoint:
+    """Tests for POST /pacer/plan (preset slot allocation)."""
+
+    def test_plan_and_apply(self, client, sample_devices, test_storage):
+        """Default setlist is songs_order.yaml; apply writes target presets."""
+        from paternologia.models import Song, SongMetadata
+
+        for song_id in ("one", "two", "three"):
+            test_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+        test_storage.save_songs_order(["two", "three", "one"])
+
+        plan = client.post("/pacer/plan").json()
+        assert plan["initial"] == {"two": "A1", "three": "A2", "one": "A3"}
+        assert test_storage.get_song("three").song.pacer_export.target_preset == "A1"
+
+        client.post("/pacer/plan?apply=true")
+        assert test_storage.get_song("three").song.pacer_export.target_preset == "A2"
+
+    def test_plan_explicit_setlists(self, client, sample_devices, test_storage):
+        from paternologia.models import Song, SongMetadata
+
+        for song_id in ("one", "two"):
+            test_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+
+        plan = client.post("/pacer/plan", json=[["one"], ["two", "one"]]).json()
+        assert plan["uploads"] == 2
+        assert len(plan["steps"]) == 3
+
+    def test_apply_moves_songs_off_planned_slots(self, client, sample_devices, test_storage):
+        """Songs outside the plan that target a planned slot get a free one."""
+        from paternologia.models import Song, SongMetadata
+
+        for song_id in ("one", "two", "three"):
+            test_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+
+        plan = client.post("/pacer/plan?apply=true", json=[["one"]]).json()
+
+        assert plan["initial"] == {"one": "A1"}
+        assert plan["moved"] == {"three": "A2", "two": "A3"}
+        assert plan["conflicts"] == []
+        presets = {s: test_storage.get_song(s).song.pacer_export.target_preset for s in ("one", "two", "three")}
+        assert presets == {"one": "A1", "two": "A3", "three": "A2"}
+
+    def test_apply_uses_each_free_slot_once(self, client, sample_devices, test_storage):
+        """Moved songs skip slots other songs target; songs left over are reported."""
+        from paternologia.models import PacerExportSettings, Song, SongMetadata
+
+        planned = [f"p{i:02d}" for i in range(22)]
+        for song_id in planned + ["x1", "x2", "x3"]:
+            test_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+        test_storage.save_song(Song(song=SongMetadata(
+            id="keep", name="keep", pacer_export=PacerExportSettings(target_preset="D5"),
+        )))
+
+        plan = client.post("/pacer/plan?apply=true", json=[planned]).json()
+
+        assert plan["moved"] == {"x1": "D6"}
+        assert plan["conflicts"] == ["x2", "x3"]
+        assert test_storage.get_song("keep").song.pacer_export.target_preset == "D5"
+        assert test_storage.get_song("x2").song.pacer_export.target_preset == "A1"
+
+    def test_apply_reports_conflicts_when_plan_fills_all_slots(self, client, sample_devices, test_storage):
+        """With every slot planned, clashing songs are left as they are and reported."""
+        from paternologia.models import Song, SongMetadata
+
+        song_ids = [f"s{i:02d}" for i in range(25)]
+        for song_id in song_ids:
+            test_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+
+        plan = client.post("/pacer/plan?apply=true", json=[song_ids]).json()
+
+        assert len(plan["initial"]) == 24
+        assert plan["moved"] == {}
+        assert plan["conflicts"] == ["s24"]
+        assert test_storage.get_song("s24").song.pacer_export.target_preset == "A1"
+
+    def test_apply_does_not_touch_cached_song_on_failed_save(
+        self, client, sample_devices, test_storage, monkeypatch
+    ):
+        """apply edits a copy: a failed save leaves the shared parsed song unchanged."""
+        from paternologia.models import Song, SongMetadata
+
+        for song_id in ("one", "two"):
+            test_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+        test_storage.save_songs_order(["one", "two"])
+
+        def fail(song):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(test_storage, "save_song", fail)
+        with pytest.raises(OSError):
+            client.post("/pacer/plan?apply=true")
+
+        assert test_storage.get_song("two").song.pacer_export.target_preset == "A1"
+
+    def test_plan_unknown_song(self, client, sample_devices, test_storage):
+        response = client.post("/pacer/plan", json=[["ghost"]])
+        assert response.status_code == 400
+        assert "ghost" in response.json()["detail"]
 
 
 class TestSongsOrderEndpoint:
@@ -543,6 +854,16 @@ class TestSongsOrderEndpoint:
         assert response.status_code == 200
         assert response.json() == ["c", "a", "b"]
 
+    def test_get_songs_order_etag(self, client, sample_devices, test_storage):
+        """GET /api/songs/order supports If-None-Match."""
+        test_storage.save_songs_order(["c", "a"])
+        etag = client.get("/api/songs/order").headers["etag"]
+
+        assert client.get("/api/songs/order", headers={"If-None-Match": etag}).status_code == 304
+
+        test_storage.save_songs_order(["a", "c"])
+        assert client.get("/api/songs/order", headers={"If-None-Match": etag}).status_code == 200
+
     def test_get_songs_order_empty(self, client, sample_devices, test_storage):
         """GET /api/songs/order returns empty list when no order set."""
         response = client.get("/api/songs/order")
@@ -660,3 +981,53 @@ class TestHTMXPartials:
         assert 'name="button_0_action_0_label"' in response.text
         # Pattern does NOT need cc
         assert 'name="button_0_action_0_cc"' not in response.text
+
+
+class TestMidiIndexUpdates:
+    """Song CRUD applies per-song deltas to the live MIDI index."""
+
+    def _form(self, value: str) -> dict:
+        return {
+            "song_id": "zen",
+            "song_name": "Zen",
+            "button_0_name": "SW1",
+            "button_0_action_0_device": "boss",
+            "button_0_action_0_type": "preset",
+            "button_0_action_0_value": value,
+        }
+
+    def test_create_update_delete_update_index(self, client, test_storage):
+        test_storage.save_devices([
+            Device(id="boss", name="Boss RC-600", midi_channel=13,
+                   action_types=[ActionType.PRESET]),
+        ])
+
+        client.post("/songs", data=self._form("2"), follow_redirects=False)
+        assert client.app.state.midi_index.lookup(channel=12, program=2) == "zen"
+
+        client.put("/songs/zen", data=self._form("5"), follow_redirects=False)
+        assert client.app.state.midi_index.lookup(channel=12, program=2) is None
+        assert client.app.state.midi_index.lookup(channel=12, program=5) == "zen"
+
+        client.delete("/songs/zen", follow_redirects=False)
+        assert client.app.state.midi_index.lookup(channel=12, program=5) is None
+
+
+class TestRenderCacheUpdates:
+    """Song CRUD re-renders only the touched song in the render cache."""
+
+    def _form(self, name: str) -> dict:
+        return {"song_id": "zen", "song_name": name, "button_0_name": "SW1"}
+
+    def test_edits_refresh_cached_pages(self, client, sample_devices):
+        cache = client.app.state.render_cache
+
+        client.post("/songs", data=self._form("Zen"), follow_redirects=False)
+        assert "Zen" in cache.get("partials/live_song.html", "zen")
+
+        client.put("/songs/zen", data=self._form("Zen Remix"), follow_redirects=False)
+        assert "Zen Remix" in cache.get("song.html", "zen")
+        assert "Zen Remix" in client.get("/songs/zen").text
+
+        client.delete("/songs/zen", follow_redirects=False)
+        assert cache.get("song.html", "zen") is None
@@ -0,0 +1,195 @@
+# ABOUTME: Tests for the async storage facade used by async route handlers.
+# ABOUTME: Verifies thread offloading and measures event-loop lag under concurrent song saves.
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from paternologia import dependencies
+from paternologia.async_storage import AsyncStorage
+from paternologia.models import (
+    Action, ActionType, Device, PacerButton, Song, SongMetadata,
+)
+from paternologia.storage import Storage
+
+# Lag allowed on top of an idle-loop baseline. Storage I/O and template
+# renders run in worker threads; what remains is GIL hand-off between the
+# storage workers and the loop (tens of ms worst case).
+MAX_LOOP_LAG_S = 0.1
+
+
+@pytest.fixture
+def temp_data_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def test_storage(temp_data_dir):
+    storage = Storage(data_dir=temp_data_dir)
+    storage.save_devices([
+        Device(id="boss", name="RC-600", midi_channel=12,
+               action_types=[ActionType.PRESET, ActionType.CC]),
+    ])
+    return storage
+
+
+def _big_song(song_id: str) -> Song:
+    """Song with all 6 buttons x 6 actions (worst-case YAML size)."""
+    return Song(
+        song=SongMetadata(id=song_id, name=song_id.title()),
+        pacer=[
+            PacerButton(name=f"SW{b}", actions=[
+                Action(device="boss", type=ActionType.PRESET, value=b * 6 + a, label=f"L{a}")
+                for a in range(6)
+            ])
+            for b in range(6)
+        ],
+    )
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the worst delay between expected and actual wake-ups."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _idle_loop_lag(duration: float = 0.1) -> float:
+    """Baseline: lag of an idle loop on this machine (scheduler noise)."""
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop))
+    await asyncio.sleep(duration)
+    stop.set()
+    return await lag_task
+
+
+class TestAsyncStorage:
+    """Tests for AsyncStorage facade."""
+
+    async def test_roundtrip(self, test_storage):
+        storage = AsyncStorage(test_storage)
+        await storage.save_song(_big_song("zen"))
+
+        song, devices = await storage.get_song_with_devices("zen")
+
+        assert song.song.id == "zen"
+        assert [d.id for d in devices] == ["boss"]
+        assert await storage.song_exists("zen")
+        assert [s.song.id for s in await storage.get_songs()] == ["zen"]
+        assert await storage.delete_song("zen")
+
+    @pytest.mark.timing
+    async def test_concurrent_saves_keep_loop_responsive(self, test_storage):
+        """Many concurrent saves must not stall the event loop."""
+        storage = AsyncStorage(test_storage)
+        # Built up front: model validation on the loop is not what we measure
+        songs = [_big_song(f"song-{i % 8}") for i in range(64)]
+        baseline = await _idle_loop_lag()
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_measure_loop_lag(stop))
+
+        await asyncio.gather(*(storage.save_song(song) for song in songs))
+        stop.set()
+
+        assert await lag_task < baseline + MAX_LOOP_LAG_S
+        assert len(await storage.get_songs()) == 8
+
+
+@pytest.mark.timing
+class TestAsyncRoutesLoopLag:
+    """Event-loop lag while HTTP song saves hammer the app."""
+
+    async def test_song_updates_do_not_block_loop(self, test_storage):
+        from paternologia.main import app
+
+        original_storage = dependencies._storage
+        dependencies._storage = test_storage
+        for i in range(8):
+            test_storage.save_song(_big_song(f"song-{i}"))
+
+        form = {"song_name": "Hammer", "button_0_name": "SW1"}
+        for a in range(6):
+            form[f"button_0_action_{a}_device"] = "boss"
+            form[f"button_0_action_{a}_type"] = "preset"
+            form[f"button_0_action_{a}_value"] = str(a)
+
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                baseline = await _idle_loop_lag()
+                stop = asyncio.Event()
+                lag_task = asyncio.create_task(_measure_loop_lag(stop))
+
+                responses = await asyncio.gather(*(
+                    client.put(f"/songs/song-{i % 8}", data=form) for i in range(48)
+                ))
+                stop.set()
+                lag = await lag_task
+        finally:
+            dependencies._storage = original_storage
+
+        assert all(r.status_code == 303 for r in responses)
+        assert lag < baseline + MAX_LOOP_LAG_S
+
+
+class TestSongWriteOrdering:
+    """Concurrent edits of one song leave the MIDI index in line with the file."""
+
+    async def test_concurrent_updates_match_disk(self, test_storage):
+        from paternologia.main import app
+        from paternologia.midi.index import SongMidiIndex
+
+        original_storage = dependencies._storage
+        original_index = getattr(app.state, "midi_index", None)
+        dependencies._storage = test_storage
+        test_storage.save_song(_big_song("zen"))
+        app.state.midi_index = SongMidiIndex.build(test_storage.get_songs(), test_storage.get_devices())
+
+        def form(value: int) -> dict:
+            return {
+                "song_name": "Zen",
+                "button_0_name": "SW1",
+                "button_0_action_0_device": "boss",
+                "button_0_action_0_type": "preset",
+                "button_0_action_0_value": str(value),
+            }
+
+        # First save returns late, after later saves have written the file
+        save_song = test_storage.save_song
+
+        def slow_first_save(song):
+            save_song(song)
+            if song.pacer[0].actions[0].value == 0:
+                time.sleep(0.1)
+
+        test_storage.save_song = slow_first_save
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = asyncio.create_task(client.put("/songs/zen", data=form(0)))
+                await asyncio.sleep(0.02)
+                await asyncio.gather(first, *(client.put("/songs/zen", data=form(v)) for v in range(1, 5)))
+            index = app.state.midi_index
+        finally:
+            dependencies._storage = original_storage
+            app.state.midi_index = original_index
+
+        saved = test_storage.get_song("zen").pacer[0].actions[0].value
+        assert index.lookup(channel=11, program=saved) == "zen"
+        assert [p for p in range(5) if index.lookup(channel=11, program=p)] == [saved]
+
+
+class TestSongLock:
+    async def test_one_lock_per_song(self):
+        lock = AsyncStorage.song_lock("zen")
+
+        assert AsyncStorage.song_lock("zen") is lock
+        assert AsyncStorage.song_lock("rock") is not lock
@@ -24,7 +24,6 @@ def temp_data_dir():
 def test_storage(temp_data_dir):
     """Create storage with temporary directory."""
     storage = Storage(data_dir=temp_data_dir)
-    storage._ensure_dirs()
     return storage
 
 
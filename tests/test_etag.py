@@ -0,0 +1,49 @@
+# ABOUTME: Unit tests for ETag helpers used by conditional GET routes.
+# ABOUTME: Tests ETag construction and If-None-Match matching.
+
+from starlette.requests import Request
+
+from paternologia.etag import cache_headers, etag_matches, make_etag, not_modified
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode("latin-1")))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestMakeEtag:
+    def test_strong_quoted(self):
+        etag = make_etag("song.html", "abc")
+        assert etag.startswith('"') and etag.endswith('"')
+        assert not etag.startswith("W/")
+
+    def test_depends_on_all_parts(self):
+        assert make_etag("a", "b") == make_etag("a", "b")
+        assert make_etag("a", "b") != make_etag("a", "c")
+        # Separator keeps part boundaries distinct
+        assert make_etag("ab", "c") != make_etag("a", "bc")
+
+
+class TestEtagMatches:
+    def test_no_header(self):
+        assert not etag_matches(_request(), make_etag("x"))
+
+    def test_exact_match(self):
+        etag = make_etag("x")
+        assert etag_matches(_request(etag), etag)
+        assert not etag_matches(_request(make_etag("y")), etag)
+
+    def test_list_weak_and_wildcard(self):
+        etag = make_etag("x")
+        assert etag_matches(_request(f'"other", W/{etag}'), etag)
+        assert etag_matches(_request("*"), etag)
+
+    def test_not_modified_response(self):
+        etag = make_etag("x")
+        response = not_modified(etag)
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+        assert cache_headers(etag)["Cache-Control"] == "no-cache"
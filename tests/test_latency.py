@@ -0,0 +1,82 @@
+# ABOUTME: Tests for MIDI-to-screen latency histograms.
+# ABOUTME: Checks percentile accuracy and per-stage accounting with a fake clock.
+
+import random
+
+import pytest
+
+from paternologia.latency import PENDING_EVENTS, LatencyHistogram, LatencyStats
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLatencyHistogram:
+    def test_empty(self):
+        summary = LatencyHistogram().summary()
+        assert summary["count"] == 0
+        assert summary["p50_ms"] is None
+
+    def test_percentiles_within_bucket_resolution(self):
+        rng = random.Random(1)
+        samples = [rng.uniform(1, 100) for _ in range(5000)]
+        hist = LatencyHistogram()
+        for ms in samples:
+            hist.record(ms)
+
+        ordered = sorted(samples)
+        for p in (50, 95, 99):
+            exact = ordered[int(p / 100 * len(ordered)) - 1]
+            # Buckets are 10% apart: the bound is at most one bucket above
+            assert exact <= hist.percentile(p) <= exact * 1.1
+
+    def test_overflow_reports_max(self):
+        hist = LatencyHistogram()
+        hist.record(500_000)
+        assert hist.percentile(99) == 500_000
+
+
+class TestLatencyStats:
+    def test_pipeline_stages(self):
+        clock = FakeClock()
+        stats = LatencyStats(clock=clock)
+        midi_ts = clock.now
+
+        stats.song_rendered(7, midi_ts, published_at=midi_ts + 0.001, rendered_at=midi_ts + 0.004)
+        clock.now = midi_ts + 0.005
+        stats.written(7, published_at=midi_ts + 0.004)
+        clock.now = midi_ts + 0.030
+        assert stats.acked(7, render_ms=12.0)
+
+        summary = stats.summary()
+        assert summary["bus"]["p50_ms"] == pytest.approx(1.0, rel=0.1)
+        assert summary["render"]["p50_ms"] == pytest.approx(3.0, rel=0.1)
+        assert summary["write"]["p50_ms"] == pytest.approx(1.0, rel=0.1)
+        assert summary["client_render"]["p50_ms"] == pytest.approx(12.0, rel=0.1)
+        assert summary["ack"]["p50_ms"] == pytest.approx(25.0, rel=0.1)
+        assert summary["total"]["max_ms"] == pytest.approx(30.0)
+
+    def test_every_screen_acks_separately(self):
+        clock = FakeClock()
+        stats = LatencyStats(clock=clock)
+        stats.song_rendered(1, clock.now, clock.now, clock.now)
+        stats.written(1, clock.now)
+
+        assert stats.acked(1, 5.0)
+        assert stats.acked(1, 8.0)
+        assert stats.summary()["client_render"]["count"] == 2
+
+    def test_unknown_and_expired_events_are_ignored(self):
+        clock = FakeClock()
+        stats = LatencyStats(clock=clock)
+        for event_id in range(PENDING_EVENTS + 1):
+            stats.song_rendered(event_id, clock.now, clock.now, clock.now)
+
+        assert not stats.acked(0, 5.0)
+        assert not stats.acked(99_999, 5.0)
+        assert stats.acked(PENDING_EVENTS, 5.0)
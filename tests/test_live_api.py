@@ -2,19 +2,25 @@
 # ABOUTME: Tests HTTP responses, SSE content-type, and live song partial rendering.
 
 import asyncio
+import json
 import tempfile
 import threading
+import time
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
 
 from paternologia import dependencies
+from paternologia.dependencies import get_templates
 from paternologia.main import app
-from paternologia.midi.events import EventBus, MidiEvent
+from paternologia.midi import wire
+from paternologia.midi.events import EventBus, LiveSongEvent, MidiEvent
+from paternologia.routers.live import _catch_up, broadcast_live_songs, render_live_song
 from paternologia.models import (
     Action, ActionType, Device, PacerButton, Song, SongMetadata,
 )
+from paternologia.render_cache import RenderCache
 from paternologia.storage import Storage
 
 
@@ -27,7 +33,6 @@ def temp_data_dir():
 @pytest.fixture
 def test_storage(temp_data_dir):
     storage = Storage(data_dir=temp_data_dir)
-    storage._ensure_dirs()
     return storage
 
 
@@ -96,6 +101,32 @@ class TestLiveSongPartial:
         response = client.get("/live/song/nonexistent")
         assert response.status_code == 404
 
+    def test_not_modified_with_etag(self, client, sample_song, sample_devices):
+        etag = client.get("/live/song/zen").headers["etag"]
+
+        response = client.get("/live/song/zen", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+
+class TestLiveSubscribers:
+    """Tests for GET /live/subscribers."""
+
+    def test_reports_lagging_subscriber(self, client):
+        bus = client.app.state.live_bus
+        queue = bus.subscribe("probe")
+        try:
+            bus._publish_sync(MidiEvent(song_id="zen", channel=12, program=2))
+
+            data = client.get("/live/subscribers").json()
+        finally:
+            bus.unsubscribe(queue)
+
+        probe = next(s for s in data["live"] if s["name"] == "probe")
+        assert probe["queued"] == 1
+        assert probe["delivered"] == 0
+        assert "pacer_jobs" in data
+
 
 class TestLiveSSE:
     """Tests for GET /live/events SSE endpoint."""
@@ -111,8 +142,205 @@ class TestLiveSSE:
 
     async def test_sse_event_format(self, event_bus):
         """SSE events should be formatted as 'event: song-change\\ndata: {song_id}\\n\\n'."""
-        # Verify the format we use in the SSE generator
+        # The SSE generator yields the bytes the event encodes once
         event = MidiEvent(song_id="zen", channel=12, program=2)
-        sse_line = f"event: song-change\ndata: {event.song_id}\n\n"
-        assert "event: song-change" in sse_line
-        assert "data: zen" in sse_line
+        assert event.sse == b"event: song-change\ndata: zen\n\n"
+
+
+class TestLiveRenderer:
+    """Tests for broadcast_live_songs (one render per song change)."""
+
+    @pytest.fixture
+    def storage(self, test_storage):
+        original = dependencies._storage
+        dependencies._storage = test_storage
+        yield test_storage
+        dependencies._storage = original
+
+    async def test_renders_once_for_all_screens(self, storage, sample_song):
+        source, target = EventBus(), EventBus()
+        screens = [target.subscribe(f"screen {i}") for i in range(3)]
+        task = asyncio.create_task(broadcast_live_songs(source, target))
+        await asyncio.sleep(0)
+
+        await source.publish(MidiEvent(song_id="zen", channel=11, program=2))
+        events = [await asyncio.wait_for(q.get(), timeout=2.0) for q in screens]
+        task.cancel()
+        await task
+
+        assert isinstance(events[0], LiveSongEvent)
+        assert "Zen" in events[0].html
+        assert all(e is events[0] for e in events)
+        payload = json.loads(events[0].sse.decode().split("data: ", 1)[1])
+        assert payload["song_id"] == "zen"
+        assert payload["html"] == events[0].html
+
+    async def test_unknown_song_has_no_html(self, storage, sample_devices):
+        source, target = EventBus(), EventBus()
+        screen = target.subscribe()
+        task = asyncio.create_task(broadcast_live_songs(source, target))
+        await asyncio.sleep(0)
+
+        await source.publish(MidiEvent(song_id="ghost", channel=0, program=1))
+        event = await asyncio.wait_for(screen.get(), timeout=2.0)
+        task.cancel()
+        await task
+
+        assert (event.song_id, event.html) == ("ghost", None)
+
+
+    async def test_cached_html_follows_devices_edit(self, storage, sample_song, sample_devices):
+        """Renaming a device outside the song edit routes invalidates the pushed HTML."""
+        cache = RenderCache(get_templates())
+        assert "RC-600" in await render_live_song("zen", cache)
+
+        storage.save_devices([sample_devices[0].model_copy(update={"name": "Looper"})])
+
+        html = await render_live_song("zen", cache)
+        assert "Looper" in html
+        assert "RC-600" not in html
+
+
+class TestLiveCatchUp:
+    """Tests for _catch_up (current song on SSE (re)connect)."""
+
+    async def _bus_with_songs(self, *song_ids):
+        bus = EventBus()
+        for song_id in song_ids:
+            await bus.publish(LiveSongEvent(song_id=song_id, html=f"<h2>{song_id}</h2>"))
+        return bus
+
+    async def test_new_client_gets_current_song(self):
+        bus = await self._bus_with_songs("zen", "rock")
+        assert _catch_up(bus, None).song_id == "rock"
+
+    async def test_reconnect_gets_newest_missed_song(self):
+        bus = await self._bus_with_songs("zen", "rock", "jazz")
+        assert _catch_up(bus, "1").song_id == "jazz"
+
+    async def test_up_to_date_client_gets_nothing(self):
+        bus = await self._bus_with_songs("zen", "rock")
+        assert _catch_up(bus, "2") is None
+
+    async def test_unknown_id_falls_back_to_current_song(self):
+        bus = await self._bus_with_songs("zen")
+        assert _catch_up(bus, "41").song_id == "zen"
+        assert _catch_up(bus, "garbage").song_id == "zen"
+
+    async def test_nothing_played_yet(self):
+        assert _catch_up(EventBus(), None) is None
+
+
+class FakePool:
+    """MidiOutPool stand-in recording messages sent under one lease."""
+
+    def __init__(self):
+        self.sent: list[tuple[str, list[int]]] = []
+        self.leases = 0
+
+    def send_messages(self, device_name, messages):
+        self.leases += 1
+        self.sent.extend((device_name, message) for message in messages)
+        return True
+
+
+def _receive_until(ws, kind: int) -> list[bytes]:
+    """Frames up to and including the first one of the given kind."""
+    frames = []
+    while not frames or frames[-1][0] != kind:
+        frames.append(ws.receive_bytes())
+    return frames
+
+
+class TestLiveWebSocket:
+    """Tests for the /live/ws binary channel."""
+
+    def test_select_song_pushes_rendered_song(self, client, sample_song):
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(wire.select_song("zen"))
+            frames = _receive_until(ws, wire.SONG_CHANGE)
+
+        assert wire.reply(wire.SELECT_SONG, True, "zen") in frames
+        assert b"Zen" in frames[-1]
+
+    def test_new_connection_starts_with_current_song(self, client, sample_song):
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(wire.select_song("zen"))
+            _receive_until(ws, wire.SONG_CHANGE)
+
+        with client.websocket_connect("/live/ws") as ws:
+            first = ws.receive_bytes()
+        assert first[0] == wire.SONG_CHANGE
+        assert b"zen" in first
+
+    def test_select_unknown_song(self, client, sample_devices):
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(wire.select_song("ghost"))
+            assert _receive_until(ws, wire.REPLY)[-1] == wire.reply(wire.SELECT_SONG, False, "Song not found")
+
+    def test_select_rejects_non_song_files(self, client, sample_devices):
+        """Only songs from the summary index; ../devices must not pass as a song."""
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(wire.select_song("../devices"))
+            assert _receive_until(ws, wire.REPLY)[-1] == wire.reply(wire.SELECT_SONG, False, "Song not found")
+            ws.send_bytes(wire.fire_button("../devices", 0))
+            assert _receive_until(ws, wire.REPLY)[-1] == wire.reply(wire.FIRE_BUTTON, False, "Song not found")
+
+    def test_fire_button_sends_actions(self, client, sample_song):
+        pool = FakePool()
+        original = client.app.state.midi_out_pool
+        client.app.state.midi_out_pool = pool
+        try:
+            with client.websocket_connect("/live/ws") as ws:
+                ws.send_bytes(wire.fire_button("zen", 0))
+                reply = _receive_until(ws, wire.REPLY)[-1]
+        finally:
+            client.app.state.midi_out_pool = original
+
+        assert reply == wire.reply(wire.FIRE_BUTTON, True, "3 messages")
+        # boss: channel 12, preset 2 → Bank Select 0/0 + PC 2
+        assert [m for _, m in pool.sent] == [[0xBB, 0, 0], [0xBB, 32, 0], [0xCB, 2]]
+        assert pool.leases == 1
+
+    def test_fire_missing_button(self, client, sample_song):
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(wire.fire_button("zen", 5))
+            assert _receive_until(ws, wire.REPLY)[-1] == wire.reply(wire.FIRE_BUTTON, False, "Song has no button #6")
+
+    def test_malformed_and_text_frames(self, client):
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(b"\x10")
+            assert _receive_until(ws, wire.REPLY)[-1] == wire.reply(0x10, False, "Unknown command 0x10")
+            ws.send_text("select zen")
+            assert _receive_until(ws, wire.REPLY)[-1] == wire.reply(0, False, "Binary frames only")
+
+
+class TestLiveLatency:
+    """Tests for /live/ack and /live/latency."""
+
+    def test_ack_closes_measurement(self, client):
+        latency = client.app.state.latency
+        now = time.time()
+        latency.song_rendered(42, now - 0.02, now - 0.015, now - 0.01)
+        latency.written(42, now - 0.01)
+
+        response = client.post("/live/ack", json={"event_id": 42, "render_ms": 6.5})
+        assert response.status_code == 204
+
+        stats = client.get("/live/latency").json()
+        assert stats["client_render"]["count"] == 1
+        assert stats["total"]["count"] == 1
+        assert stats["total"]["max_ms"] >= 20
+
+    def test_ack_for_unknown_event_is_accepted(self, client):
+        assert client.post("/live/ack", json={"event_id": 999_999}).status_code == 204
+
+    def test_renderer_records_bus_and_render_stages(self, client, sample_song):
+        latency = client.app.state.latency
+        before = latency.summary()["render"]["count"]
+
+        with client.websocket_connect("/live/ws") as ws:
+            ws.send_bytes(wire.select_song("zen"))
+            _receive_until(ws, wire.SONG_CHANGE)
+
+        assert latency.summary()["render"]["count"] == before + 1
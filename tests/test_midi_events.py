@@ -2,10 +2,11 @@
 # ABOUTME: Tests publish/subscribe, multiple subscribers, and unsubscribe.
 
 import asyncio
+import threading
 
 import pytest
 
-from paternologia.midi.events import EventBus, MidiEvent
+from paternologia.midi.events import EventBus, Heartbeat, MidiEvent
 
 
 @pytest.fixture
@@ -76,3 +77,116 @@ class TestEventBus:
 
         received = await asyncio.wait_for(queue.get(), timeout=1.0)
         assert received.song_id == "zen"
+
+    async def test_midi_burst_is_one_wakeup(self, event_bus):
+        """A burst pushed from another thread is delivered in order with batched wakeups."""
+        queue = event_bus.subscribe(maxsize=128)
+        event_bus.set_loop(asyncio.get_running_loop())
+
+        def burst():
+            for program in range(100):
+                event_bus.publish_midi_threadsafe("zen", 12, program)
+
+        thread = threading.Thread(target=burst)
+        thread.start()
+        thread.join()
+
+        received = [await asyncio.wait_for(queue.get(), timeout=1.0) for _ in range(100)]
+        assert [e.program for e in received] == list(range(100))
+        assert all(isinstance(e, MidiEvent) and e.channel == 12 for e in received)
+        assert event_bus.wakeups == 1
+
+    async def test_midi_without_loop_is_dropped(self, event_bus):
+        queue = event_bus.subscribe()
+        event_bus.publish_midi_threadsafe("zen", 12, 2)
+        assert queue.empty()
+
+
+class TestSubscription:
+    """Bounded subscriber buffers, heartbeat and lag stats."""
+
+    async def test_full_buffer_drops_oldest(self, event_bus):
+        queue = event_bus.subscribe("slow", maxsize=3)
+        for program in range(5):
+            await event_bus.publish(MidiEvent(song_id=f"s{program}", channel=0, program=program))
+
+        assert [queue.get_nowait().song_id for _ in range(3)] == ["s2", "s3", "s4"]
+        stats = event_bus.stats()[0]
+        assert (stats["name"], stats["dropped"], stats["delivered"]) == ("slow", 2, 3)
+
+    async def test_maxsize_one_coalesces_to_latest(self, event_bus):
+        queue = event_bus.subscribe(maxsize=1)
+        await event_bus.publish(MidiEvent(song_id="zen", channel=0, program=1))
+        await event_bus.publish(MidiEvent(song_id="rock", channel=0, program=2))
+
+        assert (await queue.get()).song_id == "rock"
+        assert queue.empty()
+
+    async def test_heartbeat_never_displaces_events(self, event_bus):
+        queue = event_bus.subscribe(maxsize=1)
+        await event_bus.publish(MidiEvent(song_id="zen", channel=0, program=1))
+        await event_bus.publish(Heartbeat())
+
+        assert (await queue.get()).song_id == "zen"
+        await event_bus.publish(Heartbeat())
+        assert isinstance(await queue.get(), Heartbeat)
+
+    async def test_shared_heartbeat_task(self, event_bus):
+        q1, q2 = event_bus.subscribe(), event_bus.subscribe()
+        task = asyncio.create_task(event_bus.heartbeat(0.01))
+        try:
+            beats = [await asyncio.wait_for(q.get(), timeout=1.0) for q in (q1, q2)]
+        finally:
+            task.cancel()
+        assert all(beat.sse == b": keepalive\n\n" for beat in beats)
+
+    async def test_event_encoded_once(self, event_bus):
+        q1, q2 = event_bus.subscribe(), event_bus.subscribe()
+        await event_bus.publish(MidiEvent(song_id="zen", channel=12, program=2))
+
+        e1, e2 = q1.get_nowait(), q2.get_nowait()
+        assert e1.sse == b"id: 1\nevent: song-change\ndata: zen\n\n"
+        assert e1.sse is e2.sse
+
+    async def test_stats_report_lag_worst_first(self, event_bus):
+        idle = event_bus.subscribe("idle")
+        behind = event_bus.subscribe("behind")
+        await event_bus.publish(MidiEvent(song_id="zen", channel=0, program=1))
+        idle.get_nowait()
+        await asyncio.sleep(0.01)
+
+        stats = event_bus.stats()
+        assert [s["name"] for s in stats] == ["behind", "idle"]
+        assert stats[0]["queued"] == 1 and stats[0]["lag_ms"] >= 5
+        assert stats[1]["lag_ms"] == 0.0
+
+
+class TestReplay:
+    """Event ids and the replay buffer used for Last-Event-ID catch-up."""
+
+    async def test_ids_increase_and_appear_in_sse(self, event_bus):
+        first = MidiEvent(song_id="zen", channel=0, program=1)
+        second = MidiEvent(song_id="rock", channel=0, program=2)
+        await event_bus.publish(first)
+        await event_bus.publish(Heartbeat())
+        await event_bus.publish(second)
+
+        assert (first.event_id, second.event_id) == (1, 2)
+        assert second.sse.startswith(b"id: 2\nevent: song-change\n")
+        assert event_bus.latest is second
+
+    async def test_since_returns_missed_events(self, event_bus):
+        for program in range(5):
+            await event_bus.publish(MidiEvent(song_id=f"s{program}", channel=0, program=program))
+
+        assert [e.song_id for e in event_bus.since(3)] == ["s3", "s4"]
+        assert event_bus.since(5) == []
+
+    async def test_since_unknown_id_is_none(self):
+        bus = EventBus(replay_size=2)
+        for program in range(5):
+            await bus.publish(MidiEvent(song_id=f"s{program}", channel=0, program=program))
+
+        assert bus.since(1) is None  # older than the buffer
+        assert [e.song_id for e in bus.since(3)] == ["s3", "s4"]
+        assert bus.since(99) is None  # id from before a restart
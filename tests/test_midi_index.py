@@ -3,7 +3,7 @@
 
 import pytest
 
-from paternologia.midi.index import SongMidiIndex
+from paternologia.midi.index import SongMidiIndex, bank_number
 from paternologia.models import (
     Action, ActionType, Device, PacerButton, PacerExportSettings, Song, SongMetadata,
 )
@@ -76,6 +76,16 @@ class TestSongMidiIndex:
         index = SongMidiIndex.build([], devices)
         assert index.lookup(channel=12, program=1) is None
 
+    def test_skips_device_without_channel(self):
+        """midi_channel=0 (not set) must not wrap around to channel 16."""
+        devices = [_make_device("boss", midi_channel=0)]
+        songs = [_make_song("zen", [Action(device="boss", type=ActionType.PRESET, value=5)])]
+
+        index = SongMidiIndex.build(songs, devices)
+
+        assert index.lookup(channel=15, program=5) is None
+        assert index.lookup(channel=-1, program=5) is None
+
     def test_handles_unknown_device(self):
         """Should skip actions with unknown device IDs."""
         devices = [_make_device("boss", midi_channel=13)]
@@ -95,13 +105,27 @@ class TestSongMidiIndex:
         index = SongMidiIndex.build(songs, devices)
         assert index.lookup(channel=12, program=2) == "first"
 
-    def test_preset_value_mod_128(self):
-        """Program number should be value % 128 for MIDI compatibility."""
+    def test_preset_value_above_127_selects_bank(self):
+        """Value 130 is bank MSB 1, program 2 - the same split the Pacer export sends."""
         devices = [_make_device("boss", midi_channel=13)]
         songs = [_make_song("zen", [Action(device="boss", type=ActionType.PRESET, value=130)])]
 
         index = SongMidiIndex.build(songs, devices)
-        assert index.lookup(channel=12, program=2) == "zen"
+        assert index.lookup(channel=12, program=2, bank=bank_number(1, 0)) == "zen"
+        assert index.lookup(channel=12, program=2) is None
+
+    def test_banks_do_not_alias(self):
+        """Same program in different banks maps to different songs, no conflict."""
+        devices = [_make_device("boss", midi_channel=1)]
+        songs = [
+            _make_song("zen", [Action(device="boss", type=ActionType.PRESET, value=5)]),
+            _make_song("echo", [Action(device="boss", type=ActionType.PRESET, value=5, bank_lsb=3)]),
+        ]
+
+        index = SongMidiIndex.build(songs, devices)
+        assert index.lookup(channel=0, program=5) == "zen"
+        assert index.lookup(channel=0, program=5, bank=bank_number(0, 3)) == "echo"
+        assert index.lookup(channel=1, program=5, bank=bank_number(0, 3)) is None
 
     def test_uses_first_preset_action_per_song(self):
         """Should use the first preset action found in the song's buttons."""
@@ -128,3 +152,134 @@ class TestSongMidiIndex:
         index = SongMidiIndex.build(songs, devices)
         assert index.lookup(channel=12, program=2) == "zen"
         assert index.lookup(channel=0, program=66) == "zen"
+
+
+class TestSongMidiIndexDelta:
+    """Tests for incremental per-song index updates."""
+
+    def _devices(self):
+        return [_make_device("boss", midi_channel=13)]
+
+    def _preset(self, value: int) -> Action:
+        return Action(device="boss", type=ActionType.PRESET, value=value)
+
+    def test_update_song_adds_new_song(self):
+        index = SongMidiIndex.build([_make_song("zen", [self._preset(2)])], self._devices())
+
+        index.update_song(_make_song("rock", [self._preset(5)]), self._devices())
+
+        assert index.lookup(channel=12, program=5) == "rock"
+        assert index.lookup(channel=12, program=2) == "zen"
+
+    def test_update_song_replaces_old_entries(self):
+        index = SongMidiIndex.build([_make_song("zen", [self._preset(2)])], self._devices())
+
+        index.update_song(_make_song("zen", [self._preset(7)]), self._devices())
+
+        assert index.lookup(channel=12, program=2) is None
+        assert index.lookup(channel=12, program=7) == "zen"
+
+    def test_update_touches_only_the_songs_pages(self):
+        """A delta keeps the table in place: no per-edit copy of the library."""
+        devices = self._devices()
+        songs = [_make_song(f"s{i}", [self._preset(i)]) for i in range(100)]
+        index = SongMidiIndex.build(songs, devices)
+        table, mapping = index._table, index._mapping
+
+        index.update_song(_make_song("s5", [self._preset(120)]), devices)
+
+        assert index._table is table and index._mapping is mapping
+        assert index.lookup(12, 120) == "s5"
+        assert index.lookup(12, 5) is None
+
+    def test_snapshot_pickle_roundtrip(self):
+        import pickle
+
+        index = SongMidiIndex.build([_make_song("zen", [self._preset(2)])], self._devices())
+        restored = pickle.loads(pickle.dumps(index))
+
+        restored.update_song(_make_song("rock", [self._preset(5)]), self._devices())
+        assert restored.lookup(12, 2) == "zen"
+        assert restored.lookup(12, 5) == "rock"
+
+    def test_remove_song_hands_key_to_next_claimant(self):
+        songs = [
+            _make_song("first", [self._preset(2)]),
+            _make_song("second", [self._preset(2)]),
+        ]
+        index = SongMidiIndex.build(songs, self._devices())
+
+        index.remove_song("first")
+
+        assert index.lookup(channel=12, program=2) == "second"
+
+    def test_updated_song_keeps_its_rank_in_conflicts(self):
+        """Editing the winning song must not hand its key to a later song."""
+        songs = [
+            _make_song("first", [self._preset(2)]),
+            _make_song("second", [self._preset(2)]),
+        ]
+        index = SongMidiIndex.build(songs, self._devices())
+
+        index.update_song(
+            _make_song("first", [self._preset(2), self._preset(3)]), self._devices()
+        )
+
+        assert index.lookup(channel=12, program=2) == "first"
+        assert index.lookup(channel=12, program=3) == "first"
+
+    def test_delta_matches_full_rebuild(self):
+        """A sequence of deltas gives the same lookups as a rebuild."""
+        devices = self._devices()
+        a = _make_song("a", [self._preset(1), self._preset(2)])
+        b = _make_song("b", [self._preset(2), self._preset(3)])
+        c = _make_song("c", [self._preset(3), self._preset(4)])
+        b2 = _make_song("b", [self._preset(4)])
+
+        index = SongMidiIndex.build([], devices)
+        for song in (a, b, c, b2):
+            index.update_song(song, devices)
+        index.remove_song("a")
+
+        rebuilt = SongMidiIndex.build([b2, c], devices)
+        for program in range(6):
+            assert index.lookup(12, program) == rebuilt.lookup(12, program)
+
+    def test_new_song_conflict_matches_full_rebuild(self):
+        """A song added by delta ranks like a rebuild: songs_order first, then by ID."""
+        devices = self._devices()
+        order = ["zulu", "late"]
+        zulu = _make_song("zulu", [self._preset(1)])
+        mike = _make_song("mike", [self._preset(2), self._preset(3)])
+        alpha = _make_song("alpha", [self._preset(2)])
+        late = _make_song("late", [self._preset(1), self._preset(3)])
+
+        index = SongMidiIndex.build([zulu, mike], devices, order)
+        for song in (alpha, late):
+            index.update_song(song, devices)
+        rebuilt = SongMidiIndex.build([zulu, late, alpha, mike], devices, order)
+
+        for program in range(4):
+            assert index.lookup(12, program) == rebuilt.lookup(12, program)
+        assert index.lookup(12, 1) == "zulu"
+        assert index.lookup(12, 2) == "alpha"
+        assert index.lookup(12, 3) == "late"
+
+    def test_banked_delta_matches_full_rebuild(self):
+        """Moving a song between banks clears its old page entry."""
+        devices = self._devices()
+        a = _make_song("a", [self._preset(130)])
+        a2 = _make_song("a", [self._preset(258)])
+
+        index = SongMidiIndex.build([a], devices)
+        index.update_song(a2, devices)
+        rebuilt = SongMidiIndex.build([a2], devices)
+
+        for bank in (0, bank_number(1, 0), bank_number(2, 0)):
+            assert index.lookup(12, 2, bank) == rebuilt.lookup(12, 2, bank)
+        assert index.lookup(12, 2, bank_number(2, 0)) == "a"
+
+    def test_remove_unknown_song_is_noop(self):
+        index = SongMidiIndex.build([_make_song("zen", [self._preset(2)])], self._devices())
+        index.remove_song("missing")
+        assert index.lookup(12, 2) == "zen"
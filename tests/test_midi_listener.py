@@ -2,6 +2,7 @@
 # ABOUTME: Tests Program Change parsing and event publishing via virtual MIDI ports.
 
 import asyncio
+import time
 
 import pytest
 import rtmidi
@@ -58,6 +59,35 @@ class TestMidiListenerParsing:
         channel = status & 0x0F
         assert channel == 0
 
+    def test_arrival_chains_rtmidi_delta_time(self, monkeypatch):
+        """Arrival times follow rtmidi deltas, capped by the wall clock, re-anchored after gaps."""
+        clock = [100.0]
+        monkeypatch.setattr("paternologia.midi.listener.time.time", lambda: clock[0])
+        listener = MidiListener(song_index=SongMidiIndex.build([], []), event_bus=EventBus())
+
+        assert listener._arrival(5.0) == 100.0   # gap: anchor to now
+        clock[0] = 100.050                       # callback ran 30 ms late
+        assert listener._arrival(0.020) == pytest.approx(100.020)
+        clock[0] = 100.060
+        assert listener._arrival(0.100) == 100.060  # never ahead of the wall clock
+
+    async def test_bank_select_applies_to_program_change(self):
+        """CC0/CC32 set the bank used by the following Program Change."""
+        devices = [_make_device("boss", midi_channel=13)]
+        index = SongMidiIndex.build([_make_song("zen", "boss", 130)], devices)
+        bus = EventBus()
+        bus.set_loop(asyncio.get_running_loop())
+        queue = bus.subscribe()
+        listener = MidiListener(song_index=index, event_bus=bus)
+
+        listener._callback(([0xCC, 2], 0.0))
+        listener._callback(([0xBC, 0, 1], 0.0))
+        listener._callback(([0xCC, 2], 0.0))
+
+        received = await asyncio.wait_for(queue.get(), timeout=1.0)
+        assert (received.song_id, received.program) == ("zen", 2)
+        assert queue.empty()
+
 
 @requires_alsa
 class TestMidiListenerWithVirtualPorts:
@@ -142,3 +172,41 @@ class TestMidiListenerWithVirtualPorts:
             del midi_out
         finally:
             listener.stop()
+
+    async def test_burst_throughput_and_latency(self):
+        """Dense Program Change traffic arrives complete and in order, at most one wakeup each."""
+        devices = [_make_device("boss", midi_channel=1)]
+        songs = [_make_song(f"s{p}", "boss", p) for p in range(128)]
+        bus = EventBus()
+        bus.set_loop(asyncio.get_running_loop())
+        listener = MidiListener(song_index=SongMidiIndex.build(songs, devices), event_bus=bus)
+        try:
+            listener.start_virtual("test_paternologia_burst")
+        except Exception as e:
+            pytest.skip(f"ALSA unavailable at runtime: {e}")
+
+        count = 1000
+        try:
+            queue = bus.subscribe()
+            midi_out = rtmidi.MidiOut()
+            port_idx = next(
+                i for i, name in enumerate(midi_out.get_ports()) if "test_paternologia_burst" in name
+            )
+            midi_out.open_port(port_idx)
+
+            started = time.perf_counter()
+            for i in range(count):
+                midi_out.send_message([0xC0, i % 128])
+            received = [await asyncio.wait_for(queue.get(), timeout=2.0) for _ in range(count)]
+            elapsed = time.perf_counter() - started
+
+            assert [e.program for e in received] == [i % 128 for i in range(count)]
+            assert bus.wakeups <= count
+            assert bus.midi_dropped == 0
+            # Generous bound: catches a per-message wakeup regression on slow CI
+            assert elapsed < 2.0
+
+            midi_out.close_port()
+            del midi_out
+        finally:
+            listener.stop()
@@ -0,0 +1,117 @@
+# ABOUTME: Tests for the pool of long-lived MIDI output connections.
+# ABOUTME: Tests reuse, health-check reconnects, exclusive leases and failure handling.
+
+import threading
+
+import pytest
+
+from paternologia.midi.pool import MidiOutPool
+from paternologia.midi.transport import TransportError
+
+
+class FakeMidiOut:
+    """Minimal rtmidi.MidiOut double with a mutable port list."""
+
+    def __init__(self, ports):
+        self.ports = ports
+        self.open = True
+        self.sent = []
+
+    def get_ports(self):
+        return list(self.ports)
+
+    def is_port_open(self):
+        return self.open
+
+    def send_message(self, message):
+        self.sent.append(bytes(message))
+
+    def close_port(self):
+        self.open = False
+
+
+@pytest.fixture
+def ports():
+    return ["Midi Through", "PACER:PACER MIDI 1 20:0"]
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+@pytest.fixture
+def pool(ports, opened):
+    def opener(device_name):
+        matches = [i for i, p in enumerate(ports) if device_name.upper() in p.upper()]
+        if not matches:
+            return None
+        midi_out = FakeMidiOut(ports)
+        opened.append(midi_out)
+        return midi_out, matches[0]
+
+    yield MidiOutPool(opener=opener)
+
+
+class TestMidiOutPool:
+    def test_reuses_open_port(self, pool, opened):
+        assert pool.send_messages("PACER", [[0xC0, 5]])
+        assert pool.send_messages("pacer", [[0xC0, 6]])
+
+        assert len(opened) == 1
+        assert opened[0].sent == [bytes([0xC0, 5]), bytes([0xC0, 6])]
+        assert (pool.opens, pool.reuses) == (1, 1)
+
+    def test_send_messages_under_one_lease(self, pool, opened):
+        assert pool.send_messages("PACER", [[0xC0, 1], [0xB0, 7, 100]])
+
+        assert opened[0].sent == [bytes([0xC0, 1]), bytes([0xB0, 7, 100])]
+        assert (pool.opens, pool.reuses) == (1, 0)
+
+    def test_missing_device_yields_none(self, pool):
+        with pool.lease("MICROFREAK") as transport:
+            assert transport is None
+        assert not pool.send_messages("MICROFREAK", [[0xC0, 1]])
+
+    def test_reconnects_when_port_renumbered(self, pool, ports, opened):
+        pool.send_messages("PACER", [[0xC0, 1]])
+        ports.insert(0, "New USB device")
+
+        pool.send_messages("PACER", [[0xC0, 2]])
+
+        assert len(opened) == 2
+        assert not opened[0].open
+        assert opened[1].sent == [bytes([0xC0, 2])]
+
+    def test_failed_send_drops_connection(self, pool, opened):
+        with pytest.raises(RuntimeError):
+            with pool.lease("PACER"):
+                raise RuntimeError("boom")
+
+        pool.send_messages("PACER", [[0xC0, 1]])
+        assert len(opened) == 2
+
+    def test_lease_is_exclusive(self, pool):
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with pool.lease("PACER"):
+                entered.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait(5)
+        try:
+            with pytest.raises(TransportError, match="zajęty"):
+                with pool.lease("PACER", timeout_s=0.05):
+                    pass
+        finally:
+            release.set()
+            holder.join()
+
+    def test_close_closes_ports(self, pool, opened):
+        pool.send_messages("PACER", [[0xC0, 1]])
+        pool.close()
+        assert not opened[0].open
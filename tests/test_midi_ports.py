@@ -1,11 +1,26 @@
 # ABOUTME: Tests for MIDI port detection utilities.
-# ABOUTME: Tests amidi output parsing and rtmidi port search.
+# ABOUTME: Tests amidi output parsing, rtmidi port search and the cached port registry.
 
 import subprocess
 
 import pytest
 
-from paternologia.midi.ports import find_amidi_port, find_rtmidi_port
+from paternologia.midi import ports
+from paternologia.midi.ports import (
+    PortRegistry,
+    find_amidi_port,
+    find_rtmidi_output_port,
+    find_rtmidi_port,
+    get_port_registry,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    """Each test enumerates its own fake ports."""
+    get_port_registry().invalidate()
+    yield
+    get_port_registry().invalidate()
 
 
 class TestFindAmidiPort:
@@ -89,3 +104,92 @@ class TestFindRtmidiPort:
                 return ["pacer:pacer midi 1 20:0"]
         monkeypatch.setattr(rtmidi, "MidiIn", FakeMidiIn)
         assert find_rtmidi_port("PACER") == 0
+
+
+class TestFindRtmidiOutputPort:
+    """Tests for find_rtmidi_output_port - searching rtmidi output ports."""
+
+    def test_finds_output_port_by_name(self, monkeypatch):
+        import rtmidi
+        class FakeMidiOut:
+            def get_ports(self):
+                return ["Midi Through:Midi Through Port-0 14:0", "PACER:PACER MIDI 1 20:0"]
+        monkeypatch.setattr(rtmidi, "MidiOut", FakeMidiOut)
+        assert find_rtmidi_output_port("pacer") == 1
+
+
+class TestPortRegistry:
+    """Tests for PortRegistry - enumerate once, refresh on ALSA change."""
+
+    @pytest.fixture
+    def asound(self, tmp_path):
+        (tmp_path / "seq").mkdir()
+        (tmp_path / "cards").write_text(" 0 [PCH ]: HDA-Intel\n")
+        (tmp_path / "seq" / "clients").write_text(
+            'Client  14 : "Midi Through" [Kernel]\n'
+            '  Port   0 : "Midi Through Port-0" (RWe-)\n'
+            "  Output pool :\n    Cells in use    : 0\n"
+        )
+        return tmp_path
+
+    @pytest.fixture
+    def amidi_scans(self, monkeypatch):
+        listing = [[("hw:4,0,0", "IO  hw:4,0,0  PACER MIDI1")]]
+        calls = []
+
+        def scan():
+            calls.append(1)
+            return listing[0]
+
+        monkeypatch.setattr(ports, "scan_amidi_ports", scan)
+        return listing, calls
+
+    def test_cached_until_cards_change(self, asound, amidi_scans):
+        listing, calls = amidi_scans
+        registry = PortRegistry(asound_dir=asound)
+
+        assert registry.amidi_port("PACER") == "hw:4,0,0"
+        assert registry.amidi_port("pacer") == "hw:4,0,0"
+        assert len(calls) == 1
+
+        # Replug: new card number
+        listing[0] = [("hw:5,0,0", "IO  hw:5,0,0  PACER MIDI1")]
+        (asound / "cards").write_text(" 0 [PCH ]: HDA-Intel\n 5 [PACER ]: USB-Audio\n")
+        assert registry.amidi_port("PACER") == "hw:5,0,0"
+        assert len(calls) == 2
+
+    def test_sequencer_traffic_does_not_refresh(self, asound, amidi_scans):
+        _, calls = amidi_scans
+        registry = PortRegistry(asound_dir=asound)
+        registry.amidi_port("PACER")
+
+        clients = asound / "seq" / "clients"
+        clients.write_text(clients.read_text().replace("Cells in use    : 0", "Cells in use    : 7"))
+        registry.amidi_port("PACER")
+        assert len(calls) == 1
+
+        clients.write_text(clients.read_text() + 'Client  20 : "PACER" [Kernel]\n')
+        registry.amidi_port("PACER")
+        assert len(calls) == 2
+
+    def test_ttl_without_proc_asound(self, tmp_path, amidi_scans):
+        _, calls = amidi_scans
+        now = [100.0]
+        registry = PortRegistry(asound_dir=tmp_path / "missing", ttl_s=2.0, clock=lambda: now[0])
+
+        registry.amidi_port("PACER")
+        now[0] = 101.0
+        registry.amidi_port("PACER")
+        assert len(calls) == 1
+
+        now[0] = 102.5
+        registry.amidi_port("PACER")
+        assert len(calls) == 2
+
+    def test_lookup_returns_all_backends(self, asound, amidi_scans, monkeypatch):
+        monkeypatch.setattr(
+            ports, "scan_rtmidi_ports",
+            lambda output=False: ["Midi Through", "PACER:PACER MIDI 1 20:0"] if output else ["PACER:PACER MIDI 1 20:0"],
+        )
+        found = PortRegistry(asound_dir=asound).lookup("PACER")
+        assert (found.amidi, found.rtmidi_in, found.rtmidi_out) == ("hw:4,0,0", 0, 1)
@@ -0,0 +1,65 @@
+# ABOUTME: Tests for the SPSC ring buffer between the rtmidi thread and the event loop.
+# ABOUTME: Covers ordering, wrap-around, overflow drops and a concurrent producer.
+
+import threading
+import time
+
+import pytest
+
+from paternologia.midi.ring import MidiRing
+
+
+class TestMidiRing:
+    def test_drain_returns_items_in_order(self):
+        ring = MidiRing(8)
+        ring.push("zen", 12, 2)
+        ring.push("rock", 0, 5)
+
+        items = ring.drain()
+
+        assert [(s, c, p) for s, c, p, _ in items] == [("zen", 12, 2), ("rock", 0, 5)]
+        assert items[0][3] > 0
+        assert ring.drain() == []
+
+    def test_wraps_around(self):
+        ring = MidiRing(4)
+        for round_ in range(5):
+            for i in range(3):
+                ring.push(f"s{round_}-{i}", 0, i)
+            assert [s for s, *_ in ring.drain()] == [f"s{round_}-{i}" for i in range(3)]
+
+    def test_full_ring_drops_newest(self):
+        ring = MidiRing(4)
+        results = [ring.push(f"s{i}", 0, i) for i in range(6)]
+
+        assert results == [True] * 4 + [False] * 2
+        assert ring.dropped == 2
+        assert [s for s, *_ in ring.drain()] == ["s0", "s1", "s2", "s3"]
+
+    def test_size_must_be_power_of_two(self):
+        with pytest.raises(ValueError):
+            MidiRing(100)
+
+    def test_concurrent_producer_loses_nothing(self):
+        ring = MidiRing(64)
+        total = 5000
+        received: list[int] = []
+
+        def produce():
+            i = 0
+            while i < total:
+                if ring.push("s", 0, i % 128):
+                    i += 1
+                else:
+                    ring.dropped -= 1  # retry, not a real drop
+                    time.sleep(0)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while producer.is_alive() or len(ring):
+            received.extend(p for _, _, p, _ in ring.drain())
+            time.sleep(0)
+        producer.join()
+        received.extend(p for _, _, p, _ in ring.drain())
+
+        assert received == [i % 128 for i in range(total)]
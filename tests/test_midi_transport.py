@@ -0,0 +1,138 @@
+# ABOUTME: Tests for SysEx transports (paced rtmidi output and amidi fallback).
+# ABOUTME: Uses a recording MidiOut double and a faked amidi subprocess.
+
+import subprocess
+import time
+
+import pytest
+
+from paternologia.midi.transport import (
+    MIDI_MS_PER_BYTE,
+    AmidiTransport,
+    RtMidiTransport,
+    TransportError,
+    pace_frames,
+)
+
+FRAMES = [bytes([0xF0, i, 0xF7]) for i in range(5)]
+
+
+class RecordingMidiOut:
+    """Records (time, message) for every send_message() call."""
+
+    def __init__(self, fail_at: int | None = None):
+        self.sent: list[tuple[float, bytes]] = []
+        self.closed = False
+        self._fail_at = fail_at
+
+    def send_message(self, message):
+        if self._fail_at is not None and len(self.sent) == self._fail_at:
+            raise RuntimeError("port gone")
+        self.sent.append((time.perf_counter(), bytes(message)))
+
+    def close_port(self):
+        self.closed = True
+
+
+class TestPaceFrames:
+    def test_sends_all_frames_in_order(self):
+        out = RecordingMidiOut()
+
+        timings = pace_frames(out, FRAMES, interval_ms=1)
+
+        assert [msg for _, msg in out.sent] == FRAMES
+        assert [t.index for t in timings] == list(range(len(FRAMES)))
+        assert timings[0].offset_ms == pytest.approx(0, abs=1)
+
+    def test_respects_interval(self):
+        out = RecordingMidiOut()
+        interval_ms = 10
+
+        pace_frames(out, FRAMES, interval_ms=interval_ms)
+
+        gap_ms = interval_ms + 3 * MIDI_MS_PER_BYTE
+        for (prev, _), (cur, _) in zip(out.sent, out.sent[1:]):
+            assert (cur - prev) * 1000 >= gap_ms - 0.5
+
+    def test_late_frame_keeps_gap(self):
+        out = RecordingMidiOut()
+        send = out.send_message
+
+        def stall_after_first(message):
+            send(message)
+            if len(out.sent) == 1:
+                time.sleep(0.05)
+
+        out.send_message = stall_after_first
+        interval_ms = 10
+
+        pace_frames(out, FRAMES, interval_ms=interval_ms)
+
+        # No catch-up burst after the stall: every frame keeps its gap
+        gap_ms = interval_ms + 3 * MIDI_MS_PER_BYTE
+        for (prev, _), (cur, _) in zip(out.sent[1:], out.sent[2:]):
+            assert (cur - prev) * 1000 >= gap_ms - 0.5
+
+    def test_reports_each_frame(self):
+        seen = []
+
+        pace_frames(RecordingMidiOut(), FRAMES, interval_ms=1, on_frame=seen.append)
+
+        assert [t.size for t in seen] == [3] * len(FRAMES)
+
+
+class TestRtMidiTransport:
+    def test_send_report(self):
+        out = RecordingMidiOut()
+        transport = RtMidiTransport(out, port="rtmidi:1")
+
+        report = transport.send(FRAMES, interval_ms=1, timeout_s=5)
+        transport.close()
+
+        assert report.transport == "rtmidi"
+        assert report.frames == len(FRAMES)
+        assert len(report.timings) == len(FRAMES)
+        assert out.closed
+
+    def test_port_error_raises_transport_error(self):
+        transport = RtMidiTransport(RecordingMidiOut(fail_at=2), port="rtmidi:1")
+
+        with pytest.raises(TransportError, match="port gone"):
+            transport.send(FRAMES, interval_ms=1, timeout_s=5)
+
+    def test_timeout_stops_pacing(self):
+        out = RecordingMidiOut()
+        transport = RtMidiTransport(out, port="rtmidi:1")
+
+        with pytest.raises(TransportError, match="Timeout"):
+            transport.send(FRAMES, interval_ms=100, timeout_s=0.05)
+        assert len(out.sent) < len(FRAMES)
+
+
+class TestAmidiTransport:
+    def test_writes_temp_file_and_runs_amidi(self, monkeypatch):
+        calls = []
+
+        def fake_run(args, **kwargs):
+            with open(args[-1], "rb") as f:
+                calls.append((args, f.read()))
+            return subprocess.CompletedProcess(args, 0, stdout="", stderr="")
+
+        monkeypatch.setattr(subprocess, "run", fake_run)
+
+        report = AmidiTransport("hw:4,0,0").send(FRAMES, interval_ms=20, timeout_s=5)
+
+        args, data = calls[0]
+        assert args[:3] == ["amidi", "-p", "hw:4,0,0"]
+        assert "--sysex-interval=20" in args
+        assert data == b"".join(FRAMES)
+        assert report.transport == "amidi"
+
+    def test_failure_raises_transport_error(self, monkeypatch):
+        monkeypatch.setattr(
+            subprocess, "run",
+            lambda *a, **kw: subprocess.CompletedProcess(a[0], 1, stdout="", stderr="busy"),
+        )
+
+        with pytest.raises(TransportError, match="amidi failed: busy"):
+            AmidiTransport("hw:4,0,0").send(FRAMES, interval_ms=20, timeout_s=5)
@@ -0,0 +1,58 @@
+# ABOUTME: Tests for the binary /live/ws frame codec.
+# ABOUTME: Checks frame layouts, command parsing and malformed input.
+
+import struct
+
+import pytest
+
+from paternologia.midi import wire
+from paternologia.midi.events import JobEvent, LiveSongEvent, MidiEvent
+
+
+class TestServerFrames:
+    def test_song_change_layout(self):
+        frame = wire.song_change(7, "zen", "<h2>Zen</h2>")
+
+        kind, event_id = struct.unpack_from(">BI", frame)
+        assert (kind, event_id) == (wire.SONG_CHANGE, 7)
+        assert frame[5] == 3 and frame[6:9] == b"zen"
+        assert struct.unpack_from(">I", frame, 9)[0] == len("<h2>Zen</h2>")
+        assert frame.endswith(b"<h2>Zen</h2>")
+
+    def test_midi_activity_is_compact(self):
+        frame = wire.midi_activity(1, 12, 2, "zen")
+        assert frame == bytes((wire.MIDI_ACTIVITY, 0, 0, 0, 1, 12, 2, 3)) + b"zen"
+
+    def test_ui_selection_marks_channel_and_program(self):
+        assert wire.midi_activity(1, -1, -1, "zen")[5:7] == b"\xff\xff"
+
+    def test_job_progress(self):
+        data = {"job_id": "ab12", "state": "running", "song_id": "zen", "sent": 3, "total": 12}
+        frame = wire.job_progress(9, data)
+
+        assert struct.unpack_from(">BIHH", frame) == (wire.JOB_PROGRESS, 9, 3, 12)
+        assert frame[9:] == b"\x04ab12" + b"\x07running" + b"\x03zen"
+
+    def test_events_encode_once(self):
+        event = LiveSongEvent(song_id="zen", html=None, event_id=3)
+        assert event.frame is event.frame
+        assert MidiEvent(song_id="zen", channel=0, program=1).frame[0] == wire.MIDI_ACTIVITY
+        job = JobEvent(job_id="j", state="done", data={"job_id": "j", "state": "done"})
+        assert job.frame[0] == wire.JOB_PROGRESS
+
+
+class TestCommands:
+    def test_select_song_round_trip(self):
+        assert wire.parse_command(wire.select_song("zen")) == (wire.SELECT_SONG, {"song_id": "zen"})
+
+    def test_fire_button_round_trip(self):
+        command, args = wire.parse_command(wire.fire_button("zen", 4))
+        assert (command, args) == (wire.FIRE_BUTTON, {"song_id": "zen", "button": 4})
+
+    def test_reply(self):
+        assert wire.reply(wire.SELECT_SONG, True, "ok") == b"\x7e\x81\x01\x00\x02ok"
+
+    @pytest.mark.parametrize("data", [b"", b"\x81", b"\x81\x05ze", b"\x82\x03zen", b"\x10"])
+    def test_malformed_frames(self, data):
+        with pytest.raises(wire.FrameError):
+            wire.parse_command(data)
@@ -3,6 +3,7 @@
 
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -32,7 +33,6 @@ def temp_data_dir():
 def test_storage(temp_data_dir):
     """Create storage with temporary directory."""
     storage = Storage(data_dir=temp_data_dir)
-    storage._ensure_dirs()
     return storage
 
 
@@ -125,6 +125,16 @@ class TestExportEndpointHappyPath:
         assert response.status_code == 200
         assert "B3" in response.headers["content-disposition"]
 
+    def test_export_lowercase_preset(self, client, sample_devices, sample_song):
+        """Lowercase preset is normalized: same file, ETag and filename as uppercase."""
+        upper = client.get("/pacer/export/test-song.syx?preset=B3")
+        lower = client.get("/pacer/export/test-song.syx?preset=b3")
+
+        assert lower.status_code == 200
+        assert lower.content == upper.content
+        assert lower.headers["etag"] == upper.headers["etag"]
+        assert "test-song_B3.syx" in lower.headers["content-disposition"]
+
     def test_export_contains_song_name(self, client, sample_devices, sample_song):
         """Exported data contains song name."""
         response = client.get("/pacer/export/test-song.syx")
@@ -132,6 +142,20 @@ class TestExportEndpointHappyPath:
         # "Test Song" truncated to 8 chars = "Test Son"
         assert b"Test Son" in response.content
 
+    def test_export_etag_per_preset(self, client, sample_devices, sample_song):
+        """Matching If-None-Match returns 304 without rebuilding SysEx; ETag varies by preset."""
+        etag = client.get("/pacer/export/test-song.syx").headers["etag"]
+
+        with patch("paternologia.routers.pacer.export_song_to_syx") as export:
+            response = client.get("/pacer/export/test-song.syx", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        export.assert_not_called()
+
+        response = client.get(
+            "/pacer/export/test-song.syx?preset=B3", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+
 
 class TestExportEndpointErrors:
     """Tests for error scenarios."""
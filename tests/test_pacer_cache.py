@@ -0,0 +1,108 @@
+# ABOUTME: Unit tests for the on-disk LRU cache of exported .syx files.
+# ABOUTME: Tests keying, invalidation by content change, eviction and persistence.
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from paternologia.models import Action, ActionType, Device, PacerButton, Song, SongMetadata
+from paternologia.pacer.cache import SysExCache, channel_map_hash, sysex_key
+from paternologia.pacer.export import export_song_to_syx
+
+
+@pytest.fixture
+def cache_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "syx"
+
+
+@pytest.fixture
+def devices():
+    return [
+        Device(id="boss", name="Boss RC-600", midi_channel=1),
+        Device(id="ms", name="Elektron M:S", midi_channel=2),
+    ]
+
+
+@pytest.fixture
+def song():
+    return Song(
+        song=SongMetadata(id="test", name="TEST"),
+        pacer=[PacerButton(name="A", actions=[
+            Action(device="boss", type=ActionType.PRESET, value=5),
+        ])],
+    )
+
+
+class TestSysExKey:
+    def test_channel_map_hash_ignores_cosmetic_fields(self, devices):
+        renamed = [d.model_copy(update={"name": "Inna nazwa"}) for d in devices]
+        assert channel_map_hash(renamed) == channel_map_hash(devices)
+
+    def test_channel_change_changes_key(self, devices):
+        moved = [devices[0].model_copy(update={"midi_channel": 9}), devices[1]]
+        assert sysex_key("h", moved, "A1") != sysex_key("h", devices, "A1")
+
+    def test_preset_is_normalized(self, devices):
+        assert sysex_key("h", devices, "b2") == sysex_key("h", devices, "B2")
+
+    def test_frame_layout_is_part_of_key(self, devices):
+        assert sysex_key("h", devices, "A1", coalesce=True) != sysex_key("h", devices, "A1")
+
+
+class TestSysExCache:
+    def test_export_matches_direct_export(self, cache_dir, song, devices):
+        cache = SysExCache(cache_dir)
+
+        path = cache.export(song, devices, "B3")
+
+        assert path.read_bytes() == export_song_to_syx(song, devices, "B3")
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    def test_second_export_hits(self, cache_dir, song, devices):
+        cache = SysExCache(cache_dir)
+        first = cache.export(song, devices, "A1")
+
+        assert cache.export(song, devices, "A1") == first
+        assert cache.hits == 1
+
+    def test_song_edit_builds_new_artifact(self, cache_dir, song, devices):
+        cache = SysExCache(cache_dir)
+        cache.export(song, devices, "A1")
+
+        edited = song.model_copy(deep=True)
+        edited.song.name = "EDITED"
+        path = cache.export(edited, devices, "A1")
+
+        assert b"EDITED" in path.read_bytes()
+        assert cache.misses == 2
+
+    def test_lru_eviction_removes_files(self, cache_dir, devices):
+        cache = SysExCache(cache_dir, max_entries=2)
+        paths = [cache.put(sysex_key(f"h{i}", devices, "A1"), b"\xf0\xf7") for i in range(3)]
+
+        assert not paths[0].exists()
+        assert paths[1].exists() and paths[2].exists()
+        assert cache.get(sysex_key("h0", devices, "A1")) is None
+
+    def test_get_refreshes_recency(self, cache_dir, devices):
+        cache = SysExCache(cache_dir, max_entries=2)
+        key_a, key_b, key_c = (sysex_key(h, devices, "A1") for h in ("a", "b", "c"))
+        cache.put(key_a, b"a")
+        cache.put(key_b, b"b")
+        cache.get(key_a)
+        cache.put(key_c, b"c")
+
+        assert cache.get(key_a) is not None
+        assert cache.get(key_b) is None
+
+    def test_artifacts_survive_restart(self, cache_dir, song, devices):
+        path = SysExCache(cache_dir).export(song, devices, "A1")
+
+        cold = SysExCache(cache_dir)
+        key = sysex_key(song_hash=path.stem.split("-")[0], devices=devices, preset="A1")
+
+        assert cold.get(key) == path
+        assert cold.export(song, devices, "A1") == path
+        assert cold.misses == 0
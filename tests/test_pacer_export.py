@@ -11,7 +11,8 @@ from paternologia.models import (
     Song,
     SongMetadata,
 )
-from paternologia.pacer.export import export_song_to_syx
+from paternologia.pacer.export import export_song_frames, export_song_to_syx
+from paternologia.pacer.sysex import decode_elements, estimate_transfer_ms
 from paternologia.pacer import constants as c
 
 
@@ -262,3 +263,48 @@ class TestExportLed:
         f0_count = syx.count(bytes([c.SYSEX_START]))
         # 1 name + 6 × (1 mode + 6 steps + 6 LED) = 79
         assert f0_count == 79
+
+
+class TestExportCoalesced:
+    """Coalesced frame layout carries the same elements in fewer frames."""
+
+    @pytest.fixture
+    def song(self):
+        return Song(
+            song=SongMetadata(id="test", name="TEST"),
+            pacer=[
+                PacerButton(name="A", actions=[
+                    Action(device="boss", type=ActionType.PRESET, value=5),
+                    Action(device="ms", type=ActionType.PATTERN, value="A02"),
+                ]),
+                PacerButton(name="B"),
+            ],
+        )
+
+    @staticmethod
+    def _elements(frames):
+        decoded = []
+        for frame in frames[1:]:  # bez ramki nazwy presetu
+            control_id, elements = decode_elements(frame)
+            decoded.extend((control_id, element) for element in elements)
+        return decoded
+
+    def test_same_elements_same_order(self, devices, song):
+        standard = export_song_frames(song, devices, "B2")
+        packed = export_song_frames(song, devices, "B2", coalesce=True)
+
+        assert packed[0] == standard[0]
+        assert self._elements(packed) == self._elements(standard)
+
+    def test_fewer_frames_and_faster_transfer(self, devices, song):
+        standard = export_song_frames(song, devices, "A1")
+        packed = export_song_frames(song, devices, "A1", coalesce=True)
+
+        assert len(standard) == 79
+        assert len(packed) == 1 + 6 * 4
+        assert estimate_transfer_ms(packed, 20) < estimate_transfer_ms(standard, 20) / 2
+
+    def test_default_layout_unchanged(self, devices, song):
+        assert b"".join(export_song_frames(song, devices, "A1")) == export_song_to_syx(
+            song, devices, "A1"
+        )
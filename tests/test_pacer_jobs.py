@@ -0,0 +1,166 @@
+# ABOUTME: Tests for the Pacer send job queue (per-port serialization, dedupe, cancel).
+# ABOUTME: Uses fake runners instead of MIDI transports.
+
+import threading
+import time
+
+import pytest
+
+from paternologia.midi.transport import TransportCancelled
+from paternologia.pacer.jobs import JobState, PacerJobQueue
+
+
+def wait_final(queue: PacerJobQueue, job_id: str, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.final:
+            return job
+        time.sleep(0.005)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class RecordingBus:
+    """Collects JobEvents instead of dispatching them to an event loop."""
+
+    def __init__(self):
+        self.events = []
+
+    def publish_threadsafe(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def gate():
+    """Blocks the runner until set, so jobs stay queued behind it."""
+    return threading.Event()
+
+
+class TestPacerJobQueue:
+    def test_runs_job_and_stores_result(self):
+        queue = PacerJobQueue(runner=lambda job, progress: {"preset": job.preset})
+        job, deduped = queue.submit("pacer", "song", "A1")
+
+        done = wait_final(queue, job.id)
+        assert deduped is False
+        assert done.state == JobState.DONE
+        assert done.result == {"preset": "A1"}
+        queue.close()
+
+    def test_jobs_for_one_device_run_one_at_a_time(self):
+        running = []
+        overlaps = []
+
+        def runner(job, progress):
+            running.append(job.id)
+            if len(running) > 1:
+                overlaps.append(job.id)
+            time.sleep(0.02)
+            running.remove(job.id)
+            return {}
+
+        queue = PacerJobQueue(runner=runner)
+        jobs = [queue.submit("PACER", f"song-{i}", "A1")[0] for i in range(3)]
+        for job in jobs:
+            wait_final(queue, job.id)
+
+        assert overlaps == []
+        queue.close()
+
+    def test_identical_queued_job_is_deduped(self, gate):
+        queue = PacerJobQueue(runner=lambda job, progress: gate.wait() or {})
+        blocker, _ = queue.submit("PACER", "first", "A1")
+        queued, _ = queue.submit("PACER", "song", "B2")
+        again, deduped = queue.submit("pacer", "song", "B2")
+        forced, forced_deduped = queue.submit("PACER", "song", "B2", force_full=True)
+
+        assert deduped is True
+        assert again is queued
+        assert forced_deduped is False
+        gate.set()
+        for job in (blocker, queued, forced):
+            assert wait_final(queue, job.id).state == JobState.DONE
+        queue.close()
+
+    def test_cancel_queued_job(self, gate):
+        ran = []
+
+        def runner(job, progress):
+            ran.append(job.song_id)
+            gate.wait()
+            return {}
+
+        queue = PacerJobQueue(runner=runner)
+        blocker, _ = queue.submit("PACER", "first", "A1")
+        queued, _ = queue.submit("PACER", "second", "A2")
+
+        assert queue.cancel(queued.id).state == JobState.CANCELLED
+        gate.set()
+        wait_final(queue, blocker.id)
+        assert ran == ["first"]
+        queue.close()
+
+    def test_cancel_running_job(self):
+        started = threading.Event()
+
+        def runner(job, progress):
+            started.set()
+            job.cancel_event.wait(2.0)
+            raise TransportCancelled("Anulowano po 3/10 ramkach")
+
+        queue = PacerJobQueue(runner=runner)
+        job, _ = queue.submit("PACER", "song", "A1")
+        started.wait(1.0)
+        queue.cancel(job.id)
+
+        done = wait_final(queue, job.id)
+        assert done.state == JobState.CANCELLED
+        assert "3/10" in done.error
+        queue.close()
+
+    def test_runner_error_marks_job_failed(self):
+        def runner(job, progress):
+            raise RuntimeError("port gone")
+
+        queue = PacerJobQueue(runner=runner)
+        job, _ = queue.submit("PACER", "song", "A1")
+
+        done = wait_final(queue, job.id)
+        assert done.state == JobState.FAILED
+        assert done.error == "port gone"
+        queue.close()
+
+    def test_progress_is_published(self):
+        def runner(job, progress):
+            for sent in range(1, 4):
+                progress(sent, 3)
+            return {}
+
+        bus = RecordingBus()
+        queue = PacerJobQueue(runner=runner, events=bus)
+        job, _ = queue.submit("PACER", "song", "A1")
+        wait_final(queue, job.id)
+        queue.close()
+
+        states = [e.state for e in bus.events if e.job_id == job.id]
+        assert states[0] == "queued"
+        assert states[-1] == "done"
+        sent = [e.data["sent"] for e in bus.events if e.state == "running"]
+        assert sent == [0, 1, 2, 3]
+
+    def test_close_cancels_queued_jobs(self):
+        started = threading.Event()
+
+        def runner(job, progress):
+            started.set()
+            job.cancel_event.wait(2.0)
+            return {}
+
+        queue = PacerJobQueue(runner=runner)
+        running, _ = queue.submit("PACER", "first", "A1")
+        queued, _ = queue.submit("PACER", "second", "A2")
+        started.wait(1.0)
+
+        queue.close()
+        assert running.cancel_event.is_set()
+        assert queue.get(queued.id).state == JobState.CANCELLED
@@ -5,6 +5,7 @@ import pytest
 
 from paternologia.models import Action, ActionType, Device
 from paternologia.pacer.mappings import (
+    action_to_messages,
     action_to_midi,
     build_device_channel_map,
     get_device_channel,
@@ -279,3 +280,25 @@ class TestActionToMidiNote:
 
         assert data1 == 69   # A4
         assert data2 == 100  # default velocity
+
+
+class TestActionToMessages:
+    """Tests for raw MIDI messages sent when firing a button from the app."""
+
+    def test_preset_sends_bank_select_and_program_change(self):
+        action = Action(device="boss", type=ActionType.PRESET, value=130)
+        assert action_to_messages(action, {"boss": 13}) == [
+            [0xBC, 0, 1], [0xBC, 32, 0], [0xCC, 2],
+        ]
+
+    def test_cc_sends_down_and_up(self):
+        action = Action(device="boss", type=ActionType.CC, cc=80, value=127)
+        assert action_to_messages(action, {"boss": 1}) == [[0xB0, 80, 127], [0xB0, 80, 0]]
+
+    def test_note_sends_on_and_off(self):
+        action = Action(device="freak", type=ActionType.NOTE, note="C4", velocity=90)
+        assert action_to_messages(action, {"freak": 2}) == [[0x91, 60, 90], [0x81, 60, 0]]
+
+    def test_pattern_sends_program_change(self):
+        action = Action(device="ms", type=ActionType.PATTERN, value="B01")
+        assert action_to_messages(action, {"ms": 3}) == [[0xC2, 16]]
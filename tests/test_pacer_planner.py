@@ -0,0 +1,81 @@
+# ABOUTME: Tests for the setlist-driven Pacer preset slot allocator.
+# ABOUTME: Checks upload minimality (vs brute force on small cases) and bank adjacency.
+
+from paternologia.pacer.planner import PRESET_SLOTS, plan_slots
+
+
+def min_uploads_brute_force(sequence: list[str], n_slots: int) -> int:
+    """Fewest uploads over every possible eviction choice (tiny inputs only)."""
+    best = [len(sequence)]
+
+    def walk(i: int, loaded: frozenset, uploads: int) -> None:
+        if uploads >= best[0]:
+            return
+        if i == len(sequence):
+            best[0] = uploads
+            return
+        song = sequence[i]
+        if song in loaded:
+            walk(i + 1, loaded, uploads)
+        elif len(loaded) < n_slots:
+            walk(i + 1, loaded | {song}, uploads + 1)
+        else:
+            for victim in loaded:
+                walk(i + 1, (loaded - {victim}) | {song}, uploads + 1)
+
+    walk(0, frozenset(), 0)
+    return best[0]
+
+
+class TestPlanSlots:
+    def test_small_show_is_preloaded_in_order(self):
+        plan = plan_slots([["a", "b", "c"], ["c", "d", "a"]])
+
+        assert plan.initial == {"a": "A1", "b": "A2", "c": "A3", "d": "A4"}
+        assert plan.uploads == 4
+        assert plan.uploads_during_show == 0
+        assert [s.preset for s in plan.steps] == ["A1", "A2", "A3", "A3", "A4", "A1"]
+
+    def test_consecutive_songs_share_banks(self):
+        setlist = [f"song-{i}" for i in range(24)]
+        plan = plan_slots([setlist])
+
+        assert [s.preset for s in plan.steps] == PRESET_SLOTS
+        assert plan.adjacent_pairs == 20  # 5 per bank
+
+    def test_uploads_are_minimal(self):
+        slots = ["A1", "A2", "A3"]
+        for sequence in (
+            list("abcdabcd"),
+            list("abcadbeacb"),
+            list("aabbccddeeaa"),
+            list("abcdeedcba"),
+        ):
+            plan = plan_slots([sequence], slots=slots)
+            assert plan.uploads == min_uploads_brute_force(sequence, len(slots)), sequence
+
+    def test_loaded_song_is_never_moved(self):
+        songs = [f"s{i}" for i in range(30)]
+        setlists = [songs[:20], songs[10:30], songs[::3]]
+        plan = plan_slots(setlists)
+
+        slot_of = {}
+        for step in plan.steps:
+            if step.upload:
+                # Evicted songs lose their slot
+                for song, preset in list(slot_of.items()):
+                    if preset == step.preset:
+                        del slot_of[song]
+                slot_of[step.song_id] = step.preset
+            assert slot_of[step.song_id] == step.preset
+        assert len(plan.initial) == 24
+
+    def test_as_dict(self):
+        data = plan_slots([["a", "b"]]).as_dict()
+
+        assert data["initial"] == {"a": "A1", "b": "A2"}
+        assert data["uploads"] == 2
+        assert data["steps"][1] == {
+            "setlist": 0, "position": 1, "song_id": "b", "preset": "A2", "upload": True,
+        }
+
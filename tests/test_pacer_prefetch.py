@@ -0,0 +1,128 @@
+# ABOUTME: Tests for rolling-window preset prefetch (Pacer presets as an LRU cache).
+# ABOUTME: Uses a fake job queue that records submitted uploads.
+
+import asyncio
+
+import pytest
+
+from paternologia.midi.events import EventBus, MidiEvent
+from paternologia.models import SongSummary
+from paternologia.pacer.jobs import JobState, PacerJob
+from paternologia.pacer.prefetch import PresetPrefetcher, assignments_from_summaries
+
+
+class FakeJobs:
+    """Records submits; jobs stay queued until finish() is called."""
+
+    def __init__(self):
+        self.jobs: dict[str, PacerJob] = {}
+
+    def submit(self, device, song_id, preset, force_full=False, kind="send"):
+        job = PacerJob(id=str(len(self.jobs) + 1), device=device, song_id=song_id, preset=preset)
+        self.jobs[job.id] = job
+        return job, False
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.jobs[job_id]
+        if job.state == JobState.QUEUED:
+            job.state = JobState.CANCELLED
+        return job
+
+    def finish(self, state=JobState.DONE):
+        for job in self.jobs.values():
+            if not job.final:
+                job.state = state
+
+    def uploads(self):
+        return [(j.song_id, j.preset) for j in self.jobs.values()]
+
+
+SLOTS = ["A1", "A2", "A3", "A4"]
+SETLIST = [f"s{i}" for i in range(1, 11)]
+
+
+@pytest.fixture
+def jobs():
+    return FakeJobs()
+
+
+@pytest.fixture
+def prefetcher(jobs):
+    p = PresetPrefetcher(jobs, "PACER", window=2, slots=SLOTS)
+    p.load({"s1": "A1", "s2": "A2", "s3": "A3", "s4": "A4"})
+    return p
+
+
+class TestPresetPrefetcher:
+    def test_loaded_window_needs_no_uploads(self, prefetcher, jobs):
+        assert prefetcher.on_song("s1", SETLIST) == []
+        assert prefetcher.active == "A1"
+
+    def test_uploads_next_songs_into_lru_slots(self, prefetcher, jobs):
+        prefetcher.on_song("s1", SETLIST)
+        prefetcher.on_song("s2", SETLIST)
+        prefetcher.on_song("s3", SETLIST)
+        jobs.finish()
+        prefetcher.on_song("s4", SETLIST)
+
+        # s4 active, s5/s6 upcoming: evict s1 then s2 (least recently used)
+        assert jobs.uploads() == [("s5", "A1"), ("s6", "A2")]
+        assert prefetcher.slot_of("s5") == "A1"
+
+    def test_never_overwrites_active_preset(self, jobs):
+        prefetcher = PresetPrefetcher(jobs, "PACER", window=3, slots=["A1", "A2"])
+        prefetcher.load({"s1": "A1", "s2": "A2"})
+
+        prefetcher.on_song("s1", SETLIST)
+
+        assert all(preset != "A1" for _, preset in jobs.uploads())
+        assert prefetcher.slot_of("s1") == "A1"
+
+    def test_failed_upload_frees_slot(self, prefetcher, jobs):
+        prefetcher.on_song("s4", SETLIST)
+        jobs.finish(JobState.FAILED)
+
+        prefetcher.on_song("s4", SETLIST)
+
+        assert prefetcher.slot_of("s5") is not None
+        assert len(jobs.uploads()) == 4  # s5, s6 retried after the failure
+
+    def test_jumping_back_cancels_pending_overwrite(self, prefetcher, jobs):
+        prefetcher.on_song("s4", SETLIST)
+        target = dict((song, preset) for song, preset in jobs.uploads())["s5"]
+        evicted = {"A1": "s1", "A2": "s2", "A3": "s3"}[target]
+
+        prefetcher.on_song(evicted, SETLIST)
+
+        assert prefetcher.active == target
+        assert prefetcher.slot_of(evicted) == target
+
+    def test_follow_reacts_to_live_events(self, prefetcher, jobs):
+        async def scenario():
+            bus = EventBus()
+            bus.set_loop(asyncio.get_running_loop())
+
+            async def setlist():
+                return SETLIST
+
+            task = asyncio.create_task(prefetcher.follow(bus, setlist))
+            await asyncio.sleep(0)
+            await bus.publish(MidiEvent(song_id="s4", channel=0, program=3))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+
+        asyncio.run(scenario())
+        assert [song for song, _ in jobs.uploads()] == ["s5", "s6"]
+
+
+def test_assignments_from_summaries():
+    summaries = [
+        SongSummary(id="one", name="One", target_preset="A1", content_hash="h"),
+        SongSummary(id="two", name="Two", target_preset="A1", content_hash="h"),
+        SongSummary(id="three", name="Three", target_preset="b2", content_hash="h"),
+    ]
+    assert assignments_from_summaries(summaries) == {"one": "A1", "three": "B2"}
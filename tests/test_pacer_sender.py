@@ -0,0 +1,163 @@
+# ABOUTME: Unit tests for sending songs and deploying the whole setlist to the Pacer.
+# ABOUTME: Uses a recording fake transport, a temporary SysEx cache and shadow file.
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from paternologia.midi.transport import FrameTiming, SendReport, TransportCancelled
+from paternologia.models import (
+    Action,
+    ActionType,
+    Device,
+    PacerButton,
+    PacerConfig,
+    PacerExportSettings,
+    Song,
+    SongMetadata,
+)
+from paternologia.pacer.cache import SysExCache
+from paternologia.pacer.export import export_song_frames
+from paternologia.pacer.sender import deploy_setlist, send_song
+from paternologia.pacer.shadow import PacerShadow
+
+
+class FakeTransport:
+    """Records every send(); optionally stops after `fail_after` frames."""
+
+    name = "fake"
+    port = "fake:0"
+
+    def __init__(self, fail_after: int | None = None):
+        self.sends: list[list[bytes]] = []
+        self.fail_after = fail_after
+
+    def send(self, frames, interval_ms, timeout_s, on_frame=None, syx_file=None, cancel=None):
+        self.sends.append(list(frames))
+        for index, frame in enumerate(frames):
+            if self.fail_after is not None and index == self.fail_after:
+                raise TransportCancelled(f"Anulowano po {index}/{len(frames)} ramkach")
+            if on_frame is not None:
+                on_frame(FrameTiming(index=index, size=len(frame), offset_ms=0.0, late_ms=0.0))
+        return SendReport(transport=self.name, port=self.port, frames=len(frames), elapsed_ms=1.0)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def workdir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def cache(workdir):
+    return SysExCache(workdir / "syx")
+
+
+@pytest.fixture
+def shadow(workdir):
+    return PacerShadow(workdir / "pacer_shadow.json")
+
+
+@pytest.fixture
+def devices():
+    return [Device(id="boss", name="Boss RC-600", midi_channel=1)]
+
+
+@pytest.fixture
+def config():
+    return PacerConfig(device_name="PACER", sysex_interval_ms=20)
+
+
+def make_song(song_id: str, preset: str, value: int = 1) -> Song:
+    return Song(
+        song=SongMetadata(
+            id=song_id,
+            name=song_id.upper(),
+            pacer_export=PacerExportSettings(target_preset=preset),
+        ),
+        pacer=[PacerButton(name="A", actions=[
+            Action(device="boss", type=ActionType.PRESET, value=value),
+        ])],
+    )
+
+
+class TestSendSong:
+    def test_second_send_is_skipped(self, cache, shadow, devices, config):
+        transport = FakeTransport()
+        song = make_song("one", "A1")
+
+        first = send_song(song, devices, "A1", config, transport, cache, shadow)
+        second = send_song(song, devices, "A1", config, transport, cache, shadow)
+
+        assert first.frames_sent == first.frames_total
+        assert second.frames_sent == 0
+        assert len(transport.sends) == 1
+
+
+class TestDeploySetlist:
+    def test_whole_setlist_in_one_stream(self, cache, shadow, devices, config):
+        transport = FakeTransport()
+        setlist = [(s.song.id, s) for s in (make_song("one", "A1"), make_song("two", "A2"))]
+        progress = []
+
+        result = deploy_setlist(
+            setlist, devices, config, transport, cache, shadow,
+            progress=lambda sent, total: progress.append((sent, total)),
+        )
+
+        assert len(transport.sends) == 1
+        assert [s.status for s in result.songs] == ["sent", "sent"]
+        assert result.frames_sent == result.frames_total == len(transport.sends[0])
+        assert progress[-1] == (result.frames_sent, result.frames_sent)
+
+    def test_redeploy_sends_only_changes(self, cache, shadow, devices, config):
+        deploy_setlist(
+            [("one", make_song("one", "A1")), ("two", make_song("two", "A2"))],
+            devices, config, FakeTransport(), cache, shadow,
+        )
+
+        transport = FakeTransport()
+        result = deploy_setlist(
+            [("one", make_song("one", "A1")), ("two", make_song("two", "A2", value=9))],
+            devices, config, transport, cache, shadow,
+        )
+
+        assert [s.status for s in result.songs] == ["unchanged", "sent"]
+        assert result.frames_sent == 1
+        assert result.ms_saved == (result.frames_total - 1) * 20
+
+    def test_conflicting_and_missing_songs(self, cache, shadow, devices, config):
+        transport = FakeTransport()
+        setlist = [
+            ("one", make_song("one", "B1")),
+            ("ghost", None),
+            ("two", make_song("two", "B1")),
+        ]
+
+        result = deploy_setlist(setlist, devices, config, transport, cache, shadow)
+
+        assert [s.status for s in result.songs] == ["sent", "missing", "conflict"]
+        assert "one" in result.songs[2].detail
+        assert result.frames_sent == result.songs[0].frames_total
+
+    def test_cancel_keeps_shadow_of_completed_songs(self, cache, shadow, devices, config):
+        one, two = make_song("one", "A1"), make_song("two", "A2")
+        frames_per_song = len(export_song_frames(one, devices, "A1"))
+
+        with pytest.raises(TransportCancelled) as exc:
+            deploy_setlist(
+                [("one", one), ("two", two)], devices, config,
+                FakeTransport(fail_after=frames_per_song + 1), cache, shadow,
+            )
+
+        statuses = [s["status"] for s in exc.value.result["songs"]]
+        assert statuses == ["sent", "cancelled"]
+        assert exc.value.result["status"] == "cancelled"
+
+        transport = FakeTransport()
+        retry = deploy_setlist([("one", one), ("two", two)], devices, config, transport, cache, shadow)
+        assert [s.status for s in retry.songs] == ["unchanged", "sent"]
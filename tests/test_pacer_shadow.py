@@ -0,0 +1,81 @@
+# ABOUTME: Unit tests for the shadow copy of Pacer preset contents.
+# ABOUTME: Tests frame diffing, persistence and forgetting presets.
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from paternologia.models import Action, ActionType, Device, PacerButton, Song, SongMetadata
+from paternologia.pacer.export import export_song_frames, export_song_to_syx, split_frames
+from paternologia.pacer.shadow import PacerShadow
+
+
+@pytest.fixture
+def shadow_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "pacer_shadow.json"
+
+
+@pytest.fixture
+def devices():
+    return [Device(id="boss", name="Boss RC-600", midi_channel=1)]
+
+
+@pytest.fixture
+def song():
+    return Song(
+        song=SongMetadata(id="test", name="TEST"),
+        pacer=[PacerButton(name="A", actions=[
+            Action(device="boss", type=ActionType.PRESET, value=5),
+        ])],
+    )
+
+
+class TestFrames:
+    def test_split_frames_roundtrip(self, song, devices):
+        frames = export_song_frames(song, devices, "A1")
+
+        assert len(frames) == 1 + 6 * 13
+        assert split_frames(export_song_to_syx(song, devices, "A1")) == frames
+
+
+class TestPacerShadow:
+    def test_unknown_preset_sends_everything(self, shadow_file, song, devices):
+        frames = export_song_frames(song, devices, "A1")
+
+        diff = PacerShadow(shadow_file).diff("PACER", "A1", frames)
+
+        assert diff.frames == frames
+        assert diff.skipped == 0
+
+    def test_only_changed_frames_are_sent(self, shadow_file, song, devices):
+        shadow = PacerShadow(shadow_file)
+        shadow.update("PACER", "A1", export_song_frames(song, devices, "A1"))
+
+        song.pacer[0].actions[0].value = 6
+        frames = export_song_frames(song, devices, "A1")
+        diff = shadow.diff("PACER", "A1", frames)
+
+        assert len(diff.frames) == 1
+        assert diff.frames[0] in frames
+        assert diff.skipped == len(frames) - 1
+
+    def test_presets_and_devices_are_separate(self, shadow_file, song, devices):
+        shadow = PacerShadow(shadow_file)
+        frames = export_song_frames(song, devices, "A1")
+        shadow.update("PACER", "A1", frames)
+
+        assert shadow.diff("PACER", "A1", frames).frames == []
+        assert shadow.diff("PACER", "B1", frames).skipped == 0
+        assert shadow.diff("OTHER", "A1", frames).skipped == 0
+
+    def test_persists_and_forgets(self, shadow_file, song, devices):
+        frames = export_song_frames(song, devices, "A1")
+        PacerShadow(shadow_file).update("PACER", "A1", frames)
+
+        reloaded = PacerShadow(shadow_file)
+        assert reloaded.diff("PACER", "A1", frames).frames == []
+
+        reloaded.forget("PACER", "A1")
+        assert PacerShadow(shadow_file).diff("PACER", "A1", frames).skipped == 0
@@ -3,7 +3,7 @@
 
 import pytest
 
-from paternologia.pacer.sysex import PacerSysExBuilder, checksum
+from paternologia.pacer.sysex import PacerSysExBuilder, checksum, decode_elements
 from paternologia.pacer import constants as c
 
 
@@ -183,3 +183,34 @@ class TestControlStep:
         params = syx[9:-2]
         # Last parameter: [6, 0x01, 0]
         assert params[-3:] == bytes([6, 0x01, 0])
+
+
+class TestCoalescedFrames:
+    """Packing many elements of one control into fewer frames."""
+
+    def test_single_group_matches_dedicated_builders(self):
+        builder = PacerSysExBuilder(preset_index=0x01)
+        step = builder.control_step_elements(2, c.MSG_SW_PRG_BANK, 3, 10, 0, 0)
+        led = builder.control_led_elements(4, c.LED_BLUE, c.LED_AMBER)
+
+        assert builder.build_control_elements(0x0D, step) == [
+            builder.build_control_step(0x0D, 2, c.MSG_SW_PRG_BANK, 3, 10, 0, 0)
+        ]
+        assert builder.build_control_elements(0x0D, led) == [
+            builder.build_control_led(0x0D, 4, c.LED_BLUE, c.LED_AMBER)
+        ]
+
+    def test_chunks_respect_limit_and_order(self):
+        builder = PacerSysExBuilder(preset_index=0x01)
+        elements = [(i, i % 128) for i in range(1, 40)]
+
+        frames = builder.build_control_elements(0x0E, elements, max_elements=16)
+
+        assert len(frames) == 3
+        decoded = []
+        for frame in frames:
+            control_id, frame_elements = decode_elements(frame)
+            assert control_id == 0x0E
+            assert checksum(frame[1:-2]) == frame[-2]
+            decoded.extend(frame_elements)
+        assert decoded == elements
@@ -0,0 +1,95 @@
+# ABOUTME: Tests for the in-memory cache of pre-rendered song pages.
+# ABOUTME: Covers warm-up, hash validation, per-song refresh and drop.
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from paternologia.async_storage import AsyncStorage
+from paternologia.dependencies import get_templates
+from paternologia.models import (
+    Action, ActionType, Device, PacerButton, Song, SongMetadata, content_hash,
+)
+from paternologia.render_cache import LIVE_SONG, SONG_PAGE, RenderCache
+from paternologia.storage import Storage
+
+
+def _song(song_id: str, name: str) -> Song:
+    return Song(
+        song=SongMetadata(id=song_id, name=name),
+        pacer=[PacerButton(name="SW1", actions=[
+            Action(device="boss", type=ActionType.PRESET, value=2),
+        ])],
+    )
+
+
+@pytest.fixture
+def devices():
+    return [Device(id="boss", name="RC-600", midi_channel=12, action_types=[ActionType.PRESET])]
+
+
+@pytest.fixture
+def storage(devices):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = Storage(data_dir=Path(tmpdir))
+        backend.save_devices(devices)
+        backend.save_song(_song("zen", "Zen"))
+        backend.save_song(_song("rock", "Rock"))
+        yield AsyncStorage(backend)
+
+
+@pytest.fixture
+def cache():
+    return RenderCache(get_templates())
+
+
+class TestRenderCache:
+    async def test_warm_renders_every_song_and_template(self, cache, storage):
+        assert await cache.warm(storage) == 2
+
+        assert len(cache) == 4
+        assert "Zen" in cache.get(LIVE_SONG, "zen")
+        assert "Rock" in cache.get(SONG_PAGE, "rock")
+
+    def test_get_valid_checks_song_and_devices_hash(self, cache, devices):
+        song = _song("zen", "Zen")
+        cache.refresh(song, devices)
+        song_hash, devices_hash = content_hash(song), content_hash(devices)
+
+        assert cache.get_valid(LIVE_SONG, "zen", song_hash, devices_hash) is not None
+        assert cache.get_valid(LIVE_SONG, "zen", "other", devices_hash) is None
+        assert cache.get_valid(LIVE_SONG, "zen", song_hash, "other") is None
+
+    def test_refresh_replaces_only_that_song(self, cache, devices):
+        cache.refresh(_song("zen", "Zen"), devices)
+        cache.refresh(_song("rock", "Rock"), devices)
+        rock_html = cache.get(SONG_PAGE, "rock")
+
+        cache.refresh(_song("zen", "Zen Remix"), devices)
+
+        assert "Zen Remix" in cache.get(SONG_PAGE, "zen")
+        assert cache.get(SONG_PAGE, "rock") is rock_html
+        assert len(cache) == 4
+
+    def test_drop(self, cache, devices):
+        cache.refresh(_song("zen", "Zen"), devices)
+        cache.drop("zen")
+
+        assert cache.get(LIVE_SONG, "zen") is None
+        assert len(cache) == 0
+
+    async def test_warm_does_not_re_add_dropped_song(self, cache, storage):
+        """A song deleted while warm-up runs stays out of the cache."""
+        backend_get_songs = storage.backend.get_songs
+
+        def get_songs_then_delete():
+            songs = backend_get_songs()
+            cache.drop("rock")
+            return songs
+
+        storage.backend.get_songs = get_songs_then_delete
+        await cache.warm(storage)
+
+        assert cache.get(LIVE_SONG, "rock") is None
+        assert cache.get(LIVE_SONG, "zen") is not None
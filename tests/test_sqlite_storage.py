@@ -0,0 +1,229 @@
+# ABOUTME: Unit tests for the SQLite storage backend.
+# ABOUTME: Tests CRUD round-trips, ordering, indexes and YAML import/export.
+
+import sqlite3
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from paternologia.midi.index import bank_number
+from paternologia.models import (
+    Action,
+    ActionType,
+    Device,
+    PacerButton,
+    PacerConfig,
+    PacerExportSettings,
+    Song,
+    SongMetadata,
+)
+from paternologia.sqlite_storage import SqliteStorage, main
+from paternologia.storage import Storage, copy_library
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def db_storage(temp_dir):
+    storage = SqliteStorage(data_dir=temp_dir)
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def sample_devices():
+    return [
+        Device(id="boss", name="Boss RC-600", midi_channel=12,
+               action_types=[ActionType.PRESET, ActionType.CC]),
+        Device(id="ms", name="Model:Samples", midi_channel=1,
+               action_types=[ActionType.PATTERN]),
+    ]
+
+
+@pytest.fixture
+def sample_song():
+    return Song(
+        song=SongMetadata(
+            id="w-ciszy",
+            name="W ciszy",
+            author="Wojtek",
+            created=date(2024, 12, 14),
+            notes="Ballada",
+            pacer_export=PacerExportSettings(target_preset="B2"),
+        ),
+        pacer=[
+            PacerButton(name="Start", actions=[
+                Action(device="boss", type=ActionType.PRESET, value=130, bank_msb=1),
+                Action(device="ms", type=ActionType.PATTERN, value="A01"),
+                Action(device="boss", type=ActionType.CC, cc=1, value=127, label="Play"),
+            ]),
+            PacerButton(name="Pusty"),
+            PacerButton(name="Nuta", actions=[
+                Action(device="boss", type=ActionType.NOTE, note="C4", velocity=90),
+            ]),
+        ],
+    )
+
+
+class TestSqliteSongs:
+    """Song round-trips through SQLite."""
+
+    def test_save_and_get_song_roundtrip(self, db_storage, sample_song):
+        """Saved song is loaded back identical (including int vs str values)."""
+        db_storage.save_song(sample_song)
+
+        assert db_storage.get_song("w-ciszy") == sample_song
+
+    def test_get_song_not_found(self, db_storage):
+        assert db_storage.get_song("missing") is None
+
+    def test_update_replaces_buttons(self, db_storage, sample_song):
+        """Saving again replaces buttons and actions."""
+        db_storage.save_song(sample_song)
+        updated = sample_song.model_copy(deep=True)
+        updated.pacer = updated.pacer[:1]
+        db_storage.save_song(updated)
+
+        loaded = db_storage.get_song("w-ciszy")
+        assert len(loaded.pacer) == 1
+
+    def test_delete_song_cascades(self, db_storage, sample_song):
+        """Deleting a song removes its buttons and actions."""
+        db_storage.save_song(sample_song)
+
+        assert db_storage.delete_song("w-ciszy") is True
+        assert db_storage.delete_song("w-ciszy") is False
+        assert not db_storage.song_exists("w-ciszy")
+
+        conn = sqlite3.connect(db_storage.db_file)
+        assert conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM buttons").fetchone()[0] == 0
+        conn.close()
+
+    def test_get_songs_respects_order(self, db_storage):
+        """Ordered songs first, remaining ones alphabetically."""
+        for song_id in ["zebra", "alpha", "beta", "gamma"]:
+            db_storage.save_song(Song(song=SongMetadata(id=song_id, name=song_id)))
+        db_storage.save_songs_order(["gamma", "deleted", "zebra"])
+
+        ids = [s.song.id for s in db_storage.get_songs()]
+        assert ids == ["gamma", "zebra", "alpha", "beta"]
+
+
+class TestSqliteConfig:
+    """Devices, order and Pacer config."""
+
+    def test_devices_roundtrip(self, db_storage, sample_devices):
+        db_storage.save_devices(sample_devices)
+
+        assert db_storage.get_devices() == sample_devices
+        assert db_storage.get_device("ms").midi_channel == 1
+        assert db_storage.get_device("missing") is None
+
+    def test_pacer_config_roundtrip(self, db_storage):
+        assert db_storage.get_pacer_config() is None
+
+        db_storage.save_pacer_config(PacerConfig(device_name="PACER", sysex_interval_ms=25))
+
+        assert db_storage.get_pacer_config().sysex_interval_ms == 25
+
+
+class TestSqliteSchema:
+    """Database setup."""
+
+    def test_wal_mode(self, db_storage):
+        conn = sqlite3.connect(db_storage.db_file)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_lookup_indexes_exist(self, db_storage):
+        conn = sqlite3.connect(db_storage.db_file)
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.close()
+        assert {"idx_actions_device", "idx_actions_type", "idx_songs_target_preset"} <= names
+
+    def test_snapshot_builds_midi_index(self, db_storage, sample_devices, sample_song):
+        db_storage.save_devices(sample_devices)
+        db_storage.save_song(sample_song)
+
+        snapshot = db_storage.load_snapshot()
+
+        assert [s.song.id for s in snapshot.songs] == ["w-ciszy"]
+        # value 130 carries into bank MSB on top of bank_msb=1
+        assert snapshot.midi_index.lookup(channel=11, program=2, bank=bank_number(2, 0)) == "w-ciszy"
+
+
+class TestYamlImportExport:
+    """Copying the library between backends."""
+
+    def test_import_and_export_roundtrip(self, temp_dir, sample_devices, sample_song):
+        yaml_dir = temp_dir / "yaml"
+        source = Storage(data_dir=yaml_dir)
+        source.save_devices(sample_devices)
+        source.save_song(sample_song)
+        source.save_songs_order(["w-ciszy"])
+        source.save_pacer_config(PacerConfig())
+
+        main(["import-yaml", "--data-dir", str(yaml_dir)])
+        db = SqliteStorage(data_dir=yaml_dir)
+        assert db.get_song("w-ciszy") == sample_song
+        assert db.get_songs_order() == ["w-ciszy"]
+
+        export = Storage(data_dir=temp_dir / "export")
+        copy_library(db, export)
+        db.close()
+
+        assert export.get_song("w-ciszy") == sample_song
+        assert export.get_devices() == sample_devices
+        assert export.get_pacer_config() == PacerConfig()
+
+    def test_copy_removes_songs_missing_in_source(self, temp_dir, db_storage, sample_song):
+        db_storage.save_song(Song(song=SongMetadata(id="stale", name="Stale")))
+        source = Storage(data_dir=temp_dir / "yaml")
+        source.save_song(sample_song)
+
+        copy_library(source, db_storage)
+
+        assert [s.song.id for s in db_storage.get_songs()] == ["w-ciszy"]
+
+
+class TestSqliteSummaries:
+    """Song list served from the songs table."""
+
+    def test_summaries_match_yaml_backend(self, temp_dir, db_storage, sample_song):
+        yaml_storage = Storage(data_dir=temp_dir / "yaml")
+        yaml_storage.save_song(sample_song)
+        db_storage.save_song(sample_song)
+
+        assert db_storage.get_song_summaries() == yaml_storage.get_song_summaries()
+
+    def test_get_song_summary(self, db_storage, sample_song):
+        assert db_storage.get_song_summary("w-ciszy") is None
+        db_storage.save_song(sample_song)
+
+        assert db_storage.get_song_summary("w-ciszy") == db_storage.get_song_summaries()[0]
+
+    def test_migration_fills_summary_columns(self, temp_dir, sample_song):
+        """Databases created before the summary columns are migrated on open."""
+        db_file = temp_dir / "old.db"
+        conn = sqlite3.connect(db_file)
+        conn.executescript(
+            "CREATE TABLE songs (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+            "author TEXT NOT NULL DEFAULT '', created TEXT NOT NULL, "
+            "notes TEXT NOT NULL DEFAULT '', target_preset TEXT NOT NULL DEFAULT 'A1');"
+            "INSERT INTO songs (id, name, created) VALUES ('stary', 'Stary', '2024-01-01');"
+        )
+        conn.close()
+
+        storage = SqliteStorage(data_dir=temp_dir, db_file=db_file)
+        summaries = storage.get_song_summaries()
+        storage.close()
+
+        assert [s.id for s in summaries] == ["stary"]
+        assert summaries[0].content_hash != ""
@@ -15,8 +15,9 @@ from paternologia.models import (
     PacerConfig,
     Song,
     SongMetadata,
+    content_hash,
 )
-from paternologia.storage import Storage
+from paternologia.storage import Storage, snapshot_key
 
 
 @pytest.fixture
@@ -257,11 +258,11 @@ class TestSongsOrder:
 class TestStorageDirectoryCreation:
     """Tests for automatic directory creation."""
 
-    def test_ensure_dirs_creates_structure(self, temp_storage):
-        """_ensure_dirs creates necessary directories."""
-        temp_storage._ensure_dirs()
-        assert temp_storage.data_dir.exists()
-        assert temp_storage.songs_dir.exists()
+    def test_constructor_creates_structure(self, tmp_path):
+        """Storage creates its data directories on construction."""
+        storage = Storage(data_dir=tmp_path / "data")
+        assert storage.data_dir.exists()
+        assert storage.songs_dir.exists()
 
     def test_save_creates_directories(self, temp_storage, sample_song):
         """Saving automatically creates directories."""
@@ -302,3 +303,225 @@ class TestPacerConfigStorage:
 
         loaded = temp_storage.get_pacer_config()
         assert loaded.amidi_timeout_seconds == 5
+
+
+class TestStorageCache:
+    """Tests for the in-memory parsed-file cache."""
+
+    def test_warm_read_is_cache_hit(self, temp_storage, sample_song):
+        """Second read of an unchanged file does not re-parse YAML."""
+        temp_storage.save_song(sample_song)
+
+        first = temp_storage.get_song("w-ciszy")
+        second = temp_storage.get_song("w-ciszy")
+
+        assert first is second
+        assert temp_storage.cache_stats.misses == 1
+        assert temp_storage.cache_stats.hits == 1
+
+    def test_warm_get_songs_does_not_reparse(self, temp_storage, sample_song, sample_devices):
+        """Repeated listing hits the cache for every song and devices.yaml."""
+        temp_storage.save_devices(sample_devices)
+        temp_storage.save_song(sample_song)
+        temp_storage.save_song(Song(song=SongMetadata(id="another", name="Another")))
+
+        temp_storage.get_songs()
+        temp_storage.get_devices()
+        misses = temp_storage.cache_stats.misses
+
+        temp_storage.get_songs()
+        temp_storage.get_devices()
+
+        assert temp_storage.cache_stats.misses == misses
+
+    def test_save_invalidates_cache(self, temp_storage, sample_song):
+        """Saving a song makes the next read return new content."""
+        temp_storage.save_song(sample_song)
+        temp_storage.get_song("w-ciszy")
+
+        updated = sample_song.model_copy(deep=True)
+        updated.song.name = "Po zmianie"
+        temp_storage.save_song(updated)
+
+        assert temp_storage.get_song("w-ciszy").song.name == "Po zmianie"
+
+    def test_external_edit_is_detected(self, temp_storage, sample_song):
+        """A file changed on disk (size/mtime) is re-read."""
+        temp_storage.save_song(sample_song)
+        temp_storage.get_song("w-ciszy")
+
+        song_file = temp_storage.songs_dir / "w-ciszy.yaml"
+        song_file.write_text(
+            song_file.read_text(encoding="utf-8").replace("W ciszy", "Edytowane ręcznie"),
+            encoding="utf-8",
+        )
+
+        assert temp_storage.get_song("w-ciszy").song.name == "Edytowane ręcznie"
+
+    def test_deleted_file_is_dropped(self, temp_storage, sample_song):
+        """A song removed from disk disappears from listings."""
+        temp_storage.save_song(sample_song)
+        assert len(temp_storage.get_songs()) == 1
+
+        (temp_storage.songs_dir / "w-ciszy.yaml").unlink()
+
+        assert temp_storage.get_songs() == []
+        assert temp_storage.get_song("w-ciszy") is None
+
+    def test_returned_order_is_a_copy(self, temp_storage):
+        """Mutating the returned order list does not corrupt the cache."""
+        temp_storage.save_songs_order(["a", "b"])
+        temp_storage.get_songs_order().append("c")
+
+        assert temp_storage.get_songs_order() == ["a", "b"]
+
+
+class TestLibrarySnapshot:
+    """Tests for the compiled library snapshot."""
+
+    def test_snapshot_contains_library(self, temp_storage, sample_song, sample_devices):
+        """Snapshot holds songs, devices, order and the MIDI index."""
+        temp_storage.save_devices(sample_devices)
+        temp_storage.save_song(sample_song)
+        temp_storage.save_songs_order(["w-ciszy"])
+
+        snapshot = temp_storage.load_snapshot()
+
+        assert [s.song.id for s in snapshot.songs] == ["w-ciszy"]
+        assert [d.id for d in snapshot.devices] == ["boss", "ms", "freak"]
+        assert snapshot.order == ["w-ciszy"]
+        assert temp_storage.snapshot_file.exists()
+
+    def test_fresh_snapshot_skips_yaml_parsing(self, temp_storage, sample_song, sample_devices):
+        """A new Storage on unchanged data loads everything from the snapshot."""
+        temp_storage.save_devices(sample_devices)
+        temp_storage.save_song(sample_song)
+        temp_storage.load_snapshot()
+
+        cold = Storage(data_dir=temp_storage.data_dir)
+        snapshot = cold.load_snapshot()
+
+        assert [s.song.id for s in snapshot.songs] == ["w-ciszy"]
+        assert cold.cache_stats.misses == 0
+
+        cold.get_songs()
+        cold.get_devices()
+        assert cold.cache_stats.misses == 0
+
+    def test_changed_file_rebuilds_snapshot(self, temp_storage, sample_song):
+        """Any source file change invalidates the snapshot."""
+        temp_storage.save_song(sample_song)
+        temp_storage.load_snapshot()
+
+        temp_storage.save_song(Song(song=SongMetadata(id="another", name="Another")))
+        snapshot = Storage(data_dir=temp_storage.data_dir).load_snapshot()
+
+        assert sorted(s.song.id for s in snapshot.songs) == ["another", "w-ciszy"]
+
+    def test_corrupt_snapshot_is_rebuilt(self, temp_storage, sample_song):
+        """An unreadable snapshot file is ignored and replaced."""
+        temp_storage.save_song(sample_song)
+        temp_storage.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_storage.snapshot_file.write_bytes(b"not a pickle")
+
+        snapshot = temp_storage.load_snapshot()
+
+        assert [s.song.id for s in snapshot.songs] == ["w-ciszy"]
+
+    def test_model_schema_change_invalidates_snapshot(self, temp_storage, sample_song, monkeypatch):
+        """A changed pickled model invalidates the snapshot even without a version bump."""
+        temp_storage.save_song(sample_song)
+        temp_storage.load_snapshot()
+        assert temp_storage._read_snapshot() is not None
+
+        schema = Song.model_json_schema()
+        schema["properties"]["new_field"] = {"type": "string"}
+        monkeypatch.setattr(Song, "model_json_schema", classmethod(lambda cls: schema))
+        snapshot_key.cache_clear()
+        try:
+            assert temp_storage._read_snapshot() is None
+        finally:
+            monkeypatch.undo()
+            snapshot_key.cache_clear()
+
+
+class TestSongSummaries:
+    """Tests for the maintained song summary index."""
+
+    def test_summaries_follow_song_order(self, temp_storage, sample_song):
+        temp_storage.save_song(sample_song)
+        temp_storage.save_song(Song(song=SongMetadata(id="another", name="Another")))
+        temp_storage.save_songs_order(["w-ciszy"])
+
+        summaries = temp_storage.get_song_summaries()
+
+        assert [s.id for s in summaries] == ["w-ciszy", "another"]
+        first = summaries[0]
+        assert first.name == "W ciszy"
+        assert first.button_count == 2
+        assert first.devices == ["boss", "ms", "freak"]
+        assert first.content_hash == content_hash(sample_song)
+
+    def test_summaries_persist_without_parsing_songs(self, temp_storage, sample_song):
+        """A fresh Storage lists songs from summaries.json without parsing song YAML."""
+        temp_storage.save_song(sample_song)
+        temp_storage.get_song_summaries()
+
+        cold = Storage(data_dir=temp_storage.data_dir)
+        summaries = cold.get_song_summaries()
+
+        assert [s.id for s in summaries] == ["w-ciszy"]
+        assert cold.cache_stats.misses == 0
+
+    def test_save_and_delete_update_summaries(self, temp_storage, sample_song):
+        temp_storage.save_song(sample_song)
+        temp_storage.get_song_summaries()
+
+        updated = sample_song.model_copy(deep=True)
+        updated.song.name = "Nowa nazwa"
+        temp_storage.save_song(updated)
+        assert temp_storage.get_song_summaries()[0].name == "Nowa nazwa"
+
+        temp_storage.delete_song("w-ciszy")
+        assert temp_storage.get_song_summaries() == []
+
+    def test_external_edit_refreshes_summary(self, temp_storage, sample_song):
+        temp_storage.save_song(sample_song)
+        temp_storage.get_song_summaries()
+
+        song_file = temp_storage.songs_dir / "w-ciszy.yaml"
+        song_file.write_text(
+            song_file.read_text(encoding="utf-8").replace("W ciszy", "Z edytora"),
+            encoding="utf-8",
+        )
+
+        assert temp_storage.get_song_summaries()[0].name == "Z edytora"
+
+    def test_get_song_summary(self, temp_storage, sample_song):
+        """Single-song summary tracks saves and external edits."""
+        assert temp_storage.get_song_summary("w-ciszy") is None
+        temp_storage.save_song(sample_song)
+
+        summary = temp_storage.get_song_summary("w-ciszy")
+        assert summary.content_hash == content_hash(sample_song)
+
+        song_file = temp_storage.songs_dir / "w-ciszy.yaml"
+        song_file.write_text(
+            song_file.read_text(encoding="utf-8").replace("W ciszy", "Z edytora"),
+            encoding="utf-8",
+        )
+        edited = temp_storage.get_song_summary("w-ciszy")
+        assert edited.name == "Z edytora"
+        assert edited.content_hash != summary.content_hash
+
+    def test_get_song_summary_miss_defers_index_write(self, temp_storage, sample_song):
+        """A summary miss is kept in memory; summaries.json is written once on flush."""
+        temp_storage.save_song(sample_song)
+        temp_storage.summaries_file.unlink()
+        temp_storage._summaries = None
+
+        assert temp_storage.get_song_summary("w-ciszy").name == "W ciszy"
+        assert not temp_storage.summaries_file.exists()
+
+        temp_storage.flush_summaries()
+        assert temp_storage.summaries_file.exists()